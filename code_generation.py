@@ -2,10 +2,16 @@ from rawtypes.parser.function_cursor import FunctionCursor
 from typing import List, Tuple
 from rawtypes.generator.cpp_writer import FunctionCustomization
 from rawtypes.interpreted_types import *
+from rawtypes.interpreted_types.primitive_types import FloatType
 # from rawtypes import vcenv  # search setup vc path
 from rawtypes.parser.header import Header
 from rawtypes.parser.struct_cursor import WrapFlags
+import ast
+import hashlib
+import io
+import json
 import pathlib
+import jinja2
 from setuptools import Extension
 import logging
 LOGGER = logging.getLogger()
@@ -17,6 +23,8 @@ PACKAGE_DIR = HERE / 'src/pydear'
 EXTERNAL_DIR = HERE / '_external'
 CMAKE_BUILD = HERE / 'build'
 CPP_PATH = HERE / 'cpp_src/impl.cpp'
+# input digest and outputs of the last run
+STAMP_PATH = HERE / 'cpp_src/code_generation.json'
 
 IMVECTOR = '''
 
@@ -36,11 +44,209 @@ class ImVector(ctypes.Structure):
     def each(self, t: Type[ctypes.Structure])->Iterable[ctypes.Structure]:
         return iterate(self.Data, t, self.Size)
 
+    def _array(self, t: Type[Any]) -> ctypes.Array:
+        if not self.Data or self.Size <= 0:
+            return (t * 0)()
+        return (t * self.Size).from_address(self.Data)
+
+    def view(self, t: Type[Any]) -> memoryview:
+        \'\'\'
+        memoryview of Data[:Size] without copy. valid until the vector is modified.
+
+        t: element type. ex: IdxBuffer.view(ctypes.c_uint16), VtxBuffer.view(ImDrawVert)
+        a simple ctypes type is cast to the native format that supports indexing.
+        \'\'\'
+        view = memoryview(self._array(t))
+        code = getattr(t, '_type_', None)
+        if isinstance(code, str) and len(code) == 1:
+            # ctypes '<H' => 'H'
+            view = view.cast('B').cast(code)
+        return view
+
+    def array(self, t: Type[Any]) -> Any:
+        \'\'\'
+        numpy.ndarray of Data[:Size] without copy. the dtype is from t.
+        \'\'\'
+        import numpy
+        return numpy.ctypeslib.as_array(self._array(t))
+
+'''
+
+COMMAND_BUFFER = '''
+import struct
+
+
+class CommandBuffer:
+    \'\'\'
+    Record simple widget calls and replay them by one Custom_ReplayCommands call.
+    Widgets that return a value can not be recorded.
+
+    see native/imgui_command_buffer.h
+    \'\'\'
+    OP_TEXT_UNFORMATTED = 1
+    OP_TEXT_COLORED = 2
+    OP_SAME_LINE = 3
+    OP_SEPARATOR = 4
+    OP_NEW_LINE = 5
+    OP_SPACING = 6
+    OP_TABLE_NEXT_ROW = 7
+    OP_TABLE_NEXT_COLUMN = 8
+    OP_TABLE_SET_COLUMN_INDEX = 9
+    OP_PUSH_ID = 10
+    OP_POP_ID = 11
+
+    _OP = struct.Struct('<B')
+    _OP_STRING = struct.Struct('<BI')
+    _OP_COLOR_STRING = struct.Struct('<B4fI')
+    _OP_FLOAT_FLOAT = struct.Struct('<Bff')
+    _OP_INT_FLOAT = struct.Struct('<Bif')
+    _OP_INT = struct.Struct('<Bi')
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+
+    def replay(self):
+        \'\'\'
+        call recorded widgets. the buffer is kept.
+        \'\'\'
+        if self.data:
+            Custom_ReplayCommands(self.data)
+
+    def _string(self, op: int, text: Union[str, bytes]):
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        # a record is appended at once. a replay never sees a half record
+        self.data += self._OP_STRING.pack(op, len(text)) + text
+
+    def TextUnformatted(self, text: Union[str, bytes]):
+        self._string(self.OP_TEXT_UNFORMATTED, text)
+
+    def TextColored(self, col: Union['ImVec4', Tuple[float, float, float, float]], text: Union[str, bytes]):
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        if not isinstance(col, tuple):
+            # ImVec4. not a global of this module until the first access
+            col = (col.x, col.y, col.z, col.w)
+        self.data += self._OP_COLOR_STRING.pack(
+            self.OP_TEXT_COLORED, *col, len(text)) + text
+
+    def SameLine(self, offset_from_start_x: float = 0.0, spacing: float = -1.0):
+        self.data += self._OP_FLOAT_FLOAT.pack(self.OP_SAME_LINE,
+                                               offset_from_start_x, spacing)
+
+    def Separator(self):
+        self.data += self._OP.pack(self.OP_SEPARATOR)
+
+    def NewLine(self):
+        self.data += self._OP.pack(self.OP_NEW_LINE)
+
+    def Spacing(self):
+        self.data += self._OP.pack(self.OP_SPACING)
+
+    def TableNextRow(self, row_flags: int = 0, min_row_height: float = 0.0):
+        self.data += self._OP_INT_FLOAT.pack(self.OP_TABLE_NEXT_ROW,
+                                             row_flags, min_row_height)
+
+    def TableNextColumn(self):
+        self.data += self._OP.pack(self.OP_TABLE_NEXT_COLUMN)
+
+    def TableSetColumnIndex(self, column_n: int):
+        self.data += self._OP_INT.pack(self.OP_TABLE_SET_COLUMN_INDEX,
+                                       column_n)
+
+    def PushID(self, int_id: int):
+        self.data += self._OP_INT.pack(self.OP_PUSH_ID, int_id)
+
+    def PopID(self):
+        self.data += self._OP.pack(self.OP_POP_ID)
+
 '''
 
 CPP_BEGIN = '''
+#include <imgui_impl_opengl3_native.h>
+#include <imgui_command_buffer.h>
+#include <imgui_font_cache.h>
+
+// argument helpers for the METH_FASTCALL functions. see FASTCALL_TEMPLATES
+static bool check_nargs(const char *name, Py_ssize_t nargs, Py_ssize_t min_args, Py_ssize_t max_args)
+{
+    if (nargs >= min_args && nargs <= max_args)
+    {
+        return true;
+    }
+    PyErr_Format(PyExc_TypeError, "%s() takes from %zd to %zd positional arguments but %zd were given",
+                 name, min_args, max_args, nargs);
+    return false;
+}
+
+static float get_float(PyObject *src)
+{
+    if (PyFloat_CheckExact(src))
+    {
+        return (float)PyFloat_AS_DOUBLE(src);
+    }
+    if (PyLong_CheckExact(src))
+    {
+        return (float)PyLong_AsDouble(src);
+    }
+    return (float)PyFloat_AsDouble(src);
+}
+
+static const char *get_str(PyObject *src, const char *default_value)
+{
+    if (!src || src == Py_None)
+    {
+        return default_value;
+    }
+    // no exception on the bytes path
+    if (PyUnicode_CheckExact(src))
+    {
+        return PyUnicode_AsUTF8(src);
+    }
+    if (PyBytes_CheckExact(src))
+    {
+        return PyBytes_AS_STRING(src);
+    }
+    return get_cstring(src, default_value);
+}
+
 static ImVec2 get_ImVec2(PyObject *src)
 {
+    // (x, y)
+    if (PyTuple_CheckExact(src) && PyTuple_GET_SIZE(src) == 2)
+    {
+        ImVec2 value{get_float(PyTuple_GET_ITEM(src, 0)), get_float(PyTuple_GET_ITEM(src, 1))};
+        if (PyErr_Occurred())
+        {
+            PyErr_Clear();
+            return {};
+        }
+        return value;
+    }
+
+    // ImVec2 ctypes.Structure
+    if (PyObject_CheckBuffer(src))
+    {
+        Py_buffer view;
+        if (PyObject_GetBuffer(src, &view, PyBUF_SIMPLE) == 0)
+        {
+            ImVec2 value{};
+            if (view.len == sizeof(ImVec2))
+            {
+                memcpy(&value, view.buf, sizeof(ImVec2));
+            }
+            PyBuffer_Release(&view);
+            return value;
+        }
+        PyErr_Clear();
+    }
+
     float x, y;
     if(PyArg_ParseTuple(src, "ff", &x, &y))
     {
@@ -50,6 +256,59 @@ static ImVec2 get_ImVec2(PyObject *src)
 
     return {};
 }
+
+// optional last argument of the functions that return ImVec2 / ImVec4.
+// the METH_FASTCALL functions declare a local py_out that shadows this.
+static PyObject *const py_out = nullptr;
+
+static bool write_out(PyObject *out, const void *src, Py_ssize_t size)
+{
+    Py_buffer view;
+    if (PyObject_GetBuffer(out, &view, PyBUF_WRITABLE) < 0)
+    {
+        return false;
+    }
+    bool ok = view.len == size;
+    if (ok)
+    {
+        memcpy(view.buf, src, size);
+    }
+    else
+    {
+        PyErr_Format(PyExc_TypeError, "out requires %zd bytes but %zd were given", size, view.len);
+    }
+    PyBuffer_Release(&view);
+    return ok;
+}
+
+// write to out and return it without allocation. (x, y) if out is None
+static PyObject *return_ImVec2(const ImVec2 &value, PyObject *out)
+{
+    if (out && out != Py_None)
+    {
+        if (!write_out(out, &value, sizeof(value)))
+        {
+            return NULL;
+        }
+        Py_INCREF(out);
+        return out;
+    }
+    return Py_BuildValue("(ff)", value.x, value.y);
+}
+
+static PyObject *return_ImVec4(const ImVec4 &value, PyObject *out)
+{
+    if (out && out != Py_None)
+    {
+        if (!write_out(out, &value, sizeof(value)))
+        {
+            return NULL;
+        }
+        Py_INCREF(out);
+        return out;
+    }
+    return Py_BuildValue("(ffff)", value.x, value.y, value.z, value.w);
+}
 '''
 
 FUNCTIONS = {
@@ -72,6 +331,143 @@ static PyObject *Custom_GetLastItemId(PyObject *self, PyObject *args) {
   ImGuiID id = ImGui::GetCurrentContext()->LastItemData.ID;
   PyObject *py_value = PyLong_FromUnsignedLong(id);
   return py_value;
+}
+    ''',
+    # native backends. see native/*.h
+    'Custom_GL_Load': '''
+static PyObject *Custom_GL_Load(PyObject *self, PyObject *args) {
+  PyObject *loader = NULL;
+  if (!PyArg_ParseTuple(args, "O", &loader)) return NULL;
+
+  bool loaded = pydear_gl::gl().load([loader](const char *name) -> void * {
+    PyObject *address = PyObject_CallFunction(loader, "s", name);
+    if (!address) {
+      PyErr_Clear();
+      return nullptr;
+    }
+    void *p = address == Py_None ? nullptr : PyLong_AsVoidPtr(address);
+    if (PyErr_Occurred()) {
+      PyErr_Clear();
+      p = nullptr;
+    }
+    Py_DECREF(address);
+    return p;
+  });
+  return PyBool_FromLong(loaded);
+}
+    ''',
+    'Custom_ReplayCommands': '''
+static PyObject *Custom_ReplayCommands(PyObject *self, PyObject *args) {
+  PyObject *t0 = NULL;
+  if (!PyArg_ParseTuple(args, "O", &t0)) return NULL;
+  Py_buffer view;
+  if (PyObject_GetBuffer(t0, &view, PyBUF_SIMPLE) < 0) return NULL;
+
+  const char *error = pydear_command_buffer::replay((const uint8_t *)view.buf, (size_t)view.len);
+  PyBuffer_Release(&view);
+  if (error) {
+    PyErr_SetString(PyExc_ValueError, error);
+    return NULL;
+  }
+  Py_RETURN_NONE;
+}
+    ''',
+    'Custom_SaveFontAtlas': '''
+static PyObject *Custom_SaveFontAtlas(PyObject *self, PyObject *args) {
+  PyObject *t0 = NULL;
+  if (!PyArg_ParseTuple(args, "O", &t0)) return NULL;
+  ImFontAtlas *atlas = ctypes_get_pointer<ImFontAtlas*>(t0);
+  if (!atlas) {
+    PyErr_SetString(PyExc_ValueError, "ImFontAtlas is required");
+    return NULL;
+  }
+
+  ImVector<uint8_t> data;
+  if (!pydear_font_cache::save(atlas, data)) {
+    PyErr_SetString(PyExc_ValueError, "ImFontAtlas is not built");
+    return NULL;
+  }
+  return PyBytes_FromStringAndSize((const char *)data.Data, data.Size);
+}
+    ''',
+    'Custom_LoadFontAtlas': '''
+static PyObject *Custom_LoadFontAtlas(PyObject *self, PyObject *args) {
+  PyObject *t0 = NULL;
+  PyObject *t1 = NULL;
+  if (!PyArg_ParseTuple(args, "OO", &t0, &t1)) return NULL;
+  ImFontAtlas *atlas = ctypes_get_pointer<ImFontAtlas*>(t0);
+  if (!atlas) {
+    PyErr_SetString(PyExc_ValueError, "ImFontAtlas is required");
+    return NULL;
+  }
+  Py_buffer view;
+  if (PyObject_GetBuffer(t1, &view, PyBUF_SIMPLE) < 0) return NULL;
+
+  const char *error = pydear_font_cache::load(atlas, (const uint8_t *)view.buf, (size_t)view.len);
+  PyBuffer_Release(&view);
+  if (error) {
+    PyErr_SetString(PyExc_ValueError, error);
+    return NULL;
+  }
+  Py_RETURN_NONE;
+}
+    ''',
+    'Custom_ImplOpenGL3_RenderDrawData': '''
+static PyObject *Custom_ImplOpenGL3_RenderDrawData(PyObject *self, PyObject *args) {
+  PyObject *t0 = NULL;
+  int fb_height;
+  unsigned int vbo;
+  unsigned int ibo;
+  if (!PyArg_ParseTuple(args, "OiII", &t0, &fb_height, &vbo, &ibo)) return NULL;
+  ImDrawData *draw_data = ctypes_get_pointer<ImDrawData*>(t0);
+  if (!draw_data) {
+    PyErr_SetString(PyExc_ValueError, "ImDrawData is required");
+    return NULL;
+  }
+  if (!pydear_gl::gl().loaded) {
+    PyErr_SetString(PyExc_RuntimeError, "call Custom_GL_Load first");
+    return NULL;
+  }
+
+  Py_BEGIN_ALLOW_THREADS
+  pydear_impl_opengl3::render_draw_data(draw_data, fb_height, {vbo, ibo});
+  Py_END_ALLOW_THREADS
+  Py_RETURN_NONE;
+}
+    ''',
+}
+
+# native nanovg backend. see native/nanovg_impl_opengl3_native.h
+NANOVG_FUNCTIONS = {
+    'Custom_NanoVG_RenderDrawData': '''
+static PyObject *Custom_NanoVG_RenderDrawData(PyObject *self, PyObject *args) {
+  PyObject *t0 = NULL;
+  PyObject *t3 = NULL;
+  unsigned int ubo;
+  int uniform_base;
+  int frag_size;
+  if (!PyArg_ParseTuple(args, "OIiiO", &t0, &ubo, &uniform_base, &frag_size, &t3)) return NULL;
+  NVGdrawData *data = ctypes_get_pointer<NVGdrawData*>(t0);
+  if (!data) {
+    PyErr_SetString(PyExc_ValueError, "NVGdrawData is required");
+    return NULL;
+  }
+  if (!pydear_gl::gl().loaded) {
+    PyErr_SetString(PyExc_RuntimeError, "call Custom_GL_Load first");
+    return NULL;
+  }
+  // image id => gl texture. uint32 array
+  Py_buffer view;
+  if (PyObject_GetBuffer(t3, &view, PyBUF_SIMPLE) < 0) return NULL;
+  pydear_nanovg_opengl3::Context context{
+      ubo, uniform_base, frag_size, (const pydear_gl::GLuint *)view.buf,
+      (int)(view.len / sizeof(pydear_gl::GLuint))};
+
+  Py_BEGIN_ALLOW_THREADS
+  pydear_nanovg_opengl3::render_draw_data(data, context);
+  Py_END_ALLOW_THREADS
+  PyBuffer_Release(&view);
+  Py_RETURN_NONE;
 }
     ''',
 }
@@ -80,7 +476,7 @@ HEADERS: List[Header] = [
     Header(
         EXTERNAL_DIR / 'imgui/imgui.h',
         include_dirs=[EXTERNAL_DIR / 'imgui'],
-        begin=IMVECTOR,
+        begin=IMVECTOR + COMMAND_BUFFER,
         after_include=CPP_BEGIN,
         additional_functions=FUNCTIONS),
     Header(
@@ -93,7 +489,9 @@ HEADERS: List[Header] = [
         include_dirs=[EXTERNAL_DIR / 'imnodes']),
     Header(
         EXTERNAL_DIR / 'picovg/src/nanovg.h',
-        include_dirs=[EXTERNAL_DIR / 'picovg/src']),
+        include_dirs=[EXTERNAL_DIR / 'picovg/src'],
+        after_include='#include <nanovg_impl_opengl3_native.h>\n',
+        additional_functions=NANOVG_FUNCTIONS),
 ]
 
 WRAP_TYPES = [
@@ -122,6 +520,7 @@ WRAP_TYPES = [
 '''
     }),
     WrapFlags('imgui', 'ImGuiContext'),
+    WrapFlags('imgui', 'ImDrawVert', fields=True),
     WrapFlags('imgui', 'ImDrawCmd', fields=True),
     WrapFlags('imgui', 'ImDrawData', fields=True),
     WrapFlags('imgui', 'ImDrawListSplitter', fields=True),
@@ -153,6 +552,108 @@ WRAP_TYPES = [
 ]
 
 
+#
+# METH_FASTCALL entry points for the generated functions.
+# replace the rawtypes templates. METH_VARARGS + PyArg_ParseTuple builds an args tuple per call.
+#
+FASTCALL_FUNCTIONS = set()
+
+FASTCALL_TEMPLATES = {
+    'pycfunc.cpp': '''// clang-format off
+{%- set has_out = 'py_out' in call_and_return %}
+static PyObject *{{ func_name | fastcall }}(PyObject *self, PyObject *const *args, Py_ssize_t nargs) {
+  if (!check_nargs("{{ func_name }}", nargs, {{ params | min_args }}, {{ params | length + (1 if has_out else 0) }})) return NULL;
+{%- for param in params %}
+  PyObject *t{{ param.index }} = nargs > {{ param.index }} ? args[{{ param.index }}] : NULL; // {{ param.type }}
+{%- endfor %}
+{%- if has_out %}
+  PyObject *py_out = nargs > {{ params | length }} ? args[{{ params | length }}] : NULL; // ImVec2 / ImVec4 to write
+{%- endif %}
+
+{% for param in params -%}
+  {{ param.cpp_from_py | indent(2, True) }}
+{%- endfor %}
+  if (PyErr_Occurred()) return NULL;
+  {{ call_and_return | indent(2) -}}
+}
+// clang-format on
+''',
+    'module.cpp': '''{ // {{ module_name }}
+    static PyMethodDef Methods[] = {
+        // clang-format off
+        {% for method in methods -%}
+        {% if method.meth in fastcall_functions -%}
+        {"{{ method.name }}", (PyCFunction)(void (*)(void)){{ method.meth }}, METH_FASTCALL, "{{ method.doc }}"},
+        {% else -%}
+        {{ method }},
+        {% endif -%}
+        {% endfor -%} // clang-format on
+        {NULL, NULL, 0, NULL}        /* Sentinel */
+    };
+
+    static struct PyModuleDef module = {
+        PyModuleDef_HEAD_INIT, "{{ module_name }}", /* name of module */
+        nullptr, /* module documentation, may be NULL */
+        -1,      /* size of per-interpreter state of the module,
+                   or -1 if the module keeps state in global variables. */
+        Methods};
+
+    auto m = PyModule_Create(&module);
+    assert(m);
+
+    // add submodule
+    PyDict_SetItemString(__dict__, "pydear.impl.{{ module_name }}", m);
+}
+''',
+}
+
+
+def register_fastcall(func_name: str) -> str:
+    FASTCALL_FUNCTIONS.add(func_name)
+    return func_name
+
+
+def min_args(params) -> int:
+    '''
+    count of the params before the first default value
+    '''
+    for i, param in enumerate(params):
+        if param.default_value:
+            return i
+    return len(params)
+
+
+def use_fastcall(env: jinja2.Environment):
+    env.loader = jinja2.ChoiceLoader(
+        [jinja2.DictLoader(FASTCALL_TEMPLATES), env.loader])
+    env.filters['fastcall'] = register_fastcall
+    env.filters['min_args'] = min_args
+    env.globals['fastcall_functions'] = FASTCALL_FUNCTIONS
+
+
+class FastFloatType(FloatType):
+    '''
+    float without PyArg_ParseTuple. see get_float
+    '''
+
+    def cpp_from_py(self, indent: str, i: int, default_value: str) -> str:
+        if default_value:
+            return f'{indent}float p{i} = t{i} ? get_float(t{i}) : {default_value};\n'
+        else:
+            return f'{indent}float p{i} = get_float(t{i});\n'
+
+
+class FastCStringType(CStringType):
+    '''
+    str or bytes. see get_str
+    '''
+
+    def cpp_from_py(self, indent: str, i: int, default_value: str) -> str:
+        if not default_value:
+            default_value = 'nullptr'
+        return f'{indent}const char *p{i} = get_str(t{i}, {default_value});\n'
+
+
 class ImVec2WrapType(BaseType):
     def __init__(self):
         super().__init__('ImVec2')
@@ -172,7 +673,8 @@ class ImVec2WrapType(BaseType):
             return f'{indent}ImVec2 p{i} = get_ImVec2(t{i});\n'
 
     def cpp_to_py(self, value: str) -> str:
-        return f'Py_BuildValue("(ff)", {value}.x, {value}.y)'
+        # write to the optional out argument if given
+        return f'return_ImVec2({value}, py_out)'
 
 
 class ImVec4WrapType(BaseType):
@@ -188,7 +690,33 @@ class ImVec4WrapType(BaseType):
         return ('ImVec4', 'Tuple[float, float, float, float]')
 
     def cpp_to_py(self, value: str) -> str:
-        return f'Py_BuildValue("(ffff)", {value}.x, {value}.y, {value}.z, {value}.w)'
+        return f'return_ImVec4({value}, py_out)'
+
+
+def write_pyi_function(type_map, pyi: io.IOBase, function: cindex.Cursor, *, overload=1, prefix=''):
+    '''
+    rawtypes write_pyi_function with the optional out argument of the ImVec2 / ImVec4 results.
+    see ImVec2WrapType.cpp_to_py
+    '''
+    from rawtypes.generator import py_writer
+    sio = io.StringIO()
+    py_writer.write_pyi_function(
+        type_map, sio, function, overload=overload, prefix=prefix)
+    stub = sio.getvalue()
+    result = FunctionCursor(function.result_type, [function]).result
+    result_t = type_map.from_cursor(result.type, result.cursor)
+    if isinstance(result_t, (ImVec2WrapType, ImVec4WrapType)):
+        # the pyi imports Union, not Optional
+        out = f'out: Union[{result_t.ctypes_type}, None]=None'
+        params, result_annotation = stub.rsplit(')->', 1)
+        separator = '' if params.endswith('(') else ', '
+        stub = f'{params}{separator}{out})->{result_annotation}'
+    pyi.write(stub)
+
+
+def use_out_stub():
+    from rawtypes.generator import python_generator
+    python_generator.write_pyi_function = write_pyi_function
 
 
 class ImVector(BaseType):
@@ -278,7 +806,141 @@ def is_exclude_function(func: FunctionCursor) -> bool:
     return False
 
 
-def run():
+#
+# lazy module.
+# the generated classes are moved to submodules and built on the first access.
+#
+LAZY_GETATTR = '''
+
+# generated by code_generation.split_lazy_module
+_LAZY = {{
+{lazy}
+}}
+
+
+def __getattr__(name: str):
+    submodule = _LAZY.get(name)
+    if not submodule:
+        raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+    import importlib
+    module = importlib.import_module(f'.{{submodule}}', __package__)
+    g = globals()
+    for k, v in _LAZY.items():
+        if v == submodule:
+            g[k] = getattr(module, k)
+    return g[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+'''
+
+
+def split_lazy_module(path: pathlib.Path, begin: str) -> List[pathlib.Path]:
+    '''
+    {stem}.py: imports, begin and module __getattr__
+    _{stem}_structs.py: ctypes.Structure and ctypes.Union
+    _{stem}_enums.py: IntEnum
+    '''
+    from rawtypes.generator.python_generator import PY_BEGIN  # noqa
+    stem = path.stem
+    head = f'{PY_BEGIN}from .impl.{stem} import *\n{begin}'
+    src = path.read_text()
+    assert src.startswith(head)
+    body = src[len(head):]
+    lines = body.splitlines(keepends=True)
+
+    groups = {f'_{stem}_structs': [], f'_{stem}_enums': []}
+    lazy = {}
+    for node in ast.parse(body).body:
+        code = ''.join(lines[node.lineno - 1:node.end_lineno])
+        match node:
+            case ast.ClassDef(name=name, bases=[ast.Name(id='IntEnum')]):
+                submodule = f'_{stem}_enums'
+            case ast.ClassDef(name=name):
+                submodule = f'_{stem}_structs'
+            case ast.ImportFrom() | ast.Import():
+                # PY_BEGIN has them
+                continue
+            case _:
+                raise RuntimeError(f'{path}: unexpected statement: {code}')
+        groups[submodule].append(code)
+        lazy[name] = submodule
+
+    outputs = []
+    for submodule, codes in groups.items():
+        if not codes:
+            continue
+        outputs.append(path.parent / f'{submodule}.py')
+        with outputs[-1].open('w') as w:
+            w.write(f'# generated. imported by {stem}.__getattr__\n')
+            w.write(PY_BEGIN)
+            w.write(f'from .impl.{stem} import *\n')
+            w.write(f'from .{stem} import *\n\n')
+            for code in codes:
+                w.write(code)
+                w.write('\n\n')
+
+    with path.open('w') as w:
+        w.write(head)
+        w.write(LAZY_GETATTR.format(lazy='\n'.join(
+            f'    {k!r}: {v!r},' for k, v in lazy.items())))
+    return outputs
+
+
+HEADER_SUFFIXES = ('.h', '.hpp', '.inl')
+
+
+def get_include_files() -> List[pathlib.Path]:
+    '''
+    headers under the include directories of the parse. e.g. imconfig.h, imstb_textedit.h.
+    rawtypes parses HEADERS together with the directory of each header and the include_dirs.
+    '''
+    dirs = set()
+    for header in HEADERS:
+        dirs.add(header.path.parent)
+        dirs.update(header.include_dirs)
+    files = set()
+    for dir in dirs:
+        files.update(path for path in dir.rglob('*')
+                     if path.suffix in HEADER_SUFFIXES and path.is_file())
+    return sorted(files)
+
+
+def get_input_digest() -> str:
+    '''
+    the included headers, rawtypes version and this file.
+    this file has WRAP_TYPES, EXCLUDE_FUNCS, FUNCTION_CUSTOMIZE and the templates.
+    '''
+    from importlib.metadata import version
+    h = hashlib.sha256()
+    h.update(version('rawtypes').encode('utf-8'))
+    h.update(pathlib.Path(__file__).read_bytes())
+    for path in get_include_files():
+        h.update(str(path.relative_to(HERE)).encode('utf-8'))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def is_up_to_date(digest: str) -> bool:
+    try:
+        stamp = json.loads(STAMP_PATH.read_text())
+    except (OSError, ValueError):
+        return False
+    if stamp.get('digest') != digest:
+        return False
+    return all((HERE / output).exists() for output in stamp.get('outputs', []))
+
+
+def run(*, force=False):
+    '''
+    skip if the inputs are same as the last run. remove STAMP_PATH to force.
+    '''
+    digest = get_input_digest()
+    if not force and is_up_to_date(digest):
+        LOGGER.info(f'up to date: {STAMP_PATH.relative_to(HERE)}')
+        return
+
     #
     # generate c++ source and relative py and pyi
     #
@@ -287,7 +949,14 @@ def run():
 
     generator.type_manager.WRAP_TYPES.extend(WRAP_TYPES)
 
+    use_fastcall(generator.env)
+    use_out_stub()
+
     generator.type_manager.processors = [
+        TypeProcessor(lambda c: FastFloatType(c.type.is_const_qualified())
+                      if c.type.kind == cindex.TypeKind.FLOAT else None),
+        TypeProcessor(lambda c: FastCStringType()
+                      if c.spelling == 'const char *' else None),
         TypeProcessor(if_imvector),
         TypeProcessor(lambda c: ImVec2WrapType() if c.type.spelling in [
             'ImVec2', 'const ImVec2 &'] else None),
@@ -298,3 +967,16 @@ def run():
     ]
 
     generator.generate(PACKAGE_DIR, CPP_PATH, function_custom=FUNCTION_CUSTOMIZE, is_exclude_function=is_exclude_function)
+
+    outputs = [CPP_PATH, CPP_PATH.parent / 'rawtypes.h']
+    for header in HEADERS:
+        if header.include_only:
+            continue
+        py_path = PACKAGE_DIR / f'{header.path.stem}.py'
+        outputs += [py_path, py_path.with_suffix('.pyi')]
+        outputs += split_lazy_module(py_path, header.begin)
+
+    STAMP_PATH.write_text(json.dumps({
+        'digest': digest,
+        'outputs': [output.relative_to(HERE).as_posix() for output in outputs],
+    }, indent=2))
@@ -9,8 +9,16 @@ def main():
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--ini', type=pathlib.Path)
+    parser.add_argument('--power_saving', action='store_true')
+    parser.add_argument('--headless', choices=['egl', 'osmesa'])
+    parser.add_argument('--use_native', action='store_true')
     args = parser.parse_args()
 
+    if args.headless:
+        # before OpenGL.GL is imported
+        from pydear.utils import headless
+        headless.select_platform(args.headless)
+
     setting = None
     if args.ini:
         from pydear.utils.setting import BinSetting
@@ -18,9 +26,11 @@ def main():
 
     from pydear.utils import glfw_app
     app = glfw_app.GlfwApp(
-        'hello_docking', setting=setting if setting else None)
+        'hello_docking', setting=setting if setting else None, power_saving=args.power_saving,
+        headless=args.headless)
 
     from pydear.utils import dockspace
+    from pydear.utils import profiler
     from pydear import imgui as ImGui
     import ctypes
 
@@ -37,6 +47,8 @@ def main():
                        (ctypes.c_bool * 1)(True)),
         dockspace.Dock('hello', show_hello,
                        (ctypes.c_bool * 1)(True)),
+        dockspace.Dock('profiler', profiler.ProfilerView().show,
+                       (ctypes.c_bool * 1)(False)),
     ]
 
     def menu():
@@ -50,10 +62,12 @@ def main():
             ImGui.EndMenu()
 
     gui = dockspace.DockingGui(
-        app.loop, docks=views, menu=menu, setting=setting if setting else None)
+        app.loop, docks=views, menu=menu, setting=setting if setting else None, scheduler=app.scheduler,
+        framebuffer=app.framebuffer, use_native_renderer=args.use_native,
+        get_proc_address=app.headless.get_proc_address if app.headless else None)
 
     from pydear.backends.impl_glfw import ImplGlfwInput
-    impl_glfw = ImplGlfwInput(app.window)
+    impl_glfw = ImplGlfwInput(app.window, scheduler=app.scheduler)
 
     while app.clear():
         impl_glfw.process_inputs()
@@ -1,4 +1,5 @@
 import logging
+import argparse
 from OpenGL import GL
 import glfw
 import nanovg_demo
@@ -7,14 +8,14 @@ from pydear.nanovg_backends import nanovg_impl_opengl3
 from pydear.utils import glfw_app
 
 
-def run(app: glfw_app.GlfwApp):
+def run(app: glfw_app.GlfwApp, *, use_native=False):
     vg = nanovg.nvgCreate(nanovg.NVGcreateFlags.NVG_ANTIALIAS
                           | nanovg.NVGcreateFlags.NVG_STENCIL_STROKES
                           | nanovg.NVGcreateFlags.NVG_DEBUG)
     if not vg:
         raise RuntimeError("Could not init nanovg")
 
-    nanovg_impl_opengl3.init(vg)
+    nanovg_impl_opengl3.init(vg, use_native=use_native)
 
     demo = nanovg_demo.Demo(vg)
     prevt = glfw.get_time()
@@ -40,8 +41,13 @@ def main():
     logging.basicConfig(
         level=logging.DEBUG, format='[%(levelname)s]%(name)s %(funcName)s: %(message)s')
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--use_native', action='store_true',
+                        help='submit NVGdrawData from pydear.impl')
+    args = parser.parse_args()
+
     app = glfw_app.GlfwApp("nanovg: pydear", width=1000, height=600)
-    run(app)
+    run(app, use_native=args.use_native)
 
 
 if __name__ == '__main__':
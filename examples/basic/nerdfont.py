@@ -12,9 +12,10 @@ HERE = pathlib.Path('__file__').absolute().parent
 
 
 class FontLoad(gui_app.Gui):
-    def __init__(self, loop: asyncio.AbstractEventLoop, nerdfont_path: Optional[pathlib.Path]) -> None:
+    def __init__(self, loop: asyncio.AbstractEventLoop, nerdfont_path: Optional[pathlib.Path],
+                 font_cache: Optional[pathlib.Path]) -> None:
         self.nerdfont_path = nerdfont_path
-        super().__init__(loop, widgets=self.hello)
+        super().__init__(loop, widgets=self.hello, font_cache=font_cache)
 
     def _setup_font(self):
         io = ImGui.GetIO()
@@ -29,7 +30,7 @@ class FontLoad(gui_app.Gui):
             fontloader.load(self.nerdfont_path, 13,
                             self.nerdfont_range, merge=True, monospace=True)
 
-        io.Fonts.Build()
+        self._build_font(io.Fonts)
 
     def hello(self):
         '''
@@ -56,6 +57,8 @@ def main():
     logging.basicConfig(level=logging.DEBUG)
     parser = argparse.ArgumentParser()
     parser.add_argument('--nerdfont', type=pathlib.Path)
+    parser.add_argument('--font-cache', type=pathlib.Path,
+                        help='directory to cache the font atlas')
     args = parser.parse_args()
 
     #
@@ -67,7 +70,7 @@ def main():
     #
     # imgui
     #
-    gui = FontLoad(app.loop, args.nerdfont)
+    gui = FontLoad(app.loop, args.nerdfont, args.font_cache)
 
     #
     # glfw_app => ImplGlfwInput => imgui
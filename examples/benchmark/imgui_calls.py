@@ -0,0 +1,76 @@
+'''
+per call cost of the generated bindings.
+
+no window is required. run before and after rebuilding pydear.impl to compare.
+
+$ python examples/benchmark/imgui_calls.py
+'''
+import argparse
+import ctypes
+import sys
+import timeit
+from pydear import imgui as ImGui
+
+
+def setup_context():
+    ImGui.CreateContext()
+    io = ImGui.GetIO()
+    io.DisplaySize = ImGui.ImVec2(1280, 720)
+    io.DeltaTime = 1.0 / 60
+    # build the font atlas. no texture upload
+    p = (ctypes.c_void_p * 1)()
+    width = (ctypes.c_int * 1)()
+    height = (ctypes.c_int * 1)()
+    channels = (ctypes.c_int * 1)()
+    io.Fonts.GetTexDataAsRGBA32(p, width, height, channels)
+
+
+def count_allocations(case, number: int) -> float:
+    '''
+    objects allocated per call. keep the results alive and count the blocks.
+    '''
+    results = [None] * number
+    before = sys.getallocatedblocks()
+    for i in range(number):
+        results[i] = case()
+    return (sys.getallocatedblocks() - before) / number
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_context()
+
+    value = (ctypes.c_float * 1)(0.5)
+    size = (100.0, 20.0)
+    out = ImGui.ImVec2()
+    cases = {
+        'Text(str)': lambda: ImGui.Text('hello'),
+        'Text(bytes)': lambda: ImGui.Text(b'hello'),
+        'TextUnformatted': lambda: ImGui.TextUnformatted('hello'),
+        'Button': lambda: ImGui.Button('button'),
+        'Button(size)': lambda: ImGui.Button('button', size),
+        'SliderFloat': lambda: ImGui.SliderFloat('slider', value, 0, 1),
+        'GetWindowPos': lambda: ImGui.GetWindowPos(),
+        'GetWindowPos(out)': lambda: ImGui.GetWindowPos(out),
+    }
+
+    print(f'{"function":<18} {"ns/call":>10} {"allocs/call":>12}')
+    for name, case in cases.items():
+        # one frame per case. items out of the window are clipped
+        ImGui.NewFrame()
+        ImGui.Begin('bench')
+        ImGui.PushID(name)
+        best = min(timeit.repeat(case, number=args.number, repeat=args.repeat))
+        allocations = count_allocations(case, args.number)
+        ImGui.PopID()
+        ImGui.End()
+        ImGui.EndFrame()
+        print(f'{name:<18} {best / args.number * 1e9:>10.1f} {allocations:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+'''
+import time of the generated modules by python -X importtime.
+
+* lazy: import only. classes are built on the first access.
+* eager: import the class submodules too. same as the modules before the split.
+
+$ python examples/benchmark/import_time.py
+'''
+from typing import Tuple
+import argparse
+import subprocess
+import sys
+import time
+
+MODULES = ('pydear.imgui', 'pydear.imgui_internal',
+           'pydear.nanovg', 'pydear.imnodes')
+
+
+def get_submodules():
+    '''
+    _imgui_structs, _imgui_enums...
+    '''
+    import pkgutil
+    import pydear
+    return [f'pydear.{m.name}' for m in pkgutil.iter_modules(pydear.__path__)
+            if m.name.startswith('_') and m.name.endswith(('_structs', '_enums'))]
+
+
+def measure(statement: str) -> Tuple[int, int]:
+    '''
+    return cumulative us of the top level pydear modules and the elapsed us.
+    '''
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    elapsed = int((time.perf_counter() - start) * 1e6)
+    total = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip().startswith('pydear.') and not name.startswith('  '):
+            total += int(cumulative)
+    return total, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"":<6} {"import [us]":>12} {"process [us]":>13}')
+    lazy = 'import ' + ', '.join(MODULES)
+    eager = 'import ' + ', '.join(MODULES + tuple(get_submodules()))
+    for name, statement in (('lazy', lazy), ('eager', eager)):
+        results = [measure(statement) for _ in range(args.repeat)]
+        print(f'{name:<6} {min(r[0] for r in results):>12} {min(r[1] for r in results):>13}')
+
+
+if __name__ == '__main__':
+    main()
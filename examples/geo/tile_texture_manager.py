@@ -11,6 +11,7 @@ import logging
 #
 from xyztile import Tile
 from glglue import glo
+from pydear.utils.frame_scheduler import FrameScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,13 @@ class ImageTask(NamedTuple):
 
 
 class TileTextureManager:
-    def __init__(self, loop: asyncio.AbstractEventLoop, base_url: str, cache_dir: pathlib.Path) -> None:
+    def __init__(self, loop: asyncio.AbstractEventLoop, base_url: str, cache_dir: pathlib.Path, *,
+                 scheduler: Optional[FrameScheduler] = None) -> None:
+        '''
+        scheduler: GlfwApp.scheduler. a loaded tile requests a redraw.
+        '''
         self.loop = loop
+        self.scheduler = scheduler
         self.base_url = base_url
         self.texture_map: Dict[Tile, Union[glo.Texture, asyncio.Future]] = {}
         self.cache_dir = cache_dir
@@ -60,6 +66,8 @@ class TileTextureManager:
         texture = glo.Texture(
             image.width, image.height,  image.tobytes('raw'))
         self.texture_map[tile] = texture
+        if self.scheduler:
+            self.scheduler.wake()
 
     def tmp_image(self, tile: Tile) -> PIL.Image.Image:
         img = PIL.Image.new("RGBA", (256, 256))
@@ -63,14 +63,15 @@ for i in range(0, 65530, 6):
 
 
 class XYZTile(Item):
-    def __init__(self, loop: asyncio.AbstractEventLoop, base_url) -> None:
+    def __init__(self, loop: asyncio.AbstractEventLoop, base_url, *, scheduler=None) -> None:
         super().__init__("xyztile")
         self._input = None
         self.map = xyztile.Map(1)
         self.p_open = (ctypes.c_bool * 1)(True)
         self.tiles: List[xyztile.Tile] = []
+        self.commands = ImGui.CommandBuffer()
         self.texture_manager = TileTextureManager(
-            loop, base_url, HERE.parent.parent / "tile_cache"
+            loop, base_url, HERE.parent.parent / "tile_cache", scheduler=scheduler
         )
 
         self.shader = None
@@ -140,22 +141,25 @@ class XYZTile(Item):
                 ImGui.TableSetupColumn("bottom")
                 ImGui.TableHeadersRow()
 
-                # body
+                # body. replay all rows by one call
+                commands = self.commands
+                commands.clear()
                 for i, tile in enumerate(self.tiles):
-                    ImGui.TableNextRow()
+                    commands.TableNextRow()
                     # index
-                    ImGui.TableNextColumn()
-                    ImGui.TextUnformatted(f"{i:03}:{tile.z}:{tile.x}:{tile.y}")
+                    commands.TableNextColumn()
+                    commands.TextUnformatted(f"{i:03}:{tile.z}:{tile.x}:{tile.y}")
                     #
                     rect = tile.rect
-                    ImGui.TableNextColumn()
-                    ImGui.TextUnformatted(f"{rect.left}")
-                    ImGui.TableNextColumn()
-                    ImGui.TextUnformatted(f"{rect.top}")
-                    ImGui.TableNextColumn()
-                    ImGui.TextUnformatted(f"{rect.right}")
-                    ImGui.TableNextColumn()
-                    ImGui.TextUnformatted(f"{rect.bottom}")
+                    commands.TableNextColumn()
+                    commands.TextUnformatted(f"{rect.left}")
+                    commands.TableNextColumn()
+                    commands.TextUnformatted(f"{rect.top}")
+                    commands.TableNextColumn()
+                    commands.TextUnformatted(f"{rect.right}")
+                    commands.TableNextColumn()
+                    commands.TextUnformatted(f"{rect.bottom}")
+                commands.replay()
 
                 ImGui.EndTable()
 
@@ -233,7 +237,7 @@ def main():
 
     url = "http://tile.openstreetmap.org"
     # url = None
-    view = XYZTile(app.loop, url)
+    view = XYZTile(app.loop, url, scheduler=app.scheduler)
 
     bg = ImGui.ImVec4(1, 1, 1, 1)
     tint = ImGui.ImVec4(1, 1, 1, 1)
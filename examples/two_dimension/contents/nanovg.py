@@ -1,9 +1,23 @@
-from typing import Optional
+from typing import Optional, Tuple
 import pathlib
 from pydear import nanovg
 from pydear.utils.mouse_event import MouseEvent, MouseInput
 from pydear.utils.selector import Item
 from pydear.utils.nanovg_renderer import NanoVgRenderer, nvg_text, nvg_line_from_to
+from pydear.nanovg_backends import nanovg_impl_opengl3
+
+
+def nvg_grid(vg, width: int, height: int, step=32):
+    nanovg.nvgStrokeWidth(vg, 1.0)
+    nanovg.nvgStrokeColor(vg, nanovg.nvgRGBA(96, 96, 96, 255))
+    nanovg.nvgBeginPath(vg)
+    for x in range(0, width, step):
+        nanovg.nvgMoveTo(vg, x, 0)
+        nanovg.nvgLineTo(vg, x, height)
+    for y in range(0, height, step):
+        nanovg.nvgMoveTo(vg, 0, y)
+        nanovg.nvgLineTo(vg, width, y)
+    nanovg.nvgStroke(vg)
 
 
 class NanoVgSample(Item):
@@ -11,6 +25,9 @@ class NanoVgSample(Item):
         super().__init__('nanovg')
 
         self.nvg = NanoVgRenderer(font_path)
+        # static. recorded when resized
+        self.grid: Optional[nanovg_impl_opengl3.Picture] = None
+        self.grid_size: Tuple[int, int] = (0, 0)
 
         # mouse
         self.begin: Optional[MouseInput] = None
@@ -28,7 +45,15 @@ class NanoVgSample(Item):
         input = self.mouse_event.last_input
         assert(input)
 
+        size = (mouse_input.width, mouse_input.height)
+        if size != self.grid_size and size[0] and size[1]:
+            self.grid = self.nvg.record(
+                *size, lambda vg: nvg_grid(vg, *size))
+            self.grid_size = size
+
         with self.nvg.render(mouse_input.width, mouse_input.height) as vg:
+            if self.grid:
+                self.nvg.draw_picture(self.grid)
             nanovg.nvgBeginPath(vg)
             nanovg.nvgRoundedRect(vg, 0, 0, 0, 0, 0)
             nanovg.nvgFill(vg)
@@ -0,0 +1,113 @@
+// OpenGL entry points used by the native renderers.
+//
+// The extension does not link a GL loader. Function pointers are resolved at
+// runtime through a Python callable (ex. glfw.get_proc_address), see
+// Custom_GL_Load in code_generation.py.
+#pragma once
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef _WIN32
+#define PYDEAR_GL_APIENTRY __stdcall
+#else
+#define PYDEAR_GL_APIENTRY
+#endif
+
+namespace pydear_gl {
+
+using GLenum = unsigned int;
+using GLboolean = unsigned char;
+using GLbitfield = unsigned int;
+using GLint = int;
+using GLuint = unsigned int;
+using GLsizei = int;
+using GLfloat = float;
+using GLintptr = ptrdiff_t;
+using GLsizeiptr = ptrdiff_t;
+
+constexpr GLboolean GL_FALSE = 0;
+constexpr GLboolean GL_TRUE = 1;
+constexpr GLenum GL_ZERO = 0;
+constexpr GLenum GL_ONE = 1;
+constexpr GLenum GL_TRIANGLES = 0x0004;
+constexpr GLenum GL_TRIANGLE_STRIP = 0x0005;
+constexpr GLenum GL_TRIANGLE_FAN = 0x0006;
+constexpr GLenum GL_NOTEQUAL = 0x0205;
+constexpr GLenum GL_ALWAYS = 0x0207;
+constexpr GLenum GL_SRC_COLOR = 0x0300;
+constexpr GLenum GL_ONE_MINUS_SRC_COLOR = 0x0301;
+constexpr GLenum GL_SRC_ALPHA = 0x0302;
+constexpr GLenum GL_ONE_MINUS_SRC_ALPHA = 0x0303;
+constexpr GLenum GL_DST_ALPHA = 0x0304;
+constexpr GLenum GL_ONE_MINUS_DST_ALPHA = 0x0305;
+constexpr GLenum GL_DST_COLOR = 0x0306;
+constexpr GLenum GL_ONE_MINUS_DST_COLOR = 0x0307;
+constexpr GLenum GL_SRC_ALPHA_SATURATE = 0x0308;
+constexpr GLenum GL_FRONT = 0x0404;
+constexpr GLenum GL_BACK = 0x0405;
+constexpr GLenum GL_INVALID_ENUM = 0x0500;
+constexpr GLenum GL_CULL_FACE = 0x0B44;
+constexpr GLenum GL_STENCIL_TEST = 0x0B90;
+constexpr GLenum GL_TEXTURE_2D = 0x0DE1;
+constexpr GLenum GL_UNSIGNED_SHORT = 0x1403;
+constexpr GLenum GL_KEEP = 0x1E00;
+constexpr GLenum GL_INCR_WRAP = 0x8507;
+constexpr GLenum GL_DECR_WRAP = 0x8508;
+constexpr GLenum GL_ARRAY_BUFFER = 0x8892;
+constexpr GLenum GL_ELEMENT_ARRAY_BUFFER = 0x8893;
+constexpr GLenum GL_STREAM_DRAW = 0x88E0;
+constexpr GLenum GL_UNIFORM_BUFFER = 0x8A11;
+
+// X(return type, name without gl prefix, parameters)
+#define PYDEAR_GL_FUNCTIONS(X)                                                 \
+  X(void, BindBuffer, (GLenum target, GLuint buffer))                          \
+  X(void, BufferData,                                                          \
+    (GLenum target, GLsizeiptr size, const void *data, GLenum usage))          \
+  X(void, BindTexture, (GLenum target, GLuint texture))                        \
+  X(void, Scissor, (GLint x, GLint y, GLsizei width, GLsizei height))          \
+  X(void, DrawElements,                                                        \
+    (GLenum mode, GLsizei count, GLenum type, const void *indices))            \
+  X(void, DrawArrays, (GLenum mode, GLint first, GLsizei count))               \
+  X(void, Enable, (GLenum cap))                                                \
+  X(void, Disable, (GLenum cap))                                               \
+  X(void, ColorMask,                                                           \
+    (GLboolean red, GLboolean green, GLboolean blue, GLboolean alpha))         \
+  X(void, BlendFuncSeparate,                                                   \
+    (GLenum src_rgb, GLenum dst_rgb, GLenum src_alpha, GLenum dst_alpha))      \
+  X(void, StencilMask, (GLuint mask))                                          \
+  X(void, StencilFunc, (GLenum func, GLint ref, GLuint mask))                  \
+  X(void, StencilOp, (GLenum fail, GLenum zfail, GLenum zpass))                \
+  X(void, StencilOpSeparate,                                                   \
+    (GLenum face, GLenum fail, GLenum zfail, GLenum zpass))                    \
+  X(void, BindBufferRange, (GLenum target, GLuint index, GLuint buffer,        \
+                            GLintptr offset, GLsizeiptr size))
+
+struct Functions {
+#define PYDEAR_GL_DECLARE(ret, name, params)                                   \
+  ret(PYDEAR_GL_APIENTRY *name) params = nullptr;
+  PYDEAR_GL_FUNCTIONS(PYDEAR_GL_DECLARE)
+#undef PYDEAR_GL_DECLARE
+
+  bool loaded = false;
+
+  // get_proc: const char * => void *
+  template <typename F> bool load(const F &get_proc) {
+    bool ok = true;
+#define PYDEAR_GL_LOAD(ret, name, params)                                      \
+  name = reinterpret_cast<decltype(name)>(get_proc("gl" #name));               \
+  if (!name) {                                                                 \
+    ok = false;                                                                \
+  }
+    PYDEAR_GL_FUNCTIONS(PYDEAR_GL_LOAD)
+#undef PYDEAR_GL_LOAD
+    loaded = ok;
+    return ok;
+  }
+};
+
+inline Functions &gl() {
+  static Functions s_functions;
+  return s_functions;
+}
+
+} // namespace pydear_gl
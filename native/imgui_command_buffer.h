@@ -0,0 +1,156 @@
+// Replay of pydear.imgui.CommandBuffer.
+//
+// Python packs simple widget calls into a bytes-like buffer.
+// This walks the buffer and calls ImGui without crossing back to Python.
+//
+// record: u8 op, payload (little endian, no padding)
+// string: u32 byte size, utf-8 (no terminator)
+#pragma once
+#include <imgui.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+namespace pydear_command_buffer {
+
+// keep in sync with CommandBuffer in code_generation.py
+enum Op : uint8_t {
+  OP_TEXT_UNFORMATTED = 1,        // string
+  OP_TEXT_COLORED = 2,            // f32 r, g, b, a, string
+  OP_SAME_LINE = 3,               // f32 offset_from_start_x, f32 spacing
+  OP_SEPARATOR = 4,               //
+  OP_NEW_LINE = 5,                //
+  OP_SPACING = 6,                 //
+  OP_TABLE_NEXT_ROW = 7,          // i32 flags, f32 min_row_height
+  OP_TABLE_NEXT_COLUMN = 8,       //
+  OP_TABLE_SET_COLUMN_INDEX = 9,  // i32 column
+  OP_PUSH_ID = 10,                // i32 id
+  OP_POP_ID = 11,                 //
+};
+
+class Reader {
+  const uint8_t *m_pos;
+  const uint8_t *m_end;
+
+public:
+  Reader(const uint8_t *data, size_t size) : m_pos(data), m_end(data + size) {}
+
+  bool empty() const { return m_pos >= m_end; }
+
+  template <typename T> bool read(T *value) {
+    if (m_end - m_pos < (ptrdiff_t)sizeof(T)) {
+      return false;
+    }
+    memcpy(value, m_pos, sizeof(T));
+    m_pos += sizeof(T);
+    return true;
+  }
+
+  bool read_string(const char **begin, const char **end) {
+    uint32_t size;
+    if (!read(&size) || (size_t)(m_end - m_pos) < size) {
+      return false;
+    }
+    *begin = (const char *)m_pos;
+    *end = *begin + size;
+    m_pos += size;
+    return true;
+  }
+};
+
+// return nullptr or an error message.
+// the records before a broken one are already replayed.
+inline const char *replay(const uint8_t *data, size_t size) {
+  Reader r(data, size);
+  while (!r.empty()) {
+    uint8_t op;
+    r.read(&op);
+    switch (op) {
+    case OP_TEXT_UNFORMATTED: {
+      const char *begin, *end;
+      if (!r.read_string(&begin, &end)) {
+        return "truncated TextUnformatted";
+      }
+      ImGui::TextUnformatted(begin, end);
+      break;
+    }
+
+    case OP_TEXT_COLORED: {
+      ImVec4 color;
+      const char *begin, *end;
+      if (!r.read(&color.x) || !r.read(&color.y) || !r.read(&color.z) ||
+          !r.read(&color.w) || !r.read_string(&begin, &end)) {
+        return "truncated TextColored";
+      }
+      // same as ImGui::TextColored without the format
+      ImGui::PushStyleColor(ImGuiCol_Text, color);
+      ImGui::TextUnformatted(begin, end);
+      ImGui::PopStyleColor();
+      break;
+    }
+
+    case OP_SAME_LINE: {
+      float offset, spacing;
+      if (!r.read(&offset) || !r.read(&spacing)) {
+        return "truncated SameLine";
+      }
+      ImGui::SameLine(offset, spacing);
+      break;
+    }
+
+    case OP_SEPARATOR:
+      ImGui::Separator();
+      break;
+
+    case OP_NEW_LINE:
+      ImGui::NewLine();
+      break;
+
+    case OP_SPACING:
+      ImGui::Spacing();
+      break;
+
+    case OP_TABLE_NEXT_ROW: {
+      int32_t flags;
+      float min_row_height;
+      if (!r.read(&flags) || !r.read(&min_row_height)) {
+        return "truncated TableNextRow";
+      }
+      ImGui::TableNextRow(flags, min_row_height);
+      break;
+    }
+
+    case OP_TABLE_NEXT_COLUMN:
+      ImGui::TableNextColumn();
+      break;
+
+    case OP_TABLE_SET_COLUMN_INDEX: {
+      int32_t column;
+      if (!r.read(&column)) {
+        return "truncated TableSetColumnIndex";
+      }
+      ImGui::TableSetColumnIndex(column);
+      break;
+    }
+
+    case OP_PUSH_ID: {
+      int32_t id;
+      if (!r.read(&id)) {
+        return "truncated PushID";
+      }
+      ImGui::PushID(id);
+      break;
+    }
+
+    case OP_POP_ID:
+      ImGui::PopID();
+      break;
+
+    default:
+      return "unknown op";
+    }
+  }
+  return nullptr;
+}
+
+} // namespace pydear_command_buffer
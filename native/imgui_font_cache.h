@@ -0,0 +1,285 @@
+// Save and restore a built ImFontAtlas. see pydear.utils.font_cache
+//
+// The blob is only valid for the same imgui build.
+// The caller adds the same fonts as the saved atlas, then load() replaces Build().
+//
+// header: char[8] magic, u32 version, u32 IMGUI_VERSION_NUM, u32 sizeof(ImFontGlyph)
+// atlas: i32 width, height, u8 use_colors, u8 bytes_per_pixel, pixels,
+//        ImVec2 uv_scale, uv_white_pixel, ImVec4 uv_lines[], i32 pack_id_mouse_cursors, pack_id_lines
+// custom rects: u32 count, (u16 w, h, x, y, u32 glyph_id, f32 advance_x, ImVec2 offset, i32 font)[]
+// fonts: u32 count, (f32 size, scale, ascent, descent, i32 surface, u16 fallback, ellipsis, dot,
+//        i16 config_count, u32 glyph count, ImFontGlyph[])[]
+#pragma once
+#include <imgui.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+namespace pydear_font_cache {
+
+static const char MAGIC[8] = {'P', 'Y', 'D', 'E', 'A', 'R', 'F', 'A'};
+static const uint32_t VERSION = 1;
+
+class Writer {
+  ImVector<uint8_t> &m_data;
+
+public:
+  Writer(ImVector<uint8_t> &data) : m_data(data) {}
+
+  void write(const void *src, size_t size) {
+    int pos = m_data.Size;
+    m_data.resize(pos + (int)size);
+    memcpy(m_data.Data + pos, src, size);
+  }
+
+  template <typename T> void write(const T &value) {
+    write(&value, sizeof(T));
+  }
+};
+
+class Reader {
+  const uint8_t *m_pos;
+  const uint8_t *m_end;
+
+public:
+  Reader(const uint8_t *data, size_t size) : m_pos(data), m_end(data + size) {}
+
+  bool empty() const { return m_pos >= m_end; }
+
+  bool read(void *dst, size_t size) {
+    if ((size_t)(m_end - m_pos) < size) {
+      return false;
+    }
+    memcpy(dst, m_pos, size);
+    m_pos += size;
+    return true;
+  }
+
+  template <typename T> bool read(T *value) { return read(value, sizeof(T)); }
+
+  // return the skipped bytes or nullptr
+  const uint8_t *skip(size_t size) {
+    if ((size_t)(m_end - m_pos) < size) {
+      return nullptr;
+    }
+    const uint8_t *p = m_pos;
+    m_pos += size;
+    return p;
+  }
+};
+
+inline int font_index(const ImFontAtlas *atlas, const ImFont *font) {
+  for (int i = 0; i < atlas->Fonts.Size; ++i) {
+    if (atlas->Fonts[i] == font) {
+      return i;
+    }
+  }
+  return -1;
+}
+
+// return false if the atlas is not built.
+inline bool save(ImFontAtlas *atlas, ImVector<uint8_t> &data) {
+  if (!atlas->IsBuilt()) {
+    return false;
+  }
+  Writer w(data);
+  w.write(MAGIC, sizeof(MAGIC));
+  w.write(VERSION);
+  w.write((uint32_t)IMGUI_VERSION_NUM);
+  w.write((uint32_t)sizeof(ImFontGlyph));
+
+  // texture. RGBA32 is converted from Alpha8 if it is absent
+  w.write((int32_t)atlas->TexWidth);
+  w.write((int32_t)atlas->TexHeight);
+  w.write((uint8_t)atlas->TexPixelsUseColors);
+  size_t pixels = (size_t)atlas->TexWidth * atlas->TexHeight;
+  if (atlas->TexPixelsAlpha8) {
+    w.write((uint8_t)1);
+    w.write(atlas->TexPixelsAlpha8, pixels);
+  } else {
+    w.write((uint8_t)4);
+    w.write(atlas->TexPixelsRGBA32, pixels * 4);
+  }
+  w.write(atlas->TexUvScale);
+  w.write(atlas->TexUvWhitePixel);
+  w.write(atlas->TexUvLines, sizeof(atlas->TexUvLines));
+  w.write((int32_t)atlas->PackIdMouseCursors);
+  w.write((int32_t)atlas->PackIdLines);
+
+  w.write((uint32_t)atlas->CustomRects.Size);
+  for (auto &rect : atlas->CustomRects) {
+    w.write(rect.Width);
+    w.write(rect.Height);
+    w.write(rect.X);
+    w.write(rect.Y);
+    w.write(rect.GlyphID);
+    w.write(rect.GlyphAdvanceX);
+    w.write(rect.GlyphOffset);
+    w.write((int32_t)font_index(atlas, rect.Font));
+  }
+
+  w.write((uint32_t)atlas->Fonts.Size);
+  for (auto font : atlas->Fonts) {
+    w.write(font->FontSize);
+    w.write(font->Scale);
+    w.write(font->Ascent);
+    w.write(font->Descent);
+    w.write((int32_t)font->MetricsTotalSurface);
+    w.write(font->FallbackChar);
+    w.write(font->EllipsisChar);
+    w.write(font->DotChar);
+    w.write(font->ConfigDataCount);
+    w.write((uint32_t)font->Glyphs.Size);
+    w.write(font->Glyphs.Data, font->Glyphs.size_in_bytes());
+  }
+  return true;
+}
+
+// return nullptr or an error message. the atlas is unchanged on error.
+inline const char *load(ImFontAtlas *atlas, const uint8_t *data, size_t size) {
+  if (atlas->Locked) {
+    return "atlas is locked";
+  }
+
+  Reader r(data, size);
+  char magic[8];
+  uint32_t version, imgui_version, glyph_size;
+  if (!r.read(magic, sizeof(magic)) || memcmp(magic, MAGIC, sizeof(MAGIC)) ||
+      !r.read(&version) || version != VERSION) {
+    return "not a font atlas cache";
+  }
+  if (!r.read(&imgui_version) || imgui_version != IMGUI_VERSION_NUM ||
+      !r.read(&glyph_size) || glyph_size != sizeof(ImFontGlyph)) {
+    return "font atlas cache of an other imgui";
+  }
+
+  // validate all before the atlas is modified
+  int32_t width, height;
+  uint8_t use_colors, bytes_per_pixel;
+  if (!r.read(&width) || !r.read(&height) || width <= 0 || height <= 0 ||
+      !r.read(&use_colors) || !r.read(&bytes_per_pixel) ||
+      (bytes_per_pixel != 1 && bytes_per_pixel != 4)) {
+    return "truncated texture";
+  }
+  size_t pixels_size = (size_t)width * height * bytes_per_pixel;
+  const uint8_t *pixels = r.skip(pixels_size);
+  ImVec2 uv_scale, uv_white_pixel;
+  ImVec4 uv_lines[IM_ARRAYSIZE(atlas->TexUvLines)];
+  int32_t pack_id_mouse_cursors, pack_id_lines;
+  if (!pixels || !r.read(&uv_scale) ||
+      !r.read(&uv_white_pixel) || !r.read(uv_lines, sizeof(uv_lines)) ||
+      !r.read(&pack_id_mouse_cursors) || !r.read(&pack_id_lines)) {
+    return "truncated texture";
+  }
+
+  uint32_t rect_count;
+  if (!r.read(&rect_count)) {
+    return "truncated custom rects";
+  }
+  ImVector<ImFontAtlasCustomRect> rects;
+  ImVector<int32_t> rect_fonts;
+  rects.resize((int)rect_count);
+  rect_fonts.resize((int)rect_count);
+  for (uint32_t i = 0; i < rect_count; ++i) {
+    auto &rect = rects[i];
+    if (!r.read(&rect.Width) || !r.read(&rect.Height) || !r.read(&rect.X) ||
+        !r.read(&rect.Y) || !r.read(&rect.GlyphID) ||
+        !r.read(&rect.GlyphAdvanceX) || !r.read(&rect.GlyphOffset) ||
+        !r.read(&rect_fonts[i])) {
+      return "truncated custom rects";
+    }
+    if (rect_fonts[i] < -1 || rect_fonts[i] >= atlas->Fonts.Size) {
+      return "font index out of range";
+    }
+  }
+
+  uint32_t font_count;
+  if (!r.read(&font_count)) {
+    return "truncated fonts";
+  }
+  if ((int)font_count != atlas->Fonts.Size) {
+    return "font count mismatch";
+  }
+  struct FontData {
+    float size, scale, ascent, descent;
+    int32_t surface;
+    ImWchar fallback, ellipsis, dot;
+    short config_count;
+    const uint8_t *glyphs;
+    uint32_t glyph_count;
+  };
+  ImVector<FontData> fonts;
+  fonts.resize((int)font_count);
+  for (auto &font : fonts) {
+    if (!r.read(&font.size) || !r.read(&font.scale) || !r.read(&font.ascent) ||
+        !r.read(&font.descent) || !r.read(&font.surface) ||
+        !r.read(&font.fallback) || !r.read(&font.ellipsis) ||
+        !r.read(&font.dot) || !r.read(&font.config_count) ||
+        !r.read(&font.glyph_count)) {
+      return "truncated fonts";
+    }
+    font.glyphs = r.skip((size_t)font.glyph_count * sizeof(ImFontGlyph));
+    if (!font.glyphs) {
+      return "truncated glyphs";
+    }
+  }
+  if (!r.empty()) {
+    return "trailing data";
+  }
+
+  // apply
+  atlas->ClearTexData();
+  atlas->TexWidth = width;
+  atlas->TexHeight = height;
+  atlas->TexPixelsUseColors = use_colors != 0;
+  void *dst = IM_ALLOC(pixels_size);
+  memcpy(dst, pixels, pixels_size);
+  if (bytes_per_pixel == 1) {
+    atlas->TexPixelsAlpha8 = (unsigned char *)dst;
+  } else {
+    atlas->TexPixelsRGBA32 = (unsigned int *)dst;
+  }
+  atlas->TexUvScale = uv_scale;
+  atlas->TexUvWhitePixel = uv_white_pixel;
+  memcpy(atlas->TexUvLines, uv_lines, sizeof(uv_lines));
+  atlas->PackIdMouseCursors = pack_id_mouse_cursors;
+  atlas->PackIdLines = pack_id_lines;
+
+  atlas->CustomRects.resize((int)rect_count);
+  for (uint32_t i = 0; i < rect_count; ++i) {
+    atlas->CustomRects[i] = rects[i];
+    atlas->CustomRects[i].Font =
+        rect_fonts[i] >= 0 ? atlas->Fonts[rect_fonts[i]] : nullptr;
+  }
+
+  for (int i = 0; i < atlas->Fonts.Size; ++i) {
+    ImFont *font = atlas->Fonts[i];
+    auto &src = fonts[i];
+    font->ClearOutputData();
+    font->ContainerAtlas = atlas;
+    // same as ImFontAtlasBuildSetupFont. the first config of the font
+    for (auto &config : atlas->ConfigData) {
+      if (config.DstFont == font) {
+        font->ConfigData = &config;
+        break;
+      }
+    }
+    font->ConfigDataCount = src.config_count;
+    font->FontSize = src.size;
+    font->Scale = src.scale;
+    font->Ascent = src.ascent;
+    font->Descent = src.descent;
+    font->MetricsTotalSurface = src.surface;
+    font->Glyphs.resize((int)src.glyph_count);
+    memcpy(font->Glyphs.Data, src.glyphs, font->Glyphs.size_in_bytes());
+    font->FallbackChar = src.fallback;
+    font->EllipsisChar = src.ellipsis;
+    font->DotChar = src.dot;
+    // IndexAdvanceX, IndexLookup, FallbackGlyph
+    font->BuildLookupTable();
+  }
+  atlas->TexReady = true;
+  return nullptr;
+}
+
+} // namespace pydear_font_cache
@@ -0,0 +1,81 @@
+// Native ImDrawData submission for pydear.backends.impl_opengl3.
+//
+// Python binds the program, vao, blend and viewport once per frame.
+// This walks every ImDrawList / ImDrawCmd and issues the same GL calls as
+// Renderer.render does in Python.
+#pragma once
+#include "gl3_functions.h"
+#include <imgui.h>
+
+namespace pydear_impl_opengl3 {
+
+struct Buffers {
+  pydear_gl::GLuint vbo;
+  pydear_gl::GLuint ibo;
+};
+
+inline void render_draw_data(const ImDrawData *draw_data, int fb_height,
+                             const Buffers &buffers) {
+  using namespace pydear_gl;
+  auto &gl = pydear_gl::gl();
+
+  // project ClipRect to the framebuffer
+  const ImVec2 clip_off = draw_data->DisplayPos;
+  const ImVec2 clip_scale = draw_data->FramebufferScale;
+
+  // skip redundant texture binds and scissor changes
+  bool has_state = false;
+  GLuint last_texture = 0;
+  GLint last_scissor[4] = {};
+
+  for (int n = 0; n < draw_data->CmdListsCount; ++n) {
+    const ImDrawList *cmd_list = draw_data->CmdLists[n];
+
+    gl.BindBuffer(GL_ARRAY_BUFFER, buffers.vbo);
+    gl.BufferData(GL_ARRAY_BUFFER,
+                  (GLsizeiptr)cmd_list->VtxBuffer.Size * sizeof(ImDrawVert),
+                  cmd_list->VtxBuffer.Data, GL_STREAM_DRAW);
+    gl.BindBuffer(GL_ELEMENT_ARRAY_BUFFER, buffers.ibo);
+    gl.BufferData(GL_ELEMENT_ARRAY_BUFFER,
+                  (GLsizeiptr)cmd_list->IdxBuffer.Size * sizeof(ImDrawIdx),
+                  cmd_list->IdxBuffer.Data, GL_STREAM_DRAW);
+
+    for (int i = 0; i < cmd_list->CmdBuffer.Size; ++i) {
+      const ImDrawCmd &cmd = cmd_list->CmdBuffer[i];
+
+      // same truncation as ClipTransform.to_scissor in impl_opengl3.py
+      const ImVec4 &rect = cmd.ClipRect;
+      double x0 = ((double)rect.x - clip_off.x) * clip_scale.x;
+      double y0 = ((double)rect.y - clip_off.y) * clip_scale.y;
+      double x1 = ((double)rect.z - clip_off.x) * clip_scale.x;
+      double y1 = ((double)rect.w - clip_off.y) * clip_scale.y;
+      if (x1 <= x0 || y1 <= y0) {
+        continue;
+      }
+      GLint scissor[4] = {(GLint)x0, (GLint)(fb_height - y1), (GLint)(x1 - x0),
+                          (GLint)(y1 - y0)};
+
+      auto texture = (GLuint)(intptr_t)cmd.TextureId;
+      if (!has_state || texture != last_texture) {
+        gl.BindTexture(GL_TEXTURE_2D, texture);
+        last_texture = texture;
+      }
+
+      if (!has_state || scissor[0] != last_scissor[0] ||
+          scissor[1] != last_scissor[1] || scissor[2] != last_scissor[2] ||
+          scissor[3] != last_scissor[3]) {
+        gl.Scissor(scissor[0], scissor[1], scissor[2], scissor[3]);
+        for (int j = 0; j < 4; ++j) {
+          last_scissor[j] = scissor[j];
+        }
+      }
+      has_state = true;
+
+      gl.DrawElements(GL_TRIANGLES, (GLsizei)cmd.ElemCount, GL_UNSIGNED_SHORT,
+                      (const void *)(intptr_t)(cmd.IdxOffset *
+                                               sizeof(ImDrawIdx)));
+    }
+  }
+}
+
+} // namespace pydear_impl_opengl3
@@ -0,0 +1,241 @@
+// Native NVGdrawData submission for pydear.nanovg_backends.nanovg_impl_opengl3.
+//
+// Python uploads the vertices and uniforms, binds the program and vao once
+// per frame. The vao points to the uploaded vertices, so the vertex offsets
+// of the calls and paths are used as is. This walks every GLNVGcall and issues the same GL calls as
+// Renderer.fill / convexFill / stroke / triangles do in Python.
+#pragma once
+#include "gl3_functions.h"
+#include <nanovg.h>
+
+namespace pydear_nanovg_opengl3 {
+
+struct Context {
+  pydear_gl::GLuint ubo;
+  // byte offset of NVGdrawData.pUniform in the ubo
+  int uniform_base;
+  // aligned sizeof(GLNVGfragUniforms). Pipeline._fragSize
+  int frag_size;
+  // image id => gl texture. 0 is no texture
+  const pydear_gl::GLuint *textures;
+  int texture_count;
+};
+
+inline pydear_gl::GLenum blend_factor(int factor) {
+  using namespace pydear_gl;
+  switch (factor) {
+  case NVG_ZERO:
+    return GL_ZERO;
+  case NVG_ONE:
+    return GL_ONE;
+  case NVG_SRC_COLOR:
+    return GL_SRC_COLOR;
+  case NVG_ONE_MINUS_SRC_COLOR:
+    return GL_ONE_MINUS_SRC_COLOR;
+  case NVG_DST_COLOR:
+    return GL_DST_COLOR;
+  case NVG_ONE_MINUS_DST_COLOR:
+    return GL_ONE_MINUS_DST_COLOR;
+  case NVG_SRC_ALPHA:
+    return GL_SRC_ALPHA;
+  case NVG_ONE_MINUS_SRC_ALPHA:
+    return GL_ONE_MINUS_SRC_ALPHA;
+  case NVG_DST_ALPHA:
+    return GL_DST_ALPHA;
+  case NVG_ONE_MINUS_DST_ALPHA:
+    return GL_ONE_MINUS_DST_ALPHA;
+  case NVG_SRC_ALPHA_SATURATE:
+    return GL_SRC_ALPHA_SATURATE;
+  default:
+    return GL_INVALID_ENUM;
+  }
+}
+
+struct Blend {
+  pydear_gl::GLenum src_rgb = 0;
+  pydear_gl::GLenum dst_rgb = 0;
+  pydear_gl::GLenum src_alpha = 0;
+  pydear_gl::GLenum dst_alpha = 0;
+
+  bool operator==(const Blend &rhs) const {
+    return src_rgb == rhs.src_rgb && dst_rgb == rhs.dst_rgb &&
+           src_alpha == rhs.src_alpha && dst_alpha == rhs.dst_alpha;
+  }
+  bool operator!=(const Blend &rhs) const { return !(*this == rhs); }
+};
+
+// same as blendCompositeOperation in nanovg_impl_opengl3.py
+template <typename T> Blend composite_operation(const T &op) {
+  using namespace pydear_gl;
+  Blend blend{blend_factor(op.srcRGB), blend_factor(op.dstRGB),
+              blend_factor(op.srcAlpha), blend_factor(op.dstAlpha)};
+  if (blend.src_rgb == GL_INVALID_ENUM || blend.dst_rgb == GL_INVALID_ENUM ||
+      blend.src_alpha == GL_INVALID_ENUM ||
+      blend.dst_alpha == GL_INVALID_ENUM) {
+    return {GL_ONE, GL_ONE_MINUS_SRC_ALPHA, GL_ONE, GL_ONE_MINUS_SRC_ALPHA};
+  }
+  return blend;
+}
+
+// the state after Renderer.__enter__
+class State {
+  const Context &m_context;
+  Blend m_blend;
+  pydear_gl::GLuint m_texture = 0;
+  pydear_gl::GLuint m_stencil_mask = 0xffffffff;
+  pydear_gl::GLenum m_stencil_func = pydear_gl::GL_ALWAYS;
+  pydear_gl::GLint m_stencil_ref = 0;
+  pydear_gl::GLuint m_stencil_func_mask = 0xffffffff;
+
+public:
+  State(const Context &context) : m_context(context) {}
+
+  void blend(const Blend &blend) {
+    if (blend != m_blend) {
+      m_blend = blend;
+      pydear_gl::gl().BlendFuncSeparate(blend.src_rgb, blend.dst_rgb,
+                                        blend.src_alpha, blend.dst_alpha);
+    }
+  }
+
+  void uniforms(int offset) {
+    pydear_gl::gl().BindBufferRange(pydear_gl::GL_UNIFORM_BUFFER, 0,
+                                    m_context.ubo,
+                                    m_context.uniform_base + offset,
+                                    sizeof(GLNVGfragUniforms));
+  }
+
+  void texture(int image) {
+    pydear_gl::GLuint texture = 0;
+    if (image > 0 && image < m_context.texture_count) {
+      texture = m_context.textures[image];
+    }
+    if (texture != m_texture) {
+      m_texture = texture;
+      pydear_gl::gl().BindTexture(pydear_gl::GL_TEXTURE_2D, texture);
+    }
+  }
+
+  void stencil_mask(pydear_gl::GLuint mask) {
+    if (mask != m_stencil_mask) {
+      m_stencil_mask = mask;
+      pydear_gl::gl().StencilMask(mask);
+    }
+  }
+
+  void stencil_func(pydear_gl::GLenum func, pydear_gl::GLint ref,
+                    pydear_gl::GLuint mask) {
+    if (func != m_stencil_func || ref != m_stencil_ref ||
+        mask != m_stencil_func_mask) {
+      m_stencil_func = func;
+      m_stencil_ref = ref;
+      m_stencil_func_mask = mask;
+      pydear_gl::gl().StencilFunc(func, ref, mask);
+    }
+  }
+};
+
+inline void fill(State &state, const Context &context, const GLNVGcall &call,
+                 const GLNVGpath *paths) {
+  using namespace pydear_gl;
+  auto &gl = pydear_gl::gl();
+
+  // Draw shapes
+  gl.Enable(GL_STENCIL_TEST);
+  state.stencil_mask(0xff);
+  state.stencil_func(GL_ALWAYS, 0, 0xff);
+  gl.ColorMask(GL_FALSE, GL_FALSE, GL_FALSE, GL_FALSE);
+
+  // set bindpoint for solid loc
+  state.uniforms(call.uniformOffset);
+  state.texture(0);
+
+  gl.StencilOpSeparate(GL_FRONT, GL_KEEP, GL_KEEP, GL_INCR_WRAP);
+  gl.StencilOpSeparate(GL_BACK, GL_KEEP, GL_KEEP, GL_DECR_WRAP);
+  gl.Disable(GL_CULL_FACE);
+  for (int i = 0; i < call.pathCount; ++i) {
+    gl.DrawArrays(GL_TRIANGLE_FAN, paths[i].fillOffset, paths[i].fillCount);
+  }
+  gl.Enable(GL_CULL_FACE);
+
+  // Draw anti-aliased pixels
+  gl.ColorMask(GL_TRUE, GL_TRUE, GL_TRUE, GL_TRUE);
+
+  state.uniforms(call.uniformOffset + context.frag_size);
+  state.texture(call.image);
+
+  // Draw fill
+  state.stencil_func(GL_NOTEQUAL, 0x0, 0xff);
+  gl.StencilOp(GL_ZERO, GL_ZERO, GL_ZERO);
+  gl.DrawArrays(GL_TRIANGLE_STRIP, call.triangleOffset, call.triangleCount);
+
+  gl.Disable(GL_STENCIL_TEST);
+}
+
+inline void convex_fill(State &state, const GLNVGcall &call,
+                        const GLNVGpath *paths) {
+  using namespace pydear_gl;
+  auto &gl = pydear_gl::gl();
+
+  state.uniforms(call.uniformOffset);
+  state.texture(call.image);
+
+  for (int i = 0; i < call.pathCount; ++i) {
+    gl.DrawArrays(GL_TRIANGLE_FAN, paths[i].fillOffset, paths[i].fillCount);
+    // Draw fringes
+    if (paths[i].strokeCount > 0) {
+      gl.DrawArrays(GL_TRIANGLE_STRIP, paths[i].strokeOffset,
+                    paths[i].strokeCount);
+    }
+  }
+}
+
+inline void stroke(State &state, const GLNVGcall &call,
+                   const GLNVGpath *paths) {
+  using namespace pydear_gl;
+  auto &gl = pydear_gl::gl();
+
+  state.uniforms(call.uniformOffset);
+  state.texture(call.image);
+  // Draw Strokes
+  for (int i = 0; i < call.pathCount; ++i) {
+    gl.DrawArrays(GL_TRIANGLE_STRIP, paths[i].strokeOffset,
+                  paths[i].strokeCount);
+  }
+}
+
+inline void triangles(State &state, const GLNVGcall &call) {
+  using namespace pydear_gl;
+  state.uniforms(call.uniformOffset);
+  state.texture(call.image);
+  pydear_gl::gl().DrawArrays(GL_TRIANGLES, call.triangleOffset,
+                             call.triangleCount);
+}
+
+inline void render_draw_data(const NVGdrawData *data, const Context &context) {
+  auto calls = (const GLNVGcall *)data->drawData;
+  auto paths = (const GLNVGpath *)data->pPath;
+  State state(context);
+  for (int i = 0; i < data->drawCount; ++i) {
+    const GLNVGcall &call = calls[i];
+    state.blend(composite_operation(call.blendFunc));
+    switch (call.type) {
+    case GLNVG_FILL:
+      fill(state, context, call, paths + call.pathOffset);
+      break;
+    case GLNVG_CONVEXFILL:
+      convex_fill(state, call, paths + call.pathOffset);
+      break;
+    case GLNVG_STROKE:
+      stroke(state, call, paths + call.pathOffset);
+      break;
+    case GLNVG_TRIANGLES:
+      triangles(state, call);
+      break;
+    default:
+      break;
+    }
+  }
+}
+
+} // namespace pydear_nanovg_opengl3
@@ -66,6 +66,7 @@ setuptools.setup(
         'pydear',
         'pydear.backends',
         'pydear.utils',
+        'pydear.bench',
     ],
     package_data={
         'pydear': ['py.typed', '*.pyi', 'assets/*']
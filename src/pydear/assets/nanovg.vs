@@ -1,5 +1,7 @@
 #version 330
 uniform vec2 viewSize;
+// Picture to view. identity for the immediate draw data
+uniform mat3 transform;
 in vec2 vertex;
 in vec2 tcoord;
 out vec2 ftcoord;
@@ -7,7 +9,9 @@ out vec2 fpos;
 
 void main(void) {
   ftcoord = tcoord;
+  // the paint and scissor of the fragment shader are in the recorded space
   fpos = vertex;
-  gl_Position = vec4(2.0 * vertex.x / viewSize.x - 1.0,
-                     1.0 - 2.0 * vertex.y / viewSize.y, 0, 1);
+  vec2 p = (transform * vec3(vertex, 1.0)).xy;
+  gl_Position = vec4(2.0 * p.x / viewSize.x - 1.0,
+                     1.0 - 2.0 * p.y / viewSize.y, 0, 1);
 }
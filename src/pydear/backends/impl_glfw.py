@@ -1,5 +1,8 @@
+from typing import Optional
 import glfw
 from pydear import imgui as ImGui
+from pydear.utils.profiler import PROFILER
+from pydear.utils.frame_scheduler import FrameScheduler
 
 
 def compute_fb_scale(window_size: ImGui.ImVec2, frame_buffer_size: ImGui.ImVec2) -> ImGui.ImVec2:
@@ -122,7 +125,10 @@ GLFW_TO_IMGUI = {
 
 
 class ImplGlfwInput:
-    def __init__(self, window, attach_callbacks=True):
+    def __init__(self, window, attach_callbacks=True, *, scheduler: Optional[FrameScheduler] = None):
+        '''
+        scheduler: GlfwApp.scheduler. input requests frames to settle the ImGui layout.
+        '''
         if not ImGui.GetCurrentContext():
             raise RuntimeError(
                 "No valid ImGui context. Use imgui.create_context() first and/or "
@@ -132,6 +138,7 @@ class ImplGlfwInput:
         self.io.DeltaTime = 1.0 / 60.0
 
         self.window = window
+        self.scheduler = scheduler
 
         if attach_callbacks:
             glfw.set_key_callback(self.window, self._keyboard_callback)
@@ -155,27 +162,39 @@ class ImplGlfwInput:
     def _set_clipboard_text(self, text):
         glfw.set_clipboard_string(self.window, text)
 
+    def _request_redraw(self):
+        # ImGui hides appearing and auto resized windows in the first frame
+        if self.scheduler:
+            self.scheduler.request_redraw()
+
     def _keyboard_callback(self, window, key, scancode, action, mods):
         imgui_key = GLFW_TO_IMGUI.get(key)
         if imgui_key is not None:
             self.io.AddKeyEvent(imgui_key.value, action == glfw.PRESS)
+        self._request_redraw()
 
     def _char_callback(self, window, char):
         if 0 < char < 0x10000:
             self.io.AddInputCharacter(char)
+        self._request_redraw()
 
     def _resize_callback(self, window, width, height):
         self.io.DisplaySize = ImGui.ImVec2(width, height)
+        self._request_redraw()
 
     def _mouse_button_callback(self, window, button, action, mods):
         self.io.AddMouseButtonEvent(button, action == glfw.PRESS)
+        self._request_redraw()
 
     def _mouse_position_callback(self,  window, x, y):
         self.io.AddMousePosEvent(x, y)
+        self._request_redraw()
 
     def _scroll_callback(self, window, x_offset, y_offset):
         self.io.AddMouseWheelEvent(x_offset, y_offset)
+        self._request_redraw()
 
+    @PROFILER.section('input')
     def process_inputs(self):
         window_size = ImGui.ImVec2(*glfw.get_window_size(self.window))
         fb_size = ImGui.ImVec2(*glfw.get_framebuffer_size(self.window))
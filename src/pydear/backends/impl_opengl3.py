@@ -1,9 +1,12 @@
-from typing import Optional
+from typing import Optional, Callable, List, Tuple, NamedTuple, Dict
 import ctypes
 import logging
 import contextlib
+import dataclasses
 from OpenGL import GL
 from pydear import imgui as ImGui
+from pydear.utils.gpu_timer import GpuTimer
+from .stream_buffer import StreamBuffer, UploadStats
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +42,83 @@ void main() {
 }
 """
 
+# glMultiDrawElementsBaseVertex with a clip rect per draw instead of glScissor
+MULTI_DRAW_MAX = 128
+
+MULTI_DRAW_VERTEX_SHADER_SRC = f"""
+#version 330
+#extension GL_ARB_shader_draw_parameters : require
+
+uniform mat4 ProjMtx;
+// x0, y0, x1, y1 in window coordinates
+uniform vec4 ClipRects[{MULTI_DRAW_MAX}];
+in vec2 Position;
+in vec2 UV;
+in vec4 Color;
+out vec2 Frag_UV;
+out vec4 Frag_Color;
+flat out vec4 Frag_Clip;
+
+void main() {{
+    Frag_UV = UV;
+    Frag_Color = Color;
+    Frag_Clip = ClipRects[gl_DrawIDARB];
+
+    gl_Position = ProjMtx * vec4(Position.xy, 0, 1);
+}}
+"""
+
+MULTI_DRAW_FRAGMENT_SHADER_SRC = """
+#version 330
+
+uniform sampler2D Texture;
+in vec2 Frag_UV;
+in vec4 Frag_Color;
+flat in vec4 Frag_Clip;
+out vec4 Out_Color;
+
+void main() {
+    // same pixels as glScissor(x0, y0, x1 - x0, y1 - y0)
+    if (gl_FragCoord.x < Frag_Clip.x || gl_FragCoord.y < Frag_Clip.y
+        || gl_FragCoord.x >= Frag_Clip.z || gl_FragCoord.y >= Frag_Clip.w) {
+        discard;
+    }
+    Out_Color = Frag_Color * texture(Texture, Frag_UV.st);
+}
+"""
+
+
+def has_shader_draw_parameters() -> bool:
+    '''
+    gl_DrawIDARB (GL-4.6 or GL_ARB_shader_draw_parameters)
+    '''
+    try:
+        count = GL.glGetIntegerv(GL.GL_NUM_EXTENSIONS)
+        for i in range(int(count)):
+            if GL.glGetStringi(GL.GL_EXTENSIONS, i) == b'GL_ARB_shader_draw_parameters':
+                return bool(GL.glMultiDrawElementsBaseVertex)
+    except Exception:
+        pass
+    return False
+
+
+def load_native(get_proc_address: Optional[Callable[[str], int]] = None) -> bool:
+    '''
+    resolve gl functions for the native draw path in pydear.impl.
+
+    require current gl context.
+    '''
+    if not hasattr(ImGui, 'Custom_ImplOpenGL3_RenderDrawData'):
+        logger.warning('pydear.impl is built without native renderer')
+        return False
+    if not get_proc_address:
+        import glfw
+        get_proc_address = glfw.get_proc_address
+    if not ImGui.Custom_GL_Load(get_proc_address):
+        logger.warning('fail to load gl functions for native renderer')
+        return False
+    return True
+
 
 @contextlib.contextmanager
 def save_texture():
@@ -129,26 +209,45 @@ def save_render_state():
 
 
 class Shader:
-    def __init__(self) -> None:
+    '''
+    base: share the vertex attribute locations of base, to use the same vao.
+    '''
+
+    def __init__(self, vertex_shader_src=VERTEX_SHADER_SRC, fragment_shader_src=FRAGMENT_SHADER_SRC, *,
+                 base: Optional['Shader'] = None) -> None:
         self._shader_handle = GL.glCreateProgram()
         # note: no need to store shader parts handles after linking
         vertex_shader = GL.glCreateShader(GL.GL_VERTEX_SHADER)
         fragment_shader = GL.glCreateShader(GL.GL_FRAGMENT_SHADER)
 
-        GL.glShaderSource(vertex_shader, VERTEX_SHADER_SRC)
-        GL.glShaderSource(fragment_shader, FRAGMENT_SHADER_SRC)
+        GL.glShaderSource(vertex_shader, vertex_shader_src)
+        GL.glShaderSource(fragment_shader, fragment_shader_src)
         GL.glCompileShader(vertex_shader)
         GL.glCompileShader(fragment_shader)
 
         GL.glAttachShader(self._shader_handle, vertex_shader)
         GL.glAttachShader(self._shader_handle, fragment_shader)
 
+        if base:
+            GL.glBindAttribLocation(
+                self._shader_handle, base._attrib_location_position, "Position")
+            GL.glBindAttribLocation(
+                self._shader_handle, base._attrib_location_uv, "UV")
+            GL.glBindAttribLocation(
+                self._shader_handle, base._attrib_location_color, "Color")
+
         GL.glLinkProgram(self._shader_handle)
 
         # note: after linking shaders can be removed
         GL.glDeleteShader(vertex_shader)
         GL.glDeleteShader(fragment_shader)
 
+        if not GL.glGetProgramiv(self._shader_handle, GL.GL_LINK_STATUS):
+            info = GL.glGetProgramInfoLog(self._shader_handle)
+            GL.glDeleteProgram(self._shader_handle)
+            self._shader_handle = 0
+            raise RuntimeError(info)
+
         self._attrib_location_tex = GL.glGetUniformLocation(
             self._shader_handle, "Texture")
         self._attrib_proj_mtx = GL.glGetUniformLocation(
@@ -159,6 +258,11 @@ class Shader:
             self._shader_handle, "UV")
         self._attrib_location_color = GL.glGetAttribLocation(
             self._shader_handle, "Color")
+        self._clip_rects = GL.glGetUniformLocation(
+            self._shader_handle, "ClipRects")
+        # uniforms are kept in the program. rewrite only when changed
+        self._ortho_projection = (ctypes.c_float * 16)()
+        self._ortho_rect: Optional[Tuple[float, float, float, float]] = None
 
     def __del__(self):
         if self._shader_handle:
@@ -180,18 +284,34 @@ class Shader:
             self._attrib_location_color, 4, GL.GL_UNSIGNED_BYTE, GL.GL_TRUE,
             20, ctypes.c_void_p(16))
 
-    def use(self, w: float, h: float):
-        ortho_projection = (ctypes.c_float * 16)(
-            2.0/w, 0.0,                   0.0, 0.0,
-            0.0,               2.0/-h,   0.0, 0.0,
-            0.0,               0.0,                  -1.0, 0.0,
-            -1.0,               1.0,                   0.0, 1.0
-        )
+    def use(self, x: float, y: float, w: float, h: float):
+        '''
+        x, y, w, h: ImDrawData.DisplayPos and DisplaySize
+        '''
         GL.glUseProgram(self._shader_handle)
-        GL.glUniform1i(self._attrib_location_tex, 0)
+        rect = (x, y, w, h)
+        if rect == self._ortho_rect:
+            return
+        L = x
+        R = x + w
+        T = y
+        B = y + h
+        m = self._ortho_projection
+        m[0] = 2.0 / (R - L)
+        m[5] = 2.0 / (T - B)
+        m[10] = -1.0
+        m[12] = (R + L) / (L - R)
+        m[13] = (T + B) / (B - T)
+        m[15] = 1.0
+        if not self._ortho_rect:
+            GL.glUniform1i(self._attrib_location_tex, 0)
         GL.glUniformMatrix4fv(
             self._attrib_proj_mtx, 1,
-            GL.GL_FALSE, ortho_projection)
+            GL.GL_FALSE, m)
+        self._ortho_rect = rect
+
+    def set_clip_rects(self, clip_rects: ctypes.Array, count: int):
+        GL.glUniform4fv(self._clip_rects, count, clip_rects)
 
 
 class Texture:
@@ -217,49 +337,243 @@ class Texture:
         return ctypes.c_void_p(int(self._font_texture))
 
 
-class VertexBuffer:
+@dataclasses.dataclass
+class RenderStats(UploadStats):
+    '''
+    counters of the last frame.
+    '''
+    draw_calls: int = 0
+    texture_binds: int = 0
+    scissor_changes: int = 0
+    sampler_binds: int = 0
+    # ImDrawCmd drawn by the previous draw call
+    merged_commands: int = 0
+
+
+class StateCache:
+    '''
+    skip texture binds and scissor changes that do not change the GL state.
+    '''
+
+    def __init__(self, stats: RenderStats) -> None:
+        self.stats = stats
+        self.texture: Optional[int] = None
+        self.scissor: Optional[Tuple[int, int, int, int]] = None
+        # texture => sampler object. Renderer.set_sampler
+        self.samplers: Dict[int, int] = {}
+        self.sampler = 0
+
+    def reset(self):
+        self.texture = None
+        self.scissor = None
+        self.sampler = 0
+
+    def bind_texture(self, texture: int):
+        if texture != self.texture:
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+            self.texture = texture
+            self.stats.texture_binds += 1
+            if self.samplers:
+                sampler = self.samplers.get(texture, 0)
+                if sampler != self.sampler:
+                    GL.glBindSampler(0, sampler)
+                    self.sampler = sampler
+                    self.stats.sampler_binds += 1
+
+    def unbind_sampler(self):
+        if self.sampler:
+            GL.glBindSampler(0, 0)
+            self.sampler = 0
+
+    def set_scissor(self, scissor: Tuple[int, int, int, int]):
+        if scissor != self.scissor:
+            GL.glScissor(*scissor)
+            self.scissor = scissor
+            self.stats.scissor_changes += 1
+
+
+class ClipTransform(NamedTuple):
+    '''
+    ImDrawCmd.ClipRect to the framebuffer.
+    '''
+    # ImDrawData.DisplayPos
+    offset_x: float
+    offset_y: float
+    # ImDrawData.FramebufferScale
+    scale_x: float
+    scale_y: float
+    fb_height: int
+
+    def to_scissor(self, rect: ImGui.ImVec4) -> Optional[Tuple[int, int, int, int]]:
+        '''
+        return glScissor x, y, w, h. None if empty.
+        '''
+        x0 = (rect.x - self.offset_x) * self.scale_x
+        y0 = (rect.y - self.offset_y) * self.scale_y
+        x1 = (rect.z - self.offset_x) * self.scale_x
+        y1 = (rect.w - self.offset_y) * self.scale_y
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (int(x0), int(self.fb_height - y1), int(x1 - x0), int(y1 - y0))
+
+
+class MultiDrawBatch:
+    '''
+    preallocated arguments of glMultiDrawElementsBaseVertex.
+    consecutive ImDrawCmd that share a texture.
+    '''
+
     def __init__(self) -> None:
-        self._vbo_handle = GL.glGenBuffers(1)
-        self._vio_handle = GL.glGenBuffers(1)
+        self.counts = (ctypes.c_int * MULTI_DRAW_MAX)()
+        self.indices = (ctypes.c_void_p * MULTI_DRAW_MAX)()
+        self.base_vertices = (ctypes.c_int * MULTI_DRAW_MAX)()
+        self.clip_rects = (ctypes.c_float * (4 * MULTI_DRAW_MAX))()
+        self.texture = 0
+        self.size = 0
+
+    def clear(self):
+        self.size = 0
+
+    def is_full(self) -> bool:
+        return self.size >= MULTI_DRAW_MAX
+
+    def push(self, count: int, index_offset: int, base_vertex: int, scissor: Tuple[int, int, int, int]):
+        i = self.size
+        self.counts[i] = count
+        self.indices[i] = index_offset
+        self.base_vertices[i] = base_vertex
+        x, y, w, h = scissor
+        self.clip_rects[i * 4] = x
+        self.clip_rects[i * 4 + 1] = y
+        self.clip_rects[i * 4 + 2] = x + w
+        self.clip_rects[i * 4 + 3] = y + h
+        self.size = i + 1
+
+
+# sizeof(ImDrawVert)
+VERTEX_SIZE = 20
+# sizeof(ImDrawIdx)
+INDEX_SIZE = 2
+
+
+class VertexBuffer:
+    '''
+    vertices and indices are appended to StreamBuffer in a frame.
+    draw with the base vertex of the last uploaded command list.
+    '''
+
+    def __init__(self, enable_attributes: Callable[[], None], *,
+                 stats: Optional[UploadStats] = None, persistent: Optional[bool] = None) -> None:
+        self._enable_attributes = enable_attributes
         self._vao_handle = GL.glGenVertexArrays(1)
         GL.glBindVertexArray(self._vao_handle)
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._vbo_handle)
+        # base vertex = offset // VERTEX_SIZE in all segments
+        self._vbo = StreamBuffer(
+            GL.GL_ARRAY_BUFFER, stats=stats, persistent=persistent, stride=VERTEX_SIZE)
+        self._vio = StreamBuffer(
+            GL.GL_ELEMENT_ARRAY_BUFFER, stats=stats, persistent=persistent)
+        self._vao_vbo = 0
+        self._vao_vio = 0
+        self._update_vao()
+        self._base_vertex = 0
+        self._index_offset = 0
 
     def __del__(self):
         if self._vao_handle:
             logger.debug(f'delete vao: {self._vao_handle}')
             GL.glDeleteVertexArrays(1, [self._vao_handle])
-        if self._vbo_handle > -1:
-            logger.debug(f'delete vbo: {self._vbo_handle}')
-            GL.glDeleteBuffers(1, [self._vbo_handle])
-        if self._vio_handle > -1:
-            logger.debug(f'delete vio: {self._vio_handle}')
-            GL.glDeleteBuffers(1, [self._vio_handle])
-        self._vao_handle = self._vbo_handle = self._vio_handle = 0
+        self._vao_handle = 0
+        del self._vbo
+        del self._vio
+
+    def _update_vao(self):
+        '''
+        bound vao. a persistent buffer is recreated when it grows.
+        '''
+        if self._vao_vbo != self._vbo.handle:
+            self._vbo.bind()
+            self._enable_attributes()
+            self._vao_vbo = self._vbo.handle
+        if self._vao_vio != self._vio.handle:
+            self._vio.bind()
+            self._vao_vio = self._vio.handle
 
     def bind(self):
         GL.glBindVertexArray(self._vao_handle)
 
+    def begin_frame(self):
+        self._vbo.begin_frame()
+        self._vio.begin_frame()
+
+    def end_frame(self):
+        self._vbo.end_frame()
+        self._vio.end_frame()
+
     def data(self, vertices: ctypes.c_void_p, vertices_size: int, indices: ctypes.c_void_p, indices_size: int):
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._vbo_handle)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices_size,
-                        vertices, GL.GL_STREAM_DRAW)
-        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self._vio_handle)
-        GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, indices_size,
-                        indices, GL.GL_STREAM_DRAW)
+        vertex_offset = self._vbo.upload(vertices, vertices_size, VERTEX_SIZE)
+        self._index_offset = self._vio.upload(indices, indices_size, 4)
+        self._update_vao()
+        self._base_vertex = vertex_offset // VERTEX_SIZE
+
+    def data_lists(self, command_lists: List[ImGui.ImDrawList]) -> List[Tuple[int, int]]:
+        '''
+        upload all command lists by one transfer.
+        return (base vertex, index byte offset) of each command list.
+        '''
+        vertex_offset = self._vbo.upload_chunks(
+            [(command_list.VtxBuffer.Data, command_list.VtxBuffer.Size * VERTEX_SIZE)
+             for command_list in command_lists], VERTEX_SIZE)
+        index_offset = self._vio.upload_chunks(
+            [(command_list.IdxBuffer.Data, command_list.IdxBuffer.Size * INDEX_SIZE)
+             for command_list in command_lists], 4)
+        self._update_vao()
+
+        offsets = []
+        base_vertex = vertex_offset // VERTEX_SIZE
+        for command_list in command_lists:
+            offsets.append((base_vertex, index_offset))
+            base_vertex += command_list.VtxBuffer.Size
+            index_offset += command_list.IdxBuffer.Size * INDEX_SIZE
+        return offsets
+
+    def select(self, base_vertex: int, index_offset: int):
+        self._base_vertex = base_vertex
+        self._index_offset = index_offset
+
+    def draw_native(self, draw_data: ImGui.ImDrawData, fb_height: int):
+        ImGui.Custom_ImplOpenGL3_RenderDrawData(
+            draw_data, fb_height, int(self._vbo.handle), int(self._vio.handle))
+
+    def multi_draw(self, batch: MultiDrawBatch):
+        GL.glMultiDrawElementsBaseVertex(
+            GL.GL_TRIANGLES, batch.counts, GL.GL_UNSIGNED_SHORT,
+            batch.indices, batch.size, batch.base_vertices)
 
     def draw(self, offset: int, count: int):
-        GL.glDrawElements(
+        GL.glDrawElementsBaseVertex(
             GL.GL_TRIANGLES, count,
-            GL.GL_UNSIGNED_SHORT, ctypes.c_void_p(offset))
+            GL.GL_UNSIGNED_SHORT, ctypes.c_void_p(
+                self._index_offset + offset),
+            self._base_vertex)
 
 
 class Resource:
-    def __init__(self) -> None:
+    def __init__(self, *, stats: Optional[UploadStats] = None, persistent: Optional[bool] = None,
+                 multi_draw=False) -> None:
         with save_state():
             self._shader = Shader()
-            self._vertices = VertexBuffer()
-            self._shader.enable_attributes()
+            self._vertices = VertexBuffer(
+                self._shader.enable_attributes, stats=stats, persistent=persistent)
+            self._multi_draw_shader: Optional[Shader] = None
+            if multi_draw:
+                if has_shader_draw_parameters():
+                    try:
+                        self._multi_draw_shader = Shader(
+                            MULTI_DRAW_VERTEX_SHADER_SRC, MULTI_DRAW_FRAGMENT_SHADER_SRC, base=self._shader)
+                    except RuntimeError as ex:
+                        logger.warning(f'multi draw shader: {ex}')
+                else:
+                    logger.warning('GL_ARB_shader_draw_parameters is required')
         # save texture state
         with save_texture():
 
@@ -282,48 +596,118 @@ class Resource:
     def __del__(self):
         del self._vertices
         del self._shader
+        del self._multi_draw_shader
         del self._texture
 
-    def bind(self, width: float, height: float):
-        self._shader.use(width, height)
+    @property
+    def has_multi_draw(self) -> bool:
+        return self._multi_draw_shader is not None
+
+    def bind(self, x: float, y: float, width: float, height: float, *, multi_draw=False):
+        if multi_draw:
+            assert self._multi_draw_shader
+            self._multi_draw_shader.use(x, y, width, height)
+        else:
+            self._shader.use(x, y, width, height)
         self._vertices.bind()
 
+    def begin_frame(self):
+        self._vertices.begin_frame()
+
+    def end_frame(self):
+        self._vertices.end_frame()
+
     def update_vertex_buffer(self, vertice: ctypes.c_void_p, vertices_byte_size: int, indices: ctypes.c_void_p, indices_byte_size: int):
         self._vertices.data(vertice, vertices_byte_size,
                             indices, indices_byte_size)
 
+    def update_vertex_buffer_lists(self, command_lists: List[ImGui.ImDrawList]) -> List[Tuple[int, int]]:
+        return self._vertices.data_lists(command_lists)
+
+    def select_command_list(self, base_vertex: int, index_offset: int):
+        self._vertices.select(base_vertex, index_offset)
+
     def draw(self, offset: int, draw_count: int):
         self._vertices.draw(offset, draw_count)
 
+    def multi_draw(self, batch: MultiDrawBatch):
+        assert self._multi_draw_shader
+        self._multi_draw_shader.set_clip_rects(batch.clip_rects, batch.size)
+        self._vertices.multi_draw(batch)
 
-class Renderer:
-    """Basic OpenGL integration base class."""
+    def draw_native(self, draw_data: ImGui.ImDrawData, fb_height: int):
+        self._vertices.draw_native(draw_data, fb_height)
 
-    def __init__(self):
+
+class Renderer:
+    """Basic OpenGL integration base class.
+
+    use_native: submit ImDrawData from pydear.impl instead of the python loop.
+    persistent: use persistently mapped vertex buffers. None is auto detect(GL-4.4).
+    consolidate: upload all ImDrawList by one transfer per frame.
+    save_state: backup and restore GL state around render.
+        False when the application owns all GL state and resets it every frame.
+    multi_draw: draw consecutive ImDrawCmd that share a texture by one glMultiDrawElementsBaseVertex.
+        clipping is done in the fragment shader. require GL_ARB_shader_draw_parameters.
+    stats: counters of the last frame.
+    gpu_timer: GPU time of render. enabled by Profiler.gpu_enabled.
+    set_sampler: sample a texture by a sampler object. ex: texture_atlas.TextureAtlas.
+    """
+
+    def __init__(self, *, use_native=False, get_proc_address: Optional[Callable[[str], int]] = None,
+                 persistent: Optional[bool] = None, consolidate=True, save_state=True,
+                 multi_draw=False):
         self.resource: Optional[Resource] = None
+        self.use_native = use_native
+        self._get_proc_address = get_proc_address
+        self._persistent = persistent
+        self.consolidate = consolidate
+        self.save_state = save_state
+        self.multi_draw = multi_draw
+        self.stats = RenderStats()
+        self._state = StateCache(self.stats)
+        self._batch = MultiDrawBatch()
+        self.gpu_timer = GpuTimer('gpu:imgui')
 
     def __del__(self):
         del self.resource
+        self.gpu_timer.delete()
         io = ImGui.GetIO()
         io.Fonts.TexID = ctypes.c_void_p()
 
+    def set_sampler(self, texture: int, sampler: int):
+        '''
+        0 removes. not used by the native renderer.
+        '''
+        if sampler:
+            self._state.samplers[texture] = sampler
+        else:
+            self._state.samplers.pop(texture, None)
+
     def render(self, draw_data: ImGui.ImDrawData):
+        self.stats.reset()
         if not self.resource:
-            self.resource = Resource()
-
-        io = ImGui.GetIO()
-
-        display_width = io.DisplaySize.x
-        display_height = io.DisplaySize.y
-        fb_width = int(display_width * io.DisplayFramebufferScale.x)
-        fb_height = int(display_height * io.DisplayFramebufferScale.y)
-        if fb_width == 0 or fb_height == 0:
+            if self.use_native:
+                self.use_native = load_native(self._get_proc_address)
+            self.resource = Resource(
+                stats=self.stats,
+                # native path reallocates buffers by glBufferData
+                persistent=False if self.use_native else self._persistent,
+                multi_draw=self.multi_draw and not self.use_native)
+            if not self.resource.has_multi_draw:
+                self.multi_draw = False
+
+        display_pos = draw_data.DisplayPos
+        display_size = draw_data.DisplaySize
+        fb_scale = draw_data.FramebufferScale
+        fb_width = int(display_size.x * fb_scale.x)
+        fb_height = int(display_size.y * fb_scale.y)
+        if fb_width <= 0 or fb_height <= 0:
             return
+        clip = ClipTransform(display_pos.x, display_pos.y,
+                             fb_scale.x, fb_scale.y, fb_height)
 
-        # ToDo:
-        # draw_data.scale_clip_rects(io.FramebufferScale.x, io.FramebufferScale.y)
-
-        with save_render_state():
+        with self.gpu_timer, save_render_state() if self.save_state else contextlib.nullcontext():
             GL.glEnable(GL.GL_BLEND)
             GL.glBlendEquation(GL.GL_FUNC_ADD)
             GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
@@ -334,28 +718,107 @@ class Renderer:
 
             GL.glViewport(0, 0, int(fb_width), int(fb_height))
 
-            self.resource.bind(fb_width, fb_height)
-            for p_command_list in ImGui.iterate(draw_data.CmdLists, ctypes.POINTER(ImGui.ImDrawList), draw_data.CmdListsCount):
-                command_list = p_command_list[0]
-
-                self.resource.update_vertex_buffer(
-                    ctypes.c_void_p(
-                        command_list.VtxBuffer.Data), command_list.VtxBuffer.Size * 20,
-                    ctypes.c_void_p(
-                        command_list.IdxBuffer.Data), command_list.IdxBuffer.Size * 2
-                )
-
-                idx_buffer_offset = 0
-                for command in command_list.CmdBuffer.each(ImGui.ImDrawCmd):
-                    if command.TextureId:
-                        GL.glBindTexture(GL.GL_TEXTURE_2D, command.TextureId)
-                    else:
-                        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-
-                    rect = command.ClipRect
-                    GL.glScissor(
-                        int(rect.x), int(fb_height - rect.w),
-                        int(rect.z - rect.x), int(rect.w - rect.y))
-
-                    self.resource.draw(idx_buffer_offset, command.ElemCount)
-                    idx_buffer_offset += command.ElemCount * 2
+            if self.multi_draw:
+                GL.glDisable(GL.GL_SCISSOR_TEST)
+
+            self.resource.bind(display_pos.x, display_pos.y, display_size.x, display_size.y,
+                               multi_draw=self.multi_draw)
+            if self.use_native:
+                self.resource.draw_native(draw_data, fb_height)
+                return
+
+            self.resource.begin_frame()
+            self._state.reset()
+
+            command_lists = [p_command_list[0] for p_command_list in ImGui.iterate(
+                draw_data.CmdLists, ctypes.POINTER(ImGui.ImDrawList), draw_data.CmdListsCount)]
+            if self.multi_draw:
+                offsets = self.resource.update_vertex_buffer_lists(
+                    command_lists)
+                self._multi_draw_commands(command_lists, offsets, clip)
+            elif self.consolidate:
+                offsets = self.resource.update_vertex_buffer_lists(
+                    command_lists)
+                for command_list, (base_vertex, index_offset) in zip(command_lists, offsets):
+                    self.resource.select_command_list(
+                        base_vertex, index_offset)
+                    self._draw_commands(command_list, clip)
+            else:
+                for command_list in command_lists:
+                    self.resource.update_vertex_buffer(
+                        ctypes.c_void_p(
+                            command_list.VtxBuffer.Data), command_list.VtxBuffer.Size * VERTEX_SIZE,
+                        ctypes.c_void_p(
+                            command_list.IdxBuffer.Data), command_list.IdxBuffer.Size * INDEX_SIZE
+                    )
+                    self._draw_commands(command_list, clip)
+
+            self._state.unbind_sampler()
+            self.resource.end_frame()
+
+    def _draw(self, texture: int, scissor: Tuple[int, int, int, int], offset: int, count: int):
+        assert self.resource
+        self._state.bind_texture(texture)
+        self._state.set_scissor(scissor)
+        self.resource.draw(offset, count)
+        self.stats.draw_calls += 1
+
+    def _draw_commands(self, command_list: ImGui.ImDrawList, clip: ClipTransform):
+        # adjacent commands that share texture and scissor are drawn at once
+        run_texture = 0
+        run_scissor = (0, 0, 0, 0)
+        run_offset = 0
+        run_count = 0
+
+        idx_buffer_offset = 0
+        for command in command_list.CmdBuffer.each(ImGui.ImDrawCmd):
+            texture = command.TextureId or 0
+            scissor = clip.to_scissor(command.ClipRect)
+            if not scissor:
+                # clipped out. breaks the run
+                if run_count:
+                    self._draw(run_texture, run_scissor, run_offset, run_count)
+                run_count = 0
+            elif run_count and texture == run_texture and scissor == run_scissor:
+                run_count += command.ElemCount
+                self.stats.merged_commands += 1
+            else:
+                if run_count:
+                    self._draw(run_texture, run_scissor, run_offset, run_count)
+                run_texture = texture
+                run_scissor = scissor
+                run_offset = idx_buffer_offset
+                run_count = command.ElemCount
+
+            idx_buffer_offset += command.ElemCount * INDEX_SIZE
+
+        if run_count:
+            self._draw(run_texture, run_scissor, run_offset, run_count)
+
+    def _flush_batch(self):
+        assert self.resource
+        batch = self._batch
+        if not batch.size:
+            return
+        self._state.bind_texture(batch.texture)
+        self.resource.multi_draw(batch)
+        self.stats.draw_calls += 1
+        self.stats.merged_commands += batch.size - 1
+        batch.clear()
+
+    def _multi_draw_commands(self, command_lists: List[ImGui.ImDrawList], offsets: List[Tuple[int, int]], clip: ClipTransform):
+        batch = self._batch
+        batch.clear()
+        for command_list, (base_vertex, index_offset) in zip(command_lists, offsets):
+            for command in command_list.CmdBuffer.each(ImGui.ImDrawCmd):
+                texture = command.TextureId or 0
+                if batch.size and (texture != batch.texture or batch.is_full()):
+                    self._flush_batch()
+                batch.texture = texture
+
+                scissor = clip.to_scissor(command.ClipRect)
+                if command.ElemCount and scissor:
+                    batch.push(command.ElemCount, index_offset,
+                               base_vertex, scissor)
+                index_offset += command.ElemCount * INDEX_SIZE
+        self._flush_batch()
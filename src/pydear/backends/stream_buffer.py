@@ -0,0 +1,216 @@
+from typing import Optional, List, Sequence, Tuple
+import ctypes
+import dataclasses
+import logging
+import math
+from OpenGL import GL
+
+logger = logging.getLogger(__name__)
+
+# triple buffering for persistent mapped buffers
+SEGMENT_COUNT = 3
+MIN_CAPACITY = 64 * 1024
+
+
+@dataclasses.dataclass
+class UploadStats:
+    '''
+    per frame counters. reset by the renderer each frame.
+    '''
+    upload_bytes: int = 0
+    reallocations: int = 0
+
+    def reset(self):
+        for field in dataclasses.fields(self):
+            setattr(self, field.name, field.default)
+
+
+def align_up(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def capacity_granularity(stride: int) -> int:
+    '''
+    a segment starts at segment * capacity.
+    the capacity is a multiple of the stride to keep the elements aligned in all segments.
+    '''
+    return math.lcm(256, stride)
+
+
+def grow_capacity(capacity: int, required: int, granularity: int = 256) -> int:
+    '''
+    geometric growth. 1.5x or the required size, whichever is larger.
+    '''
+    new_capacity = max(capacity, MIN_CAPACITY)
+    while new_capacity < required:
+        new_capacity += new_capacity // 2
+    return align_up(new_capacity, granularity)
+
+
+def has_buffer_storage() -> bool:
+    '''
+    GL_ARB_buffer_storage (GL-4.4)
+    '''
+    try:
+        major = GL.glGetIntegerv(GL.GL_MAJOR_VERSION)
+        minor = GL.glGetIntegerv(GL.GL_MINOR_VERSION)
+        if (int(major), int(minor)) < (4, 4):
+            return False
+        return bool(GL.glBufferStorage) and bool(GL.glFenceSync)
+    except Exception:
+        return False
+
+
+class StreamBuffer:
+    '''
+    A buffer object that keeps its storage across frames.
+
+    Data is appended by upload() and the returned byte offset is used for drawing.
+
+    * sub data mode: orphan at begin_frame and write by glBufferSubData.
+    * persistent mode (GL-4.4): a persistently mapped ring of SEGMENT_COUNT frames.
+      begin_frame waits the fence of the segment to reuse.
+
+    stride: the element size. the offsets aligned to it are multiples of it in all segments.
+    '''
+
+    def __init__(self, target: int, *, stats: Optional[UploadStats] = None,
+                 persistent: Optional[bool] = None, capacity: int = MIN_CAPACITY, stride: int = 1) -> None:
+        self.target = target
+        self.granularity = capacity_granularity(stride)
+        self.stats = stats if stats else UploadStats()
+        if persistent is None:
+            persistent = has_buffer_storage()
+        self.persistent = persistent
+        self.handle = 0
+        self.capacity = 0
+        self.head = 0
+        self._segment = 0
+        self._mapped = 0
+        self._fences: List[Optional[int]] = [None] * SEGMENT_COUNT
+        # host memory to gather chunks for the sub data mode
+        self._staging = (ctypes.c_ubyte * 0)()
+        self._allocate(align_up(capacity, self.granularity))
+
+    def __del__(self):
+        self._release()
+
+    def _release(self):
+        if not self.handle:
+            return
+        for i, fence in enumerate(self._fences):
+            if fence:
+                GL.glDeleteSync(fence)
+            self._fences[i] = None
+        if self._mapped:
+            GL.glBindBuffer(self.target, self.handle)
+            GL.glUnmapBuffer(self.target)
+            self._mapped = 0
+        logger.debug(f'delete stream buffer: {self.handle}')
+        GL.glDeleteBuffers(1, [self.handle])
+        self.handle = 0
+
+    def _allocate(self, capacity: int):
+        if self.persistent:
+            # immutable storage. create new buffer.
+            self._release()
+            self.handle = GL.glGenBuffers(1)
+            GL.glBindBuffer(self.target, self.handle)
+            flags = GL.GL_MAP_WRITE_BIT | GL.GL_MAP_PERSISTENT_BIT | GL.GL_MAP_COHERENT_BIT
+            GL.glBufferStorage(self.target, capacity *
+                               SEGMENT_COUNT, None, flags)
+            self._mapped = ctypes.c_void_p(GL.glMapBufferRange(
+                self.target, 0, capacity * SEGMENT_COUNT, flags)).value or 0
+            if not self._mapped:
+                raise RuntimeError('glMapBufferRange')
+        else:
+            if not self.handle:
+                self.handle = GL.glGenBuffers(1)
+            GL.glBindBuffer(self.target, self.handle)
+            GL.glBufferData(self.target, capacity, None, GL.GL_STREAM_DRAW)
+        self.capacity = capacity
+        self.stats.reallocations += 1
+        logger.debug(
+            f'stream buffer: {self.handle} capacity => {capacity}')
+
+    @property
+    def segment_offset(self) -> int:
+        return self._segment * self.capacity if self.persistent else 0
+
+    def bind(self):
+        GL.glBindBuffer(self.target, self.handle)
+
+    def begin_frame(self):
+        self.head = 0
+        if self.persistent:
+            self._segment = (self._segment + 1) % SEGMENT_COUNT
+            fence = self._fences[self._segment]
+            if fence:
+                # wait the gpu that used this segment SEGMENT_COUNT frames ago
+                while GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, 1000000) == GL.GL_TIMEOUT_EXPIRED:
+                    pass
+                GL.glDeleteSync(fence)
+                self._fences[self._segment] = None
+        else:
+            # orphan. the driver hands a fresh storage without waiting the gpu
+            GL.glBindBuffer(self.target, self.handle)
+            GL.glBufferData(self.target, self.capacity,
+                            None, GL.GL_STREAM_DRAW)
+
+    def end_frame(self):
+        if self.persistent:
+            self._fences[self._segment] = GL.glFenceSync(
+                GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    def upload(self, data: ctypes.c_void_p, size: int, alignment: int = 4) -> int:
+        '''
+        return byte offset in the buffer
+        '''
+        head = align_up(self.head, alignment)
+        if head + size > self.capacity:
+            # draw calls already issued keep the previous storage
+            self._allocate(grow_capacity(
+                self.capacity, head + size, self.granularity))
+            head = 0
+        offset = self.segment_offset + head
+        if self.persistent:
+            ctypes.memmove(self._mapped + offset, data, size)
+        else:
+            GL.glBindBuffer(self.target, self.handle)
+            GL.glBufferSubData(self.target, offset, size, data)
+        self.head = head + size
+        self.stats.upload_bytes += size
+        return offset
+
+    def upload_chunks(self, chunks: Sequence[Tuple[int, int]], alignment: int = 4) -> int:
+        '''
+        chunks: (address, byte size)
+
+        pack chunks contiguously and transfer them at once.
+        return byte offset of the first chunk in the buffer.
+        '''
+        size = sum(chunk_size for _, chunk_size in chunks)
+        if not self.persistent:
+            if len(self._staging) < size:
+                self._staging = (ctypes.c_ubyte *
+                                 grow_capacity(len(self._staging), size))()
+            dst = ctypes.addressof(self._staging)
+            pos = 0
+            for address, chunk_size in chunks:
+                ctypes.memmove(dst + pos, address, chunk_size)
+                pos += chunk_size
+            return self.upload(ctypes.c_void_p(dst), size, alignment)
+
+        head = align_up(self.head, alignment)
+        if head + size > self.capacity:
+            self._allocate(grow_capacity(
+                self.capacity, head + size, self.granularity))
+            head = 0
+        offset = self.segment_offset + head
+        pos = self._mapped + offset
+        for address, chunk_size in chunks:
+            ctypes.memmove(pos, address, chunk_size)
+            pos += chunk_size
+        self.head = head + size
+        self.stats.upload_bytes += size
+        return offset
@@ -0,0 +1,8 @@
+'''
+Record ImDrawData / NVGdrawData frames from an example and replay them through the renderers.
+
+python -m pydear.bench record examples/basic/docking.py --frames 120 --out capture
+python -m pydear.bench replay capture --json result.json
+
+requires numpy.
+'''
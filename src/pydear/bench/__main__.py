@@ -0,0 +1,85 @@
+import argparse
+import logging
+import pathlib
+from . import capture
+from pydear.utils import draw_capture
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format='[%(levelname)s]%(name)s %(funcName)s: %(message)s')
+
+    parser = argparse.ArgumentParser(prog='python -m pydear.bench')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('record', help='run an example and capture frames')
+    p.add_argument('script', type=pathlib.Path)
+    p.add_argument('--frames', type=int, default=120)
+    p.add_argument('--out', type=pathlib.Path, default=pathlib.Path('capture'))
+
+    p = sub.add_parser('replay', help='replay captured frames on a hidden window')
+    p.add_argument('capture_dir', type=pathlib.Path)
+    p.add_argument('--repeat', type=int, default=10)
+    p.add_argument('--width', type=int, default=1280)
+    p.add_argument('--height', type=int, default=720)
+    p.add_argument('--headless', choices=['egl', 'osmesa'],
+                   help='offscreen context instead of a hidden glfw window')
+    p.add_argument('--use_native', action='store_true',
+                   help='impl_opengl3.Renderer(use_native=True). nanovg frames are replayed by both renderers')
+    p.add_argument('--multi_draw', action='store_true',
+                   help='impl_opengl3.Renderer(multi_draw=True)')
+    p.add_argument('--json', type=pathlib.Path)
+
+    # arguments after the script are passed to the example
+    args, rest = parser.parse_known_args()
+
+    match args.command:
+        case 'record':
+            capture.record(args.script, rest, args.out, args.frames)
+
+        case 'replay':
+            if rest:
+                parser.error(f'unrecognized arguments: {" ".join(rest)}')
+            if args.headless:
+                # before OpenGL.GL is imported
+                from pydear.utils import headless
+                headless.select_platform(args.headless)
+                # draw to the bound headless.framebuffer
+                context = headless.HeadlessContext(
+                    args.width, args.height, api=args.headless)
+            from . import replay
+            if not args.headless:
+                import glfw
+                window = replay.create_hidden_window(args.width, args.height)
+            reports = []
+            imgui_frames = [draw_capture.load_npz(path) for path in capture.list_frames(
+                args.capture_dir, capture.IMGUI_PREFIX)]
+            if imgui_frames:
+                options = {}
+                if args.use_native:
+                    options['use_native'] = True
+                if args.multi_draw:
+                    options['multi_draw'] = True
+                reports.append(replay.replay_imgui(
+                    imgui_frames, repeat=args.repeat, **options))
+            nanovg_frames = [capture.load_nanovg_npz(path) for path in capture.list_frames(
+                args.capture_dir, capture.NANOVG_PREFIX)]
+            if nanovg_frames:
+                reports.append(replay.replay_nanovg(
+                    nanovg_frames, repeat=args.repeat))
+                if args.use_native:
+                    reports.append(replay.replay_nanovg(
+                        nanovg_frames, repeat=args.repeat, use_native=True))
+            for report in reports:
+                print(report.format())
+            if args.json:
+                replay.write_json(args.json, reports)
+            if args.headless:
+                context.close()
+            else:
+                glfw.destroy_window(window)
+                glfw.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+'''
+capture the frames submitted to impl_opengl3.Renderer and nanovg_impl_opengl3.render.
+
+capture/imgui_0000.npz: pydear.utils.draw_capture
+capture/nanovg_0000.npz: NanoVgFrame
+'''
+from typing import NamedTuple, Tuple, List, Iterable, Union, Optional
+import ctypes
+import pathlib
+import runpy
+import sys
+import logging
+import numpy
+from pydear.utils import draw_capture
+
+logger = logging.getLogger(__name__)
+
+IMGUI_PREFIX = 'imgui_'
+NANOVG_PREFIX = 'nanovg_'
+
+
+class NanoVgFrame(NamedTuple):
+    view: Tuple[float, float]
+    # bytes of GLNVGcall[]
+    calls: numpy.ndarray
+    # bytes of GLNVGpath[]
+    paths: numpy.ndarray
+    # bytes of NVGvertex[]
+    vertices: numpy.ndarray
+    # bytes of GLNVGfragUniforms (aligned)
+    uniforms: numpy.ndarray
+    # (n, 5): id, type, width, height, flags. the pixels are not captured
+    textures: numpy.ndarray
+
+
+def _copy_bytes(address: Optional[int], size: int) -> numpy.ndarray:
+    if not address or size <= 0:
+        return numpy.zeros(0, numpy.uint8)
+    return numpy.frombuffer((ctypes.c_ubyte * size).from_address(address), numpy.uint8).copy()
+
+
+def from_nvg_draw_data(data, textures: Iterable) -> NanoVgFrame:
+    '''
+    copy NVGdrawData. textures: NVGtextureInfo of the renderer.
+    '''
+    from pydear import nanovg
+    count = data.drawCount
+    calls = (nanovg.GLNVGcall * count).from_address(
+        data.drawData) if count else []
+    # NVGdrawData has no path count
+    path_count = max((call.pathOffset + call.pathCount for call in calls), default=0)
+    return NanoVgFrame(
+        (data.view[0], data.view[1]),
+        _copy_bytes(data.drawData, count * ctypes.sizeof(nanovg.GLNVGcall)),
+        _copy_bytes(data.pPath, path_count *
+                    ctypes.sizeof(nanovg.GLNVGpath)),
+        _copy_bytes(data.pVertex, data.vertexCount *
+                    ctypes.sizeof(nanovg.NVGvertex)),
+        _copy_bytes(data.pUniform, data.uniformByteSize),
+        numpy.array([(info._id, info._type, info._width, info._height, info._flags) for info in textures],
+                    dtype='<i4').reshape(-1, 5))
+
+
+def nvg_draw_data(frame: NanoVgFrame):
+    '''
+    NVGdrawData that points to the frame. valid while the frame is alive.
+    '''
+    from pydear import nanovg
+    data = nanovg.NVGdrawData()
+    data.view[0] = frame.view[0]
+    data.view[1] = frame.view[1]
+    data.drawData = frame.calls.ctypes.data if len(frame.calls) else None
+    data.drawCount = len(frame.calls) // ctypes.sizeof(nanovg.GLNVGcall)
+    data.pUniform = frame.uniforms.ctypes.data if len(
+        frame.uniforms) else None
+    data.uniformByteSize = len(frame.uniforms)
+    data.pVertex = frame.vertices.ctypes.data if len(
+        frame.vertices) else None
+    data.vertexCount = len(frame.vertices) // ctypes.sizeof(nanovg.NVGvertex)
+    data.pPath = frame.paths.ctypes.data if len(frame.paths) else None
+    return data
+
+
+def save_nanovg_npz(path: Union[str, pathlib.Path], frame: NanoVgFrame):
+    numpy.savez_compressed(path, view=numpy.array(frame.view, dtype='<f4'),
+                           calls=frame.calls, paths=frame.paths, vertices=frame.vertices,
+                           uniforms=frame.uniforms, textures=frame.textures)
+
+
+def load_nanovg_npz(path: Union[str, pathlib.Path]) -> NanoVgFrame:
+    with numpy.load(path) as npz:
+        view = npz['view']
+        return NanoVgFrame((float(view[0]), float(view[1])),
+                           npz['calls'], npz['paths'], npz['vertices'], npz['uniforms'], npz['textures'])
+
+
+def list_frames(capture_dir: pathlib.Path, prefix: str) -> List[pathlib.Path]:
+    return sorted(capture_dir.glob(f'{prefix}*.npz'))
+
+
+class Recorder:
+    '''
+    save the frames submitted to the renderers while entered.
+    GlfwApp.clear returns False when frames are recorded.
+    '''
+
+    def __init__(self, capture_dir: pathlib.Path, frames: int) -> None:
+        self.capture_dir = capture_dir
+        self.frames = frames
+        self.imgui_count = 0
+        self.nanovg_count = 0
+        self._restore: List[Tuple[object, str, object]] = []
+
+    @property
+    def is_done(self) -> bool:
+        return max(self.imgui_count, self.nanovg_count) >= self.frames
+
+    def _patch(self, owner, name: str, function):
+        self._restore.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, function)
+
+    def __enter__(self) -> 'Recorder':
+        self.capture_dir.mkdir(parents=True, exist_ok=True)
+        for path in list_frames(self.capture_dir, IMGUI_PREFIX) + list_frames(self.capture_dir, NANOVG_PREFIX):
+            path.unlink()
+
+        from pydear.utils import glfw_app
+        clear = glfw_app.GlfwApp.clear
+
+        def clear_until_done(app):
+            if self.is_done:
+                return False
+            return clear(app)
+        self._patch(glfw_app.GlfwApp, 'clear', clear_until_done)
+
+        from pydear.backends import impl_opengl3
+        imgui_render = impl_opengl3.Renderer.render
+
+        def render_imgui(renderer, draw_data):
+            if self.imgui_count < self.frames:
+                draw_capture.save_npz(self.capture_dir / f'{IMGUI_PREFIX}{self.imgui_count:04}.npz',
+                                      draw_capture.from_draw_data(draw_data))
+                self.imgui_count += 1
+            imgui_render(renderer, draw_data)
+        self._patch(impl_opengl3.Renderer, 'render', render_imgui)
+
+        try:
+            from pydear.nanovg_backends import nanovg_impl_opengl3
+        except ImportError:
+            # pydear.nanovg is not built
+            return self
+        nanovg_render = nanovg_impl_opengl3.render
+
+        def render_nanovg(data, pictures=()):
+            # the retained pictures are drawn, but not recorded
+            if self.nanovg_count < self.frames:
+                textures = [texture.info for texture in nanovg_impl_opengl3.g_renderer._textures.values()]
+                save_nanovg_npz(self.capture_dir / f'{NANOVG_PREFIX}{self.nanovg_count:04}.npz',
+                                from_nvg_draw_data(data, textures))
+                self.nanovg_count += 1
+            nanovg_render(data, pictures)
+        self._patch(nanovg_impl_opengl3, 'render', render_nanovg)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for owner, name, function in reversed(self._restore):
+            setattr(owner, name, function)
+        self._restore.clear()
+
+
+def record(script: pathlib.Path, args: List[str], capture_dir: pathlib.Path, frames: int) -> Recorder:
+    '''
+    run the example script as __main__ until frames are recorded.
+    '''
+    sys.argv = [str(script), *args]
+    # examples import the modules next to them
+    sys.path.insert(0, str(script.parent))
+    with Recorder(capture_dir, frames) as recorder:
+        runpy.run_path(str(script), run_name='__main__')
+    logger.info(
+        f'{capture_dir}: imgui {recorder.imgui_count} frames, nanovg {recorder.nanovg_count} frames')
+    return recorder
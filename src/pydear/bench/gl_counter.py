@@ -0,0 +1,63 @@
+from typing import Dict, Optional, Any
+import collections
+import functools
+
+# (gl function, index of the size argument)
+UPLOAD_FUNCTIONS = {
+    'glBufferData': 1,
+    'glBufferSubData': 2,
+}
+
+
+class GLCallCounter:
+    '''
+    count the calls through the PyOpenGL module while entered.
+
+    the renderers call `GL.glXXX` through the module attribute.
+    calls from pydear.impl (native renderer) are not counted.
+    upload_bytes is the size argument of glBufferData and glBufferSubData.
+    '''
+
+    def __init__(self, module: Optional[Any] = None) -> None:
+        if not module:
+            from OpenGL import GL
+            module = GL
+        self._module = module
+        self._originals: Dict[str, Any] = {}
+        self.calls: Dict[str, int] = collections.Counter()
+        self.upload_bytes = 0
+
+    def reset(self):
+        self.calls.clear()
+        self.upload_bytes = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def _wrap(self, name: str, function):
+        size_index = UPLOAD_FUNCTIONS.get(name)
+
+        @functools.wraps(function)
+        def counted(*args, **kw):
+            self.calls[name] += 1
+            if size_index is not None and len(args) > size_index and isinstance(args[size_index], int):
+                self.upload_bytes += args[size_index]
+            return function(*args, **kw)
+        return counted
+
+    def __enter__(self) -> 'GLCallCounter':
+        for name in dir(self._module):
+            if not name.startswith('gl'):
+                continue
+            function = getattr(self._module, name)
+            if not callable(function):
+                continue
+            self._originals[name] = function
+            setattr(self._module, name, self._wrap(name, function))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for name, function in self._originals.items():
+            setattr(self._module, name, function)
+        self._originals.clear()
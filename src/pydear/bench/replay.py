@@ -0,0 +1,193 @@
+'''
+replay the captured frames on a hidden window and measure each frame.
+'''
+from typing import NamedTuple, List, Dict, Callable, Any
+import ctypes
+import dataclasses
+import json
+import math
+import statistics
+import time
+from OpenGL import GL
+from .gl_counter import GLCallCounter
+
+
+class FrameResult(NamedTuple):
+    # median of the repeats. without the GL call counting
+    cpu_ms: float
+    gl_calls: int
+    upload_bytes: int
+
+
+def percentile(values: List[float], p: float) -> float:
+    '''
+    nearest rank
+    '''
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = math.ceil(p / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+@dataclasses.dataclass
+class Report:
+    name: str
+    frames: List[FrameResult]
+    # per GL function. all frames of the counting pass
+    gl_calls: Dict[str, int]
+
+    def summary(self) -> Dict[str, float]:
+        cpu = [frame.cpu_ms for frame in self.frames]
+        return {
+            'frames': len(self.frames),
+            'cpu_ms_mean': statistics.fmean(cpu) if cpu else 0.0,
+            'cpu_ms_median': statistics.median(cpu) if cpu else 0.0,
+            'cpu_ms_p95': percentile(cpu, 95),
+            'cpu_ms_max': max(cpu, default=0.0),
+            'gl_calls_mean': statistics.fmean([frame.gl_calls for frame in self.frames]) if cpu else 0.0,
+            'upload_bytes_mean': statistics.fmean([frame.upload_bytes for frame in self.frames]) if cpu else 0.0,
+        }
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'summary': self.summary(),
+            'frames': [frame._asdict() for frame in self.frames],
+            'gl_calls': dict(sorted(self.gl_calls.items(), key=lambda kv: -kv[1])),
+        }
+
+    def format(self) -> str:
+        s = self.summary()
+        lines = [
+            f'[{self.name}] {s["frames"]} frames',
+            f'  cpu ms: mean {s["cpu_ms_mean"]:.3f}, median {s["cpu_ms_median"]:.3f}, p95 {s["cpu_ms_p95"]:.3f}, max {s["cpu_ms_max"]:.3f}',
+            f'  gl calls/frame: {s["gl_calls_mean"]:.1f}',
+            f'  upload bytes/frame: {s["upload_bytes_mean"]:.0f}',
+        ]
+        for name, count in sorted(self.gl_calls.items(), key=lambda kv: -kv[1])[:8]:
+            lines.append(f'    {name}: {count}')
+        return '\n'.join(lines)
+
+
+def create_hidden_window(width: int, height: int, *, gl_major=4, gl_minor=3):
+    '''
+    current GL context without a visible window.
+    '''
+    import glfw
+    if not glfw.init():
+        raise RuntimeError('glfw.init')
+    glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, gl_major)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, gl_minor)
+    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+    window = glfw.create_window(width, height, 'pydear.bench', None, None)
+    if not window:
+        raise RuntimeError('glfw.create_window')
+    glfw.make_context_current(window)
+    glfw.swap_interval(0)
+    return window
+
+
+def measure(name: str, submits: List[Callable[[], int]], *, repeat: int) -> Report:
+    '''
+    submits: render a frame and return the upload bytes or -1 to use glBufferData sizes.
+    '''
+    # counting pass. also the warm up
+    counts = []
+    with GLCallCounter() as counter:
+        for submit in submits:
+            calls = counter.total
+            uploaded = counter.upload_bytes
+            upload_bytes = submit()
+            if upload_bytes < 0:
+                upload_bytes = counter.upload_bytes - uploaded
+            counts.append((counter.total - calls, upload_bytes))
+        GL.glFinish()
+        gl_calls = dict(counter.calls)
+
+    samples: List[List[float]] = [[] for _ in submits]
+    for _ in range(repeat):
+        for i, submit in enumerate(submits):
+            start = time.perf_counter()
+            submit()
+            samples[i].append((time.perf_counter() - start) * 1000)
+            # do not queue frames in the driver
+            GL.glFinish()
+
+    return Report(name, [FrameResult(statistics.median(cpu), calls, upload_bytes)
+                         for cpu, (calls, upload_bytes) in zip(samples, counts)], gl_calls)
+
+
+def replay_imgui(frames: list, *, repeat=10, **renderer_options) -> Report:
+    '''
+    frames: List[draw_capture.DrawDataArrays]
+    renderer_options: impl_opengl3.Renderer keyword arguments.
+
+    all textures are replaced by the font texture.
+    '''
+    from pydear import imgui as ImGui
+    from pydear.backends.impl_opengl3 import Renderer
+    from pydear.utils.draw_capture import DrawDataReplay
+
+    ImGui.CreateContext()
+    try:
+        renderer = Renderer(**renderer_options)
+        # create the font texture. DisplaySize is 0
+        renderer.render(ImGui.ImDrawData())
+        font = ImGui.GetIO().Fonts.TexID or 0
+
+        replays = []
+        for frame in frames:
+            textures = {int(texture): font
+                        for l in frame.lists for texture in l.commands['texture']}
+            replays.append(DrawDataReplay(frame, textures=textures))
+
+        def submitter(replay: DrawDataReplay):
+            def submit():
+                renderer.render(replay.draw_data)
+                return renderer.stats.upload_bytes
+            return submit
+        name = 'imgui' + ''.join(f' {k}={v}' for k, v in renderer_options.items())
+        report = measure(name, [submitter(replay) for replay in replays], repeat=repeat)
+        del renderer
+        return report
+    finally:
+        ImGui.DestroyContext()
+
+
+def replay_nanovg(frames: list, *, repeat=10, **renderer_options) -> Report:
+    '''
+    frames: List[capture.NanoVgFrame]
+    renderer_options: nanovg_impl_opengl3.Renderer keyword arguments.
+
+    textures are created by the captured size. the pixels are empty.
+    '''
+    from pydear import nanovg
+    from pydear.nanovg_backends.nanovg_impl_opengl3 import Renderer
+    from .capture import nvg_draw_data
+
+    renderer = Renderer(**renderer_options)
+    for frame in frames:
+        for id, texture_type, width, height, flags in frame.textures.tolist():
+            if id not in renderer._textures:
+                # keep the captured image id
+                renderer.next_id = id
+                renderer.create_texture(nanovg.NVGtexture(
+                    texture_type), width, height, flags, ctypes.c_void_p())
+    renderer.next_id = max(renderer._textures, default=0) + 1
+
+    def submitter(frame):
+        data = nvg_draw_data(frame)
+
+        def submit():
+            with renderer:
+                renderer.render(data)
+            return renderer.stats.upload_bytes
+        return submit
+    name = 'nanovg' + ''.join(f' {k}={v}' for k, v in renderer_options.items())
+    return measure(name, [submitter(frame) for frame in frames], repeat=repeat)
+
+
+def write_json(path, reports: List[Report]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({report.name: report.to_json() for report in reports}, f, indent=2)
@@ -8,6 +8,7 @@ from .shader_vertex import Vertex, SHADER
 from .primitive import Triangle, Quad
 from .shapes.shape import Shape
 from OpenGL import GL
+from pydear.utils.gpu_timer import GpuTimer
 
 LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +18,8 @@ class GizmoVertexBuffer:
         self.shader: Optional[glo.Shader] = None
         self.props = []
         self.view_projection = glm.mat4()
+        # enabled by Profiler.gpu_enabled
+        self.gpu_timer = GpuTimer('gpu:gizmo')
 
         self.vertices = (Vertex * 65535)()
         self.vertex_count = 0
@@ -156,7 +159,7 @@ class GizmoVertexBuffer:
 
         assert self.triangle_vao
 
-        with self.shader:
+        with self.gpu_timer, self.shader:
             for prop in self.props:
                 prop()
             GL.glEnable(GL.GL_DEPTH_TEST)
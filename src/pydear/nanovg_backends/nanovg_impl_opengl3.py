@@ -1,9 +1,15 @@
-from typing import Optional, Dict, NamedTuple
+from typing import Optional, Dict, NamedTuple, Callable, Tuple, Sequence
 import ctypes
 import pkgutil
+import logging
+import dataclasses
 from OpenGL import GL
 from pydear import nanovg
 from glglue import glo
+from pydear.utils.gpu_timer import GpuTimer
+from pydear.backends.stream_buffer import StreamBuffer, UploadStats
+
+logger = logging.getLogger(__name__)
 
 P_PATH = ctypes.POINTER(nanovg.GLNVGpath)
 P_CALL = ctypes.POINTER(nanovg.GLNVGcall)
@@ -65,12 +71,54 @@ def blendCompositeOperation(op) -> GLNVGblend:
     return blend
 
 
+# bytes of NVGcompositeOperationState => GLNVGblend
+BLEND_TABLE: Dict[bytes, GLNVGblend] = {}
+
+
+def lookup_blend(op: nanovg.NVGcompositeOperationState, key: bytes) -> GLNVGblend:
+    blend = BLEND_TABLE.get(key)
+    if not blend:
+        blend = blendCompositeOperation(op)
+        BLEND_TABLE[key] = blend
+    return blend
+
+
 class StencilFunc(NamedTuple):
     func: int = GL.GL_ALWAYS  # type: ignore
     ref: int = 0
     mask: int = 0xffffffff
 
 
+FILL_SHAPE_FUNC = StencilFunc(GL.GL_ALWAYS, 0, 0xff)  # type: ignore
+FILL_AA_FUNC = StencilFunc(GL.GL_NOTEQUAL, 0x0, 0xff)  # type: ignore
+
+# glStencilOp sfail, dpfail, dppass
+StencilOp = Tuple[int, int, int]
+STENCIL_KEEP: StencilOp = (GL.GL_KEEP, GL.GL_KEEP, GL.GL_KEEP)  # type: ignore
+STENCIL_ZERO: StencilOp = (GL.GL_ZERO, GL.GL_ZERO, GL.GL_ZERO)  # type: ignore
+FILL_SHAPE_FRONT: StencilOp = (GL.GL_KEEP, GL.GL_KEEP, GL.GL_INCR_WRAP)  # type: ignore
+FILL_SHAPE_BACK: StencilOp = (GL.GL_KEEP, GL.GL_KEEP, GL.GL_DECR_WRAP)  # type: ignore
+
+
+@dataclasses.dataclass
+class RenderStats(UploadStats):
+    '''
+    counters of the last frame.
+    *_skipped: the GL calls skipped by the state cache. not counted by the native renderer.
+    '''
+    blend_changes: int = 0
+    blend_skipped: int = 0
+    uniform_binds: int = 0
+    uniform_skipped: int = 0
+    texture_binds: int = 0
+    texture_skipped: int = 0
+    stencil_changes: int = 0
+    stencil_skipped: int = 0
+    # glEnable, glDisable and glColorMask
+    toggles: int = 0
+    toggles_skipped: int = 0
+
+
 class Texture(NamedTuple):
     info: nanovg.NVGtextureInfo
     resource: glo.Texture
@@ -84,11 +132,14 @@ class Pipeline:
         self.texture = glo.UniformLocation.create(self._shader.program, "tex")
         self.view = glo.UniformLocation.create(
             self._shader.program, "viewSize")
+        self.transform = glo.UniformLocation.create(
+            self._shader.program, "transform")
         # UBO
         self.frag = glo.UniformBlockIndex.create(self._shader.program, "frag")
         GL.glUniformBlockBinding(
             self._shader.program, self.frag.index, 0)
         align = GL.glGetIntegerv(GL.GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT)
+        self.uniform_alignment = int(align)
         self._fragSize = ctypes.sizeof(
             nanovg.GLNVGfragUniforms) + align - ctypes.sizeof(nanovg.GLNVGfragUniforms) % align
 
@@ -98,6 +149,221 @@ class Pipeline:
         self._shader.use()
 
 
+VERTEX_SIZE = ctypes.sizeof(nanovg.NVGvertex)
+
+
+def vertex_attrib_pointers(offset: int):
+    '''
+    NVGvertex{x, y, u, v} of the bound GL_ARRAY_BUFFER
+    '''
+    GL.glVertexAttribPointer(0, 2, GL.GL_FLOAT, GL.GL_FALSE,
+                             VERTEX_SIZE, ctypes.c_void_p(offset))
+    GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE,
+                             VERTEX_SIZE, ctypes.c_void_p(offset + 2 * ctypes.sizeof(ctypes.c_float)))
+
+
+class VertexStream:
+    '''
+    NVGvertex[] appended to a StreamBuffer. the vao is configured once.
+
+    the vertex offsets of GLNVGcall and GLNVGpath are relative to the upload.
+    the vao points to the uploaded vertices instead of shifting them.
+
+    * sub data mode: upload once a frame. the vertices are at offset 0.
+    * persistent mode (GL-4.4): glBindVertexBuffer with the offset of the segment.
+    '''
+
+    def __init__(self, *, stats: Optional[UploadStats] = None, persistent: Optional[bool] = None) -> None:
+        self._vao_handle = GL.glGenVertexArrays(1)
+        self._vbo = StreamBuffer(
+            GL.GL_ARRAY_BUFFER, stats=stats, persistent=persistent)
+        # (buffer, offset) the vao points to
+        self._vao_source = (0, 0)
+        GL.glBindVertexArray(self._vao_handle)
+        GL.glEnableVertexAttribArray(0)
+        GL.glEnableVertexAttribArray(1)
+        if self._vbo.persistent:
+            # separate attribute format (GL-4.3)
+            GL.glVertexAttribFormat(0, 2, GL.GL_FLOAT, GL.GL_FALSE, 0)
+            GL.glVertexAttribFormat(
+                1, 2, GL.GL_FLOAT, GL.GL_FALSE, 2 * ctypes.sizeof(ctypes.c_float))
+            GL.glVertexAttribBinding(0, 0)
+            GL.glVertexAttribBinding(1, 0)
+        GL.glBindVertexArray(0)
+
+    def __del__(self):
+        if self._vao_handle:
+            logger.debug(f'delete vao: {self._vao_handle}')
+            GL.glDeleteVertexArrays(1, [self._vao_handle])
+        self._vao_handle = 0
+        del self._vbo
+
+    def begin_frame(self):
+        self._vbo.begin_frame()
+
+    def end_frame(self):
+        self._vbo.end_frame()
+
+    def _point(self, handle: int, offset: int):
+        if self._vbo.persistent:
+            GL.glBindVertexBuffer(0, handle, offset, VERTEX_SIZE)
+        else:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, handle)
+            vertex_attrib_pointers(offset)
+
+    def bind(self):
+        GL.glBindVertexArray(self._vao_handle)
+
+    def upload(self, vertices: int, count: int):
+        '''
+        upload and bind the vao
+        '''
+        self.bind()
+        offset = self._vbo.upload(ctypes.c_void_p(
+            vertices), count * VERTEX_SIZE, VERTEX_SIZE) if count else 0
+        source = (self._vbo.handle, offset)
+        if source != self._vao_source:
+            self._point(*source)
+            self._vao_source = source
+
+
+# nvgTransform. [a, b, c, d, e, f]
+# x' = a * x + c * y + e
+# y' = b * x + d * y + f
+Transform = Tuple[float, float, float, float, float, float]
+IDENTITY: Transform = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class Picture:
+    '''
+    NVGdrawData retained in GPU buffers. draw by Renderer.render(data, pictures).
+
+    The vertices and the uniforms are uploaded once.
+    The calls and the paths are kept in host memory for the draw loop.
+
+    * the paths are tessellated in the recorded coordinates.
+      a scaling transform also scales the antialias fringes.
+    * the images (e.g. the font atlas) must be alive while the picture is drawn.
+    '''
+
+    def __init__(self, data: nanovg.NVGdrawData) -> None:
+        count: int = data.drawCount  # type: ignore
+        self.calls = (nanovg.GLNVGcall * count)()
+        if count:
+            ctypes.memmove(self.calls, data.drawData,
+                           ctypes.sizeof(self.calls))
+        # NVGdrawData has no path count
+        path_count = max((call.pathOffset + call.pathCount  # type: ignore
+                          for call in self.calls), default=0)
+        self.paths = (nanovg.GLNVGpath * path_count)()
+        if path_count:
+            ctypes.memmove(self.paths, data.pPath, ctypes.sizeof(self.paths))
+        self.view = (data.view[0], data.view[1])
+
+        # points to the host copies. pVertex and pUniform are in the buffers
+        self.data = nanovg.NVGdrawData()
+        self.data.view[0] = self.view[0]
+        self.data.view[1] = self.view[1]
+        self.data.drawData = ctypes.addressof(self.calls)  # type: ignore
+        self.data.drawCount = count  # type: ignore
+        self.data.pPath = ctypes.addressof(self.paths)  # type: ignore
+        self.data.vertexCount = data.vertexCount
+        self.data.uniformByteSize = data.uniformByteSize
+
+        self._vao_handle = GL.glGenVertexArrays(1)
+        self._vbo = GL.glGenBuffers(1)
+        GL.glBindVertexArray(self._vao_handle)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._vbo)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, max(data.vertexCount * VERTEX_SIZE, VERTEX_SIZE),  # type: ignore
+                        ctypes.c_void_p(data.pVertex) if data.vertexCount else None, GL.GL_STATIC_DRAW)  # type: ignore
+        GL.glEnableVertexAttribArray(0)
+        GL.glEnableVertexAttribArray(1)
+        vertex_attrib_pointers(0)
+        GL.glBindVertexArray(0)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+        self.ubo = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self.ubo)
+        GL.glBufferData(GL.GL_UNIFORM_BUFFER, max(data.uniformByteSize, 1),  # type: ignore
+                        ctypes.c_void_p(data.pUniform) if data.uniformByteSize else None, GL.GL_STATIC_DRAW)  # type: ignore
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
+
+    def __del__(self):
+        if self._vao_handle:
+            logger.debug(f'delete picture: {self._vao_handle}')
+            GL.glDeleteVertexArrays(1, [self._vao_handle])
+            GL.glDeleteBuffers(2, [self._vbo, self.ubo])
+        self._vao_handle = 0
+
+    def bind(self):
+        GL.glBindVertexArray(self._vao_handle)
+
+
+class PictureDraw(NamedTuple):
+    picture: Picture
+    transform: Transform = IDENTITY
+    # x, y, width, height in the view. top left origin
+    scissor: Optional[Tuple[float, float, float, float]] = None
+
+
+class PathBatch:
+    '''
+    first and count of the paths of a call for glMultiDrawArrays.
+    the arrays are kept across calls and frames.
+    '''
+    # GLNVGpath is int[4]
+    STRIDE = ctypes.sizeof(nanovg.GLNVGpath) // ctypes.sizeof(ctypes.c_int32)
+
+    def __init__(self, capacity=64) -> None:
+        self.capacity = 0
+        self.first = (ctypes.c_int32 * 0)()
+        self.count = (ctypes.c_int32 * 0)()
+        self.size = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        self.capacity = max(capacity, self.capacity * 2)
+        self.first = (ctypes.c_int32 * self.capacity)()
+        self.count = (ctypes.c_int32 * self.capacity)()
+
+    def gather(self, address: int, path_count: int, first_field, count_field) -> int:
+        '''
+        address: GLNVGpath[path_count]
+        first_field, count_field: ex. GLNVGpath.fillOffset, GLNVGpath.fillCount
+        '''
+        self.reserve(path_count)
+        self.size = path_count
+        if path_count:
+            # strided copy without a python loop
+            values = memoryview((ctypes.c_int32 * (path_count * self.STRIDE)).from_address(
+                address)).cast('B').cast('i')
+            self.first[:path_count] = values[first_field.offset // 4::self.STRIDE]
+            self.count[:path_count] = values[count_field.offset // 4::self.STRIDE]
+        return path_count
+
+    def draw(self, mode: int):
+        if self.size == 1:
+            GL.glDrawArrays(mode, self.first[0], self.count[0])
+        elif self.size:
+            GL.glMultiDrawArrays(mode, self.first, self.count, self.size)
+
+
+def load_native(get_proc_address: Optional[Callable[[str], int]] = None) -> bool:
+    '''
+    resolve gl functions for the native draw path in pydear.impl.
+
+    require current gl context.
+    '''
+    if not hasattr(nanovg, 'Custom_NanoVG_RenderDrawData'):
+        logger.warning('pydear.impl is built without native nanovg renderer')
+        return False
+    # shared with the imgui native renderer
+    from pydear.backends.impl_opengl3 import load_native
+    return load_native(get_proc_address)
+
+
 def gl_pixel_type(pixel_type: nanovg.NVGtexture):
     match pixel_type:
         case nanovg.NVGtexture.NVG_TEXTURE_RGBA:
@@ -109,26 +375,42 @@ def gl_pixel_type(pixel_type: nanovg.NVGtexture):
 
 
 class Renderer:
-    def __init__(self) -> None:
+    '''
+    use_native: walk GLNVGcall in pydear.impl instead of the python loop.
+        fallback to the python loop if pydear.impl is built without it.
+    stats: counters of the last frame.
+    '''
+
+    def __init__(self, *, use_native=False, get_proc_address: Optional[Callable[[str], int]] = None) -> None:
         self.next_id = 1
         self._textures: Dict[int, Texture] = {}
         self._pipeline: Optional[Pipeline] = None
+        self.use_native = use_native
+        self._get_proc_address = get_proc_address
+        # image id => texture handle for the native renderer. None is dirty
+        self._handles: Optional[ctypes.Array] = None
 
         # context
-        self._texure = 0
-        self._stencilMask = 0xffffffff
-        self._stencilFunc = StencilFunc()
+        self.stats = RenderStats()
+        self.invalidate_state()
         self._srcRGB = {}
         self._srcAlpha = {}
         self._dstRGB = {}
         self._dstAlpha = {}
         self.shader = None
-        self._vertBuf = 0
-        self._vertArr = 0
-        self._fragBuf = 0
+        self._vertices: Optional[VertexStream] = None
+        self._uniforms: Optional[StreamBuffer] = None
+        # the ubo of the draw data and byte offset of NVGdrawData.pUniform in it
+        self._uniformBuffer = 0
+        self._uniformBase = 0
+        # program uniform. kept across frames
+        self._transform: Optional[Transform] = None
 
         # cache
-        self._blendFunc = GLNVGblend(0, 0, 0, 0)
+        self._batch = PathBatch()
+
+        # enabled by Profiler.gpu_enabled
+        self.gpu_timer = GpuTimer('gpu:nanovg')
 
     def __del__(self):
         pass
@@ -146,6 +428,7 @@ class Renderer:
             flags
         )
         self._textures[id] = Texture(info, resource)
+        self._handles = None
         self.next_id += 1
         return id
 
@@ -158,6 +441,7 @@ class Renderer:
 
     def delete_texture(self, image: int) -> bool:
         del self._textures[image]
+        self._handles = None
         return True
 
     def get_texture(self, image: int) -> Optional[nanovg.NVGtextureInfo]:
@@ -165,110 +449,223 @@ class Renderer:
             case (info, _):
                 return info
 
+    def invalidate_state(self):
+        '''
+        the GL state is unknown. the next calls are not skipped.
+        '''
+        self._texure: Optional[int] = None
+        self._uniformOffset: Optional[int] = None
+        self._stencilMask: Optional[int] = None
+        self._stencilFunc: Optional[StencilFunc] = None
+        self._stencilOp: Optional[Tuple[StencilOp, StencilOp]] = None
+        self._caps: Dict[int, bool] = {}
+        self._colorMask: Optional[bool] = None
+        self._blendKey = b''
+        self._blendFunc: Optional[GLNVGblend] = None
+
+    def blend(self, op: nanovg.NVGcompositeOperationState):
+        # consecutive calls mostly share the operation
+        key = bytes(op)
+        if key == self._blendKey:
+            self.stats.blend_skipped += 1
+            return
+        self._blendKey = key
+        self.blendFuncSeparate(lookup_blend(op, key))
+
     def blendFuncSeparate(self, blend: GLNVGblend):
         if self._blendFunc != blend:
             self._blendFunc = blend
             GL.glBlendFuncSeparate(blend.srcRGB, blend.dstRGB,
                                    blend.srcAlpha, blend.dstAlpha)
+            self.stats.blend_changes += 1
+        else:
+            self.stats.blend_skipped += 1
 
     def setUniforms(self, uniformOffset: int):
+        if self._uniformOffset == uniformOffset:
+            self.stats.uniform_skipped += 1
+            return
+        self._uniformOffset = uniformOffset
         GL.glBindBufferRange(
-            GL.GL_UNIFORM_BUFFER, 0, self._fragBuf,
-            uniformOffset, ctypes.sizeof(nanovg.GLNVGfragUniforms))
+            GL.GL_UNIFORM_BUFFER, 0, self._uniformBuffer,
+            self._uniformBase + uniformOffset, ctypes.sizeof(nanovg.GLNVGfragUniforms))
+        self.stats.uniform_binds += 1
+
+    def selectUniforms(self, buffer: int, base: int):
+        self._uniformBuffer = buffer
+        self._uniformBase = base
+        self._uniformOffset = None
+
+    def setTransform(self, transform: Transform):
+        if self._transform == transform:
+            return
+        assert self._pipeline
+        self._transform = transform
+        a, b, c, d, e, f = transform
+        GL.glUniformMatrix3fv(self._pipeline.transform.location, 1, GL.GL_FALSE,
+                              (ctypes.c_float * 9)(a, b, 0, c, d, 0, e, f, 1))
+
+    def scissor(self, viewport, view: Tuple[float, float], rect: Tuple[float, float, float, float]):
+        '''
+        rect: in the view. top left origin
+        '''
+        x, y, w, h = rect
+        sx = viewport[2] / view[0]
+        sy = viewport[3] / view[1]
+        GL.glScissor(int(viewport[0] + x * sx), int(viewport[1] + (view[1] - y - h) * sy),
+                     int(w * sx), int(h * sy))
 
     def bind_texture(self, image: int):
         if image == 0:
-            GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-            self._texure = 0
+            handle = 0
+        else:
+            match self._textures.get(image):
+                case (_, resource):
+                    handle = resource.handle
+                case _:
+                    raise RuntimeError()
+        if self._texure == handle:
+            self.stats.texture_skipped += 1
             return
-        match self._textures.get(image):
-            case (_, resource):
-                if self._texure != resource.handle:
-                    resource.bind()
-                    self._texure = resource.handle
-            case _:
-                raise RuntimeError()
+        GL.glBindTexture(GL.GL_TEXTURE_2D, handle)
+        self._texure = handle
+        self.stats.texture_binds += 1
+
+    def enable(self, cap: int, enabled: bool):
+        if self._caps.get(cap) == enabled:
+            self.stats.toggles_skipped += 1
+            return
+        self._caps[cap] = enabled
+        if enabled:
+            GL.glEnable(cap)
+        else:
+            GL.glDisable(cap)
+        self.stats.toggles += 1
+
+    def colorMask(self, enabled: bool):
+        if self._colorMask == enabled:
+            self.stats.toggles_skipped += 1
+            return
+        self._colorMask = enabled
+        value = GL.GL_TRUE if enabled else GL.GL_FALSE
+        GL.glColorMask(value, value, value, value)
+        self.stats.toggles += 1
 
     def stencilMask(self, mask: int):
         if self._stencilMask != mask:
             self._stencilMask = mask
             GL.glStencilMask(mask)
+            self.stats.stencil_changes += 1
+        else:
+            self.stats.stencil_skipped += 1
 
     def stencilFunc(self, stencilFunc: StencilFunc):
         if self._stencilFunc != stencilFunc:
             self._stencilFunc = stencilFunc
             GL.glStencilFunc(stencilFunc.func,
                              stencilFunc.ref, stencilFunc.mask)
+            self.stats.stencil_changes += 1
+        else:
+            self.stats.stencil_skipped += 1
+
+    def stencilOp(self, front: StencilOp, back: StencilOp):
+        if self._stencilOp == (front, back):
+            self.stats.stencil_skipped += 1
+            return
+        self._stencilOp = (front, back)
+        if front == back:
+            GL.glStencilOp(*front)
+        else:
+            GL.glStencilOpSeparate(GL.GL_FRONT, *front)
+            GL.glStencilOpSeparate(GL.GL_BACK, *back)
+        self.stats.stencil_changes += 1
+
+    def gather_paths(self, call: nanovg.GLNVGcall, pPath: P_PATH, first_field, count_field):
+        address = ctypes.cast(pPath, ctypes.c_void_p).value or 0
+        self._batch.gather(address + call.pathOffset * ctypes.sizeof(nanovg.GLNVGpath),  # type: ignore
+                           call.pathCount, first_field, count_field)  # type: ignore
 
     def fill(self, call: nanovg.GLNVGcall,  pPath: P_PATH):
-        paths = ctypes.pointer(pPath[call.pathOffset])  # type: ignore
 
         # Draw shapes
-        GL.glEnable(GL.GL_STENCIL_TEST)
+        self.enable(GL.GL_STENCIL_TEST, True)
         self.stencilMask(0xff)
-        self.stencilFunc(StencilFunc(GL.GL_ALWAYS, 0, 0xff))  # type: ignore
-        GL.glColorMask(GL.GL_FALSE, GL.GL_FALSE, GL.GL_FALSE, GL.GL_FALSE)
+        self.stencilFunc(FILL_SHAPE_FUNC)
+        self.colorMask(False)
 
         # set bindpoint for solid loc
         self.setUniforms(call.uniformOffset)  # type: ignore
         self.bind_texture(0)
 
-        GL.glStencilOpSeparate(GL.GL_FRONT, GL.GL_KEEP,
-                               GL.GL_KEEP, GL.GL_INCR_WRAP)
-        GL.glStencilOpSeparate(GL.GL_BACK, GL.GL_KEEP,
-                               GL.GL_KEEP, GL.GL_DECR_WRAP)
-        GL.glDisable(GL.GL_CULL_FACE)
-        for i in range(call.pathCount):  # type: ignore
-            GL.glDrawArrays(GL.GL_TRIANGLE_FAN,
-                            paths[i].fillOffset, paths[i].fillCount)
-        GL.glEnable(GL.GL_CULL_FACE)
+        self.stencilOp(FILL_SHAPE_FRONT, FILL_SHAPE_BACK)
+        self.enable(GL.GL_CULL_FACE, False)
+        self.gather_paths(call, pPath, nanovg.GLNVGpath.fillOffset,
+                          nanovg.GLNVGpath.fillCount)
+        self._batch.draw(GL.GL_TRIANGLE_FAN)
+        self.enable(GL.GL_CULL_FACE, True)
 
         # Draw anti-aliased pixels
-        GL.glColorMask(GL.GL_TRUE, GL.GL_TRUE, GL.GL_TRUE, GL.GL_TRUE)
+        self.colorMask(True)
 
         self.setUniforms(call.uniformOffset +
                          self._pipeline._fragSize)  # type: ignore
         self.bind_texture(call.image)  # type: ignore
 
         # Draw fill
-        self.stencilFunc(StencilFunc(
-            GL.GL_NOTEQUAL, 0x0, 0xff))  # type: ignore
-        GL.glStencilOp(GL.GL_ZERO, GL.GL_ZERO, GL.GL_ZERO)
+        self.stencilFunc(FILL_AA_FUNC)
+        self.stencilOp(STENCIL_ZERO, STENCIL_ZERO)
         GL.glDrawArrays(GL.GL_TRIANGLE_STRIP,
                         call.triangleOffset, call.triangleCount)
-
-        GL.glDisable(GL.GL_STENCIL_TEST)
+        # the stencil test is disabled by the next call that is not a fill
 
     def convexFill(self, call: nanovg.GLNVGcall, pPaths: P_PATH):
-        paths = ctypes.pointer(pPaths[call.pathOffset])  # type: ignore
-
+        self.enable(GL.GL_STENCIL_TEST, False)
         self.setUniforms(call.uniformOffset)  # type: ignore
         self.bind_texture(call.image)  # type: ignore
 
-        for i in range(call.pathCount):  # type: ignore
-            GL.glDrawArrays(GL.GL_TRIANGLE_FAN,
-                            paths[i].fillOffset, paths[i].fillCount)
-            # Draw fringes
-            if paths[i].strokeCount > 0:
-                GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, paths[i].strokeOffset,
-                                paths[i].strokeCount)
+        # nanovg makes a convex fill of a single path.
+        # the fringes follow all fills if there are more.
+        self.gather_paths(call, pPaths, nanovg.GLNVGpath.fillOffset,
+                          nanovg.GLNVGpath.fillCount)
+        self._batch.draw(GL.GL_TRIANGLE_FAN)
+        # Draw fringes. strokeCount is 0 without antialias
+        self.gather_paths(call, pPaths, nanovg.GLNVGpath.strokeOffset,
+                          nanovg.GLNVGpath.strokeCount)
+        self._batch.draw(GL.GL_TRIANGLE_STRIP)
 
     def stroke(self, call: nanovg.GLNVGcall, pPaths: P_PATH):
         assert(self._pipeline)
-        paths = ctypes.pointer(pPaths[call.pathOffset])  # type: ignore
+        self.enable(GL.GL_STENCIL_TEST, False)
         self.setUniforms(call.uniformOffset)  # type: ignore
         self.bind_texture(call.image)  # type: ignore
         # Draw Strokes
-        for i in range(call.pathCount):  # type: ignore
-            GL.glDrawArrays(GL.GL_TRIANGLE_STRIP, paths[i].strokeOffset,
-                            paths[i].strokeCount)
+        self.gather_paths(call, pPaths, nanovg.GLNVGpath.strokeOffset,
+                          nanovg.GLNVGpath.strokeCount)
+        self._batch.draw(GL.GL_TRIANGLE_STRIP)
 
     def triangles(self, call: nanovg.GLNVGcall):
+        self.enable(GL.GL_STENCIL_TEST, False)
         self.setUniforms(call.uniformOffset)  # type: ignore
         self.bind_texture(call.image)  # type: ignore
         GL.glDrawArrays(GL.GL_TRIANGLES, call.triangleOffset,
                         call.triangleCount)
 
+    def get_handles(self) -> ctypes.Array:
+        if self._handles is None:
+            handles = (ctypes.c_uint32 * (max(self._textures, default=0) + 1))()
+            for id, (_, resource) in self._textures.items():
+                handles[id] = resource.handle
+            self._handles = handles
+        return self._handles
+
+    def draw_native(self, data: nanovg.NVGdrawData):
+        assert self._pipeline
+        nanovg.Custom_NanoVG_RenderDrawData(
+            data, int(self._uniformBuffer), self._uniformBase,
+            self._pipeline._fragSize, self.get_handles())
+        # the native renderer changed the state behind the cache
+        self.invalidate_state()
+
     def __enter__(self):
         GL.glEnable(GL.GL_CULL_FACE)
         GL.glCullFace(GL.GL_BACK)
@@ -280,48 +677,61 @@ class Renderer:
         GL.glStencilMask(0xffffffff)
         GL.glStencilOp(GL.GL_KEEP, GL.GL_KEEP, GL.GL_KEEP)
         GL.glStencilFunc(GL.GL_ALWAYS, 0, 0xffffffff)
+        GL.glDisable(GL.GL_STENCIL_TEST)
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        # the cache follows the state above
+        self.invalidate_state()
+        self._texure = 0
+        self._stencilMask = 0xffffffff
+        self._stencilFunc = StencilFunc()
+        self._stencilOp = (STENCIL_KEEP, STENCIL_KEEP)
+        self._caps = {GL.GL_CULL_FACE: True,
+                      GL.GL_STENCIL_TEST: False, GL.GL_SCISSOR_TEST: False}
+        self._colorMask = True
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        GL.glDisableVertexAttribArray(0)
-        GL.glDisableVertexAttribArray(1)
+        # keep the attributes enabled in the vao
         GL.glBindVertexArray(0)
         GL.glDisable(GL.GL_CULL_FACE)
         GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
         GL.glUseProgram(0)
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-
-    def render(self, data: nanovg.NVGdrawData):
+        self.invalidate_state()
+
+    def render(self, data: nanovg.NVGdrawData, pictures: Sequence[PictureDraw] = ()):
+        '''
+        pictures: drawn before data
+        '''
+        self.stats.reset()
+        with self.gpu_timer:
+            self._render(data, pictures)
+        if self._vertices and self._uniforms:
+            self._vertices.end_frame()
+            self._uniforms.end_frame()
+
+    def _render(self, data: nanovg.NVGdrawData, pictures: Sequence[PictureDraw]):
         if not self._pipeline:
+            if self.use_native:
+                self.use_native = load_native(self._get_proc_address)
             self._pipeline = Pipeline()
-            self._vertArr = GL.glGenVertexArrays(1)
-            self._vertBuf = GL.glGenBuffers(1)
-            self._fragBuf = GL.glGenBuffers(1)
+            self._vertices = VertexStream(stats=self.stats)
+            self._uniforms = StreamBuffer(
+                GL.GL_UNIFORM_BUFFER, stats=self.stats)
+        assert self._vertices and self._uniforms
+
+        # the storage of the segment is reused after the gpu finished it
+        self._vertices.begin_frame()
+        self._uniforms.begin_frame()
 
         # Upload ubo for frag shaders
-        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self._fragBuf)
-        GL.glBufferData(GL.GL_UNIFORM_BUFFER, data.uniformByteSize,
-                        ctypes.c_void_p(data.pUniform), GL.GL_STREAM_DRAW)  # type: ignore
+        uniform_base = 0
+        if data.uniformByteSize:  # type: ignore
+            uniform_base = self._uniforms.upload(
+                ctypes.c_void_p(data.pUniform), data.uniformByteSize,  # type: ignore
+                self._pipeline.uniform_alignment)
 
         # Upload vertex data
-        GL.glBindVertexArray(self._vertArr)
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self._vertBuf)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER,
-                        data.vertexCount * ctypes.sizeof(nanovg.NVGvertex), ctypes.c_void_p(data.pVertex), GL.GL_STREAM_DRAW)  # type: ignore
-        GL.glEnableVertexAttribArray(0)
-        GL.glEnableVertexAttribArray(1)
-        GL.glVertexAttribPointer(0, 2, GL.GL_FLOAT, GL.GL_FALSE,
-                                 ctypes.sizeof(nanovg.NVGvertex), ctypes.c_void_p(0))
-        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE,
-                                 ctypes.sizeof(nanovg.NVGvertex), ctypes.c_void_p(
-                                     0 + 2 * ctypes.sizeof(ctypes.c_float)))
-
-        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self._fragBuf)
-
-        p_call = ctypes.cast(ctypes.c_void_p(data.drawData),  # type: ignore
-                             P_CALL)
-        p_path = ctypes.cast(ctypes.c_void_p(data.pPath),  # type: ignore
-                             P_PATH)
+        self._vertices.upload(data.pVertex, data.vertexCount)  # type: ignore
 
         # Set view and texture just once per frame.
         self._pipeline.use()
@@ -329,12 +739,45 @@ class Renderer:
         self._pipeline.view.set_float2(data.view)
         GL.glActiveTexture(GL.GL_TEXTURE0)
 
+        if pictures:
+            self.draw_pictures(pictures, (data.view[0], data.view[1]))
+            self._vertices.bind()
+
+        # the buffer may be reallocated
+        self.selectUniforms(self._uniforms.handle, uniform_base)
+        self.setTransform(IDENTITY)
+        self.draw(data)
+
+    def draw_pictures(self, pictures: Sequence[PictureDraw], view: Tuple[float, float]):
+        viewport = None
+        for picture, transform, scissor in pictures:
+            if scissor:
+                if viewport is None:
+                    viewport = GL.glGetIntegerv(GL.GL_VIEWPORT)
+                self.scissor(viewport, view, scissor)
+            self.enable(GL.GL_SCISSOR_TEST, scissor is not None)
+            picture.bind()
+            self.selectUniforms(picture.ubo, 0)
+            self.setTransform(tuple(transform))  # type: ignore
+            self.draw(picture.data)
+        self.enable(GL.GL_SCISSOR_TEST, False)
+
+    def draw(self, data: nanovg.NVGdrawData):
+        '''
+        the vertices and the uniforms of data are bound
+        '''
+        if self.use_native:
+            self.draw_native(data)
+            return
+
+        p_call = ctypes.cast(ctypes.c_void_p(data.drawData),  # type: ignore
+                             P_CALL)
+        p_path = ctypes.cast(ctypes.c_void_p(data.pPath),  # type: ignore
+                             P_PATH)
         for i in range(data.drawCount):  # type: ignore
             call = p_call[i]
 
-            blendFunc = blendCompositeOperation(call.blendFunc)
-
-            self.blendFuncSeparate(blendFunc)
+            self.blend(call.blendFunc)
             match call.type:
                 case nanovg.GLNVGcallType.GLNVG_FILL:
                     self.fill(call, p_path)
@@ -344,6 +787,7 @@ class Renderer:
                     self.stroke(call, p_path)
                 case nanovg.GLNVGcallType.GLNVG_TRIANGLES:
                     self.triangles(call)
+        self.enable(GL.GL_STENCIL_TEST, False)
 
 
 g_renderer = None
@@ -396,9 +840,13 @@ def getTexture(p, image: int):
 GetTexture = RrenderGetTextureType(getTexture)
 
 
-def init(vg):
+def init(vg, *, use_native=False, get_proc_address: Optional[Callable[[str], int]] = None):
+    '''
+    use_native: see Renderer
+    '''
     global g_renderer
-    g_renderer = Renderer()
+    g_renderer = Renderer(use_native=use_native,
+                          get_proc_address=get_proc_address)
     params = nanovg.nvgParams(vg)
     params.renderCreateTexture = ctypes.cast(  # type: ignore
         CreateTexture, ctypes.c_void_p)
@@ -415,7 +863,7 @@ def delete():
     del g_renderer
 
 
-def render(data: nanovg.NVGdrawData):
+def render(data: nanovg.NVGdrawData, pictures: Sequence[PictureDraw] = ()):
     assert(g_renderer)
     with g_renderer:
-        g_renderer.render(data)
+        g_renderer.render(data, pictures)
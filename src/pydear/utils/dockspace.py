@@ -136,11 +136,14 @@ def show_docks(views: Iterable[Dock],
 
 
 class DockingGui(gui_app.Gui):
-    def __init__(self, loop: asyncio.AbstractEventLoop, *, docks: List[Dock], menu: Optional[Callable[[], None]] = None, setting=None) -> None:
+    def __init__(self, loop: asyncio.AbstractEventLoop, *, docks: List[Dock], menu: Optional[Callable[[], None]] = None, setting=None,
+                 scheduler=None, framebuffer=0, use_native_renderer=False, get_proc_address=None) -> None:
         def draw():
             show_docks(self.views, menu)
 
-        super().__init__(loop, widgets=draw, setting=setting)
+        super().__init__(loop, widgets=draw, setting=setting,
+                         use_native_renderer=use_native_renderer, get_proc_address=get_proc_address,
+                         scheduler=scheduler, framebuffer=framebuffer)
 
         io = ImGui.GetIO()
         io.ConfigFlags |= ImGui.ImGuiConfigFlags_.DockingEnable
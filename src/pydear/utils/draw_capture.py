@@ -0,0 +1,178 @@
+'''
+ImDrawData as numpy structured arrays, and the .npz frame capture.
+
+requires numpy.
+
+arrays = draw_capture.from_draw_data(ImGui.GetDrawData())
+draw_capture.save_npz('frame.npz', arrays)
+
+replay = draw_capture.DrawDataReplay(draw_capture.load_npz('frame.npz'))
+renderer.render(replay.draw_data)
+'''
+from typing import NamedTuple, List, Tuple, Optional, Dict, Union
+import ctypes
+import pathlib
+import numpy
+from pydear import imgui as ImGui
+
+P_DRAW_LIST = ctypes.POINTER(ImGui.ImDrawList)
+
+# same layout as ImDrawVert
+VERTEX_DTYPE = numpy.dtype({
+    'names': ['pos', 'uv', 'col'],
+    'formats': [('<f4', 2), ('<f4', 2), '<u4'],
+    'offsets': [ImGui.ImDrawVert.pos.offset, ImGui.ImDrawVert.uv.offset, ImGui.ImDrawVert.col.offset],
+    'itemsize': ctypes.sizeof(ImGui.ImDrawVert),
+})
+
+INDEX_DTYPE = numpy.dtype('<u2')
+
+# same layout as ImDrawCmd. UserCallback and UserCallbackData are padding
+COMMAND_DTYPE = numpy.dtype({
+    'names': ['clip_rect', 'texture', 'vtx_offset', 'idx_offset', 'elem_count'],
+    'formats': [('<f4', 4), numpy.uintp, '<u4', '<u4', '<u4'],
+    'offsets': [ImGui.ImDrawCmd.ClipRect.offset, ImGui.ImDrawCmd.TextureId.offset,
+                ImGui.ImDrawCmd.VtxOffset.offset, ImGui.ImDrawCmd.IdxOffset.offset,
+                ImGui.ImDrawCmd.ElemCount.offset],
+    'itemsize': ctypes.sizeof(ImGui.ImDrawCmd),
+})
+
+# .npz. no padding
+PACKED_COMMAND_DTYPE = numpy.dtype([
+    ('clip_rect', '<f4', 4),
+    ('texture', '<u8'),
+    ('vtx_offset', '<u4'),
+    ('idx_offset', '<u4'),
+    ('elem_count', '<u4'),
+])
+
+
+class DrawListArrays(NamedTuple):
+    vertices: numpy.ndarray
+    indices: numpy.ndarray
+    commands: numpy.ndarray
+
+
+class DrawDataArrays(NamedTuple):
+    display_pos: Tuple[float, float]
+    display_size: Tuple[float, float]
+    framebuffer_scale: Tuple[float, float]
+    lists: List[DrawListArrays]
+
+    def copy(self) -> 'DrawDataArrays':
+        '''
+        own the memory. from_draw_data returns views.
+        '''
+        return self._replace(lists=[DrawListArrays(l.vertices.copy(), l.indices.copy(), l.commands.copy())
+                                    for l in self.lists])
+
+
+def _vector_array(vector: ImGui.ImVector, t: type, dtype: numpy.dtype) -> numpy.ndarray:
+    # t and dtype have the same itemsize
+    return numpy.frombuffer(vector.view(t), dtype)
+
+
+def from_draw_data(draw_data: ImGui.ImDrawData) -> DrawDataArrays:
+    '''
+    zero copy views of each ImDrawList. valid until the next ImGui.NewFrame.
+    '''
+    lists = []
+    for p_command_list in ImGui.iterate(draw_data.CmdLists, P_DRAW_LIST, draw_data.CmdListsCount):
+        command_list = p_command_list[0]
+        lists.append(DrawListArrays(
+            _vector_array(command_list.VtxBuffer,
+                          ImGui.ImDrawVert, VERTEX_DTYPE),
+            _vector_array(command_list.IdxBuffer,
+                          ctypes.c_uint16, INDEX_DTYPE),
+            _vector_array(command_list.CmdBuffer,
+                          ImGui.ImDrawCmd, COMMAND_DTYPE)))
+    return DrawDataArrays(
+        (draw_data.DisplayPos.x, draw_data.DisplayPos.y),
+        (draw_data.DisplaySize.x, draw_data.DisplaySize.y),
+        (draw_data.FramebufferScale.x, draw_data.FramebufferScale.y),
+        lists)
+
+
+def _convert_commands(commands: numpy.ndarray, dtype: numpy.dtype) -> numpy.ndarray:
+    dst = numpy.zeros(len(commands), dtype)
+    for name in PACKED_COMMAND_DTYPE.names:
+        dst[name] = commands[name]
+    return dst
+
+
+def save_npz(path: Union[str, pathlib.Path], arrays: DrawDataArrays):
+    data = {
+        'display': numpy.array([*arrays.display_pos, *arrays.display_size, *arrays.framebuffer_scale],
+                               dtype='<f4'),
+    }
+    for i, l in enumerate(arrays.lists):
+        data[f'vertices_{i}'] = l.vertices.astype(VERTEX_DTYPE, copy=False)
+        data[f'indices_{i}'] = l.indices.astype(INDEX_DTYPE, copy=False)
+        data[f'commands_{i}'] = _convert_commands(
+            l.commands, PACKED_COMMAND_DTYPE)
+    numpy.savez_compressed(path, **data)
+
+
+def load_npz(path: Union[str, pathlib.Path]) -> DrawDataArrays:
+    with numpy.load(path) as npz:
+        display = npz['display']
+        lists = []
+        while f'vertices_{len(lists)}' in npz:
+            i = len(lists)
+            lists.append(DrawListArrays(
+                npz[f'vertices_{i}'], npz[f'indices_{i}'], npz[f'commands_{i}']))
+    return DrawDataArrays(
+        (float(display[0]), float(display[1])),
+        (float(display[2]), float(display[3])),
+        (float(display[4]), float(display[5])),
+        lists)
+
+
+def _set_vector(vector: ImGui.ImVector, array: numpy.ndarray):
+    vector.Size = len(array)
+    vector.Capacity = len(array)
+    vector.Data = array.ctypes.data if len(array) else None
+
+
+class DrawDataReplay:
+    '''
+    ImDrawData built from DrawDataArrays. pass draw_data to impl_opengl3.Renderer.render.
+
+    textures: texture id in the capture => texture id to bind. ex: the font texture.
+    '''
+
+    def __init__(self, arrays: DrawDataArrays, *, textures: Optional[Dict[int, int]] = None) -> None:
+        count = len(arrays.lists)
+        # keep the memory referred by draw_data
+        self._arrays: List[numpy.ndarray] = []
+        self._lists = (ImGui.ImDrawList * count)()
+        self._pointers = (ctypes.c_void_p * count)()
+        total_vtx = 0
+        total_idx = 0
+        for i, l in enumerate(arrays.lists):
+            vertices = numpy.ascontiguousarray(l.vertices.astype(VERTEX_DTYPE, copy=False))
+            indices = numpy.ascontiguousarray(l.indices.astype(INDEX_DTYPE, copy=False))
+            commands = _convert_commands(l.commands, COMMAND_DTYPE)
+            if textures:
+                commands['texture'] = [textures.get(int(texture), int(texture))
+                                       for texture in commands['texture']]
+            self._arrays += [vertices, indices, commands]
+
+            draw_list = self._lists[i]
+            _set_vector(draw_list.VtxBuffer, vertices)
+            _set_vector(draw_list.IdxBuffer, indices)
+            _set_vector(draw_list.CmdBuffer, commands)
+            self._pointers[i] = ctypes.addressof(draw_list)
+            total_vtx += len(vertices)
+            total_idx += len(indices)
+
+        self.draw_data = ImGui.ImDrawData()
+        self.draw_data.Valid = True
+        self.draw_data.CmdListsCount = count
+        self.draw_data.TotalVtxCount = total_vtx
+        self.draw_data.TotalIdxCount = total_idx
+        self.draw_data.CmdLists = ctypes.addressof(self._pointers)
+        self.draw_data.DisplayPos = ImGui.ImVec2(*arrays.display_pos)
+        self.draw_data.DisplaySize = ImGui.ImVec2(*arrays.display_size)
+        self.draw_data.FramebufferScale = ImGui.ImVec2(
+            *arrays.framebuffer_scale)
@@ -3,6 +3,7 @@ import ctypes
 from pydear import imgui as ImGui
 from glglue.camera.mouse_event import MouseEvent
 from glglue.frame_input import FrameInput
+from .gpu_timer import GpuTimer
 
 
 RenderCallback: TypeAlias = Callable[[FrameInput], None]
@@ -18,8 +19,17 @@ class FboView:
         self.tint = ImGui.ImVec4(1, 1, 1, 1)
         self.mouse_event = MouseEvent()
         self.render = render
+        # reused every frame
+        self._pos = ImGui.ImVec2()
+        self._size = ImGui.ImVec2()
+        # clear and render callback. enabled by Profiler.gpu_enabled
+        self.gpu_timer = GpuTimer('gpu:fbo')
 
     def show_fbo(self, x: int, y: int, w: int, h: int):
+        with self.gpu_timer:
+            self._show_fbo(x, y, w, h)
+
+    def _show_fbo(self, x: int, y: int, w: int, h: int):
         assert w
         assert h
         texture = self.fbo_manager.clear(int(w), int(h), self.clear_color)
@@ -68,10 +78,9 @@ class FboView:
             ImGui.ImGuiWindowFlags_.NoScrollbar
             | ImGui.ImGuiWindowFlags_.NoScrollWithMouse,
         ):
-            x, y = ImGui.GetWindowPos()
-            y += ImGui.GetFrameHeight()
-            w, h = ImGui.GetContentRegionAvail()
-            self.show_fbo(x, y, w, h)
+            pos = ImGui.GetWindowPos(self._pos)
+            size = ImGui.GetContentRegionAvail(self._size)
+            self.show_fbo(pos.x, pos.y + ImGui.GetFrameHeight(), size.x, size.y)
 
         ImGui.End()
         ImGui.PopStyleVar()
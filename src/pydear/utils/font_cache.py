@@ -0,0 +1,105 @@
+'''
+Disk cache of the built ImFontAtlas.
+
+ImFontAtlas.Build rasterizes all glyphs of the ranges.
+It takes hundreds of milliseconds with the nerdfont ranges.
+The cache file has the texture and the glyph tables, keyed by
+the font data, ImFontConfig, glyph ranges and the atlas settings.
+
+io = ImGui.GetIO()
+fontloader.load(path, 13, nerdfont.create_font_range(), merge=True)
+font_cache.build(io.Fonts, cache_dir)  # instead of io.Fonts.Build()
+'''
+from typing import Optional, Union
+import ctypes
+import hashlib
+import logging
+import pathlib
+import struct
+from pydear import imgui as ImGui
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.fontatlas'
+
+_CONFIG = struct.Struct('<ifii?ffffff?IfHi')
+_ATLAS = struct.Struct('<iiiI?')
+_CUSTOM_RECT = struct.Struct('<HHIfffi')
+
+
+def _glyph_ranges(p: Optional[int]) -> bytes:
+    '''
+    ImWchar pairs until 0
+    '''
+    if not p:
+        return b''
+    ranges = ctypes.cast(p, ctypes.POINTER(ctypes.c_uint16))
+    i = 0
+    while ranges[i]:
+        i += 2
+    return ctypes.string_at(p, i * 2)
+
+
+def get_key(atlas: ImGui.ImFontAtlas) -> str:
+    '''
+    digest of the inputs of ImFontAtlas.Build. call after all fonts are added.
+    '''
+    fonts = list(atlas.Fonts.view(ctypes.c_void_p))
+
+    def font_index(p: Optional[int]) -> int:
+        return fonts.index(p) if p in fonts else -1
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_ATLAS.pack(atlas.Flags, atlas.TexDesiredWidth, atlas.TexGlyphPadding,
+                         atlas.FontBuilderFlags, bool(atlas.FontBuilderIO)))
+    for config in atlas.ConfigData.each(ImGui.ImFontConfig):
+        if config.FontData and config.FontDataSize > 0:
+            h.update(hashlib.blake2b(ctypes.string_at(
+                config.FontData, config.FontDataSize), digest_size=16).digest())
+        h.update(_CONFIG.pack(
+            config.FontNo, config.SizePixels, config.OversampleH, config.OversampleV,
+            config.PixelSnapH,
+            config.GlyphExtraSpacing.x, config.GlyphExtraSpacing.y,
+            config.GlyphOffset.x, config.GlyphOffset.y,
+            config.GlyphMinAdvanceX, config.GlyphMaxAdvanceX,
+            config.MergeMode, config.FontBuilderFlags, config.RasterizerMultiply,
+            config.EllipsisChar, font_index(config.DstFont)))
+        ranges = _glyph_ranges(config.GlyphRanges)
+        h.update(struct.pack('<I', len(ranges)))
+        h.update(ranges)
+    for rect in atlas.CustomRects.each(ImGui.ImFontAtlasCustomRect):
+        h.update(_CUSTOM_RECT.pack(rect.Width, rect.Height, rect.GlyphID, rect.GlyphAdvanceX,
+                                   rect.GlyphOffset.x, rect.GlyphOffset.y, font_index(rect.Font)))
+    return h.hexdigest()
+
+
+def build(atlas: ImGui.ImFontAtlas, cache_dir: Union[str, pathlib.Path, None]) -> bool:
+    '''
+    restore the atlas from cache_dir, or ImFontAtlas.Build and save it.
+
+    return True if restored from the cache.
+    '''
+    if not cache_dir:
+        atlas.Build()
+        return False
+
+    cache_dir = pathlib.Path(cache_dir)
+    path = cache_dir / (get_key(atlas) + SUFFIX)
+    if path.exists():
+        try:
+            ImGui.Custom_LoadFontAtlas(atlas, path.read_bytes())
+            logger.debug(f'font atlas cache: {path}')
+            return True
+        except (OSError, ValueError) as ex:
+            logger.warning(f'{path}: {ex}')
+
+    atlas.Build()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # a partial file is not left on failure
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(ImGui.Custom_SaveFontAtlas(atlas))
+        tmp.replace(path)
+    except (OSError, ValueError) as ex:
+        logger.warning(f'{path}: {ex}')
+    return False
@@ -0,0 +1,105 @@
+from typing import Optional, Callable
+import asyncio
+import ctypes
+import zlib
+from pydear import imgui as ImGui
+
+P_DRAW_LIST = ctypes.POINTER(ImGui.ImDrawList)
+
+
+def draw_data_digest(draw_data: ImGui.ImDrawData) -> int:
+    '''
+    crc32 of display rect, vertices, indices and commands.
+    '''
+    crc = zlib.crc32(bytes(draw_data.DisplayPos) + bytes(draw_data.DisplaySize)
+                     + bytes(draw_data.FramebufferScale))
+    for p_command_list in ImGui.iterate(draw_data.CmdLists, P_DRAW_LIST, draw_data.CmdListsCount):
+        command_list = p_command_list[0]
+        # no copy. zlib reads the buffer protocol
+        crc = zlib.crc32(command_list.VtxBuffer.view(ImGui.ImDrawVert), crc)
+        crc = zlib.crc32(command_list.IdxBuffer.view(ctypes.c_uint16), crc)
+        crc = zlib.crc32(command_list.CmdBuffer.view(ImGui.ImDrawCmd), crc)
+    return crc
+
+
+class FrameScheduler:
+    '''
+    Power saving frame loop.
+
+    * GlfwApp blocks on glfw.wait_events_timeout while idle.
+    * Gui skips the renderer submission and GlfwApp skips swap_buffers when ImDrawData is unchanged.
+      the back buffer keeps showing the last frame.
+
+    Call request_redraw for animations or content drawn outside ImGui.
+    ImplGlfwInput(scheduler=) requests on input.
+    A worker thread calls wake after loop.call_soon_threadsafe.
+
+    enabled: False renders every frame.
+    idle_timeout: max seconds to block.
+    pending_timeout: max seconds to block while asyncio has pending tasks.
+        the loop runs only between frames. a task waiting for a timer or I/O
+        runs up to pending_timeout late. asyncio has no public api to tell when it is due.
+    wake: interrupt the blocking wait. thread safe. GlfwApp sets glfw.post_empty_event
+    active_frames: frames to keep rendering after request_redraw.
+    keep_target: False if the render target does not keep the last frame.
+        e.g. the headless framebuffer is cleared every frame, and nothing is swapped.
+        the unchanged frame is drawn again, but it is still idle.
+    '''
+
+    def __init__(self, *, enabled=False, idle_timeout=0.5, pending_timeout=0.05, active_frames=3, keep_target=True,
+                 wake: Optional[Callable[[], None]] = None) -> None:
+        self.enabled = enabled
+        self.keep_target = keep_target
+        self.idle_timeout = idle_timeout
+        self.pending_timeout = pending_timeout
+        self._wake = wake
+        self.active_frames = active_frames
+        self._redraw_frames = active_frames
+        self._digest: Optional[int] = None
+        # the last frame did not submit
+        self.skipped = False
+
+    def request_redraw(self, frames: int = 0):
+        self._redraw_frames = max(self._redraw_frames,
+                                  frames if frames > 0 else self.active_frames)
+
+    def wake(self):
+        '''
+        request_redraw and return from the blocking wait. thread safe.
+        '''
+        self.request_redraw()
+        if self._wake:
+            self._wake()
+
+    def update(self, digest: int) -> bool:
+        '''
+        return True if the frame should be submitted.
+        '''
+        if not self.enabled:
+            self.skipped = False
+            return True
+        if self._redraw_frames > 0:
+            self._redraw_frames -= 1
+            changed = True
+        else:
+            changed = digest != self._digest
+        self._digest = digest
+        self.skipped = not changed
+        return changed
+
+    def is_idle(self) -> bool:
+        return self.enabled and self.skipped and self._redraw_frames == 0
+
+    def should_draw(self) -> bool:
+        '''
+        after update. False if the target already shows the frame.
+        '''
+        return not self.skipped or not self.keep_target
+
+    def get_timeout(self, loop: asyncio.AbstractEventLoop) -> float:
+        '''
+        seconds to block. pending_timeout if asyncio has pending tasks.
+        '''
+        if asyncio.all_tasks(loop):
+            return min(self.idle_timeout, self.pending_timeout)
+        return self.idle_timeout
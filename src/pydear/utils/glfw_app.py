@@ -6,6 +6,8 @@ import glfw
 from OpenGL import GL
 import ctypes
 from .setting import BinSetting
+from .frame_scheduler import FrameScheduler
+from .profiler import PROFILER
 logger = logging.getLogger(__name__)
 
 
@@ -35,15 +37,27 @@ class GlfwApp:
     def __init__(self, title: str, *,
                  width=1024, height=768,
                  gl_major=4, gl_minor=3, use_core_profile=True,
-                 use_vsync=True, setting: Optional[BinSetting] = None) -> None:
+                 use_vsync=True, setting: Optional[BinSetting] = None,
+                 power_saving=False, headless: Optional[str] = None) -> None:
+        '''
+        power_saving: block while idle. pass scheduler to Gui and ImplGlfwInput.
+        headless: 'egl' or 'osmesa'. no display. draw to GlfwApp.framebuffer.
+            see pydear.utils.headless
+        '''
 
         self.setting = setting
         self.loop = asyncio.get_event_loop()
+        # the headless framebuffer is cleared every frame
+        self.scheduler = FrameScheduler(
+            enabled=power_saving, keep_target=not headless, wake=glfw.post_empty_event)
 
         def glfw_error_callback(error: int, description: str):
             logger.error(f"{error}: {description}")
         glfw.set_error_callback(glfw_error_callback)
 
+        if headless:
+            # window and input without a display
+            glfw.init_hint(glfw.PLATFORM, glfw.PLATFORM_NULL)
         if not glfw.init():
             raise RuntimeError('glfw.init')
 
@@ -53,6 +67,9 @@ class GlfwApp:
             # Context profiles are only defined for OpenGL version 3.2 and above
             glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
         # glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, GL.GL_TRUE)
+        if headless:
+            glfw.window_hint(glfw.CLIENT_API, glfw.NO_API)
+            glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
 
         data = self.setting[SETTING_KEY] if self.setting else None
         state = GlfwAppState.load(
@@ -70,14 +87,21 @@ class GlfwApp:
 
         # glfw.set_window_size_callback(self.window, self.on_size)
         glfw.set_window_maximize_callback(self.window, self.on_maximized)
+        glfw.set_window_refresh_callback(self.window, self.on_refresh)
         if state.is_maximized:
             glfw.maximize_window(self.window)
 
-        glfw.make_context_current(self.window)
-        if use_vsync:
-            glfw.swap_interval(1)
+        self.headless = None
+        if headless:
+            from .headless import HeadlessContext
+            self.headless = HeadlessContext(
+                w, h, api=headless, gl_major=gl_major, gl_minor=gl_minor, use_core_profile=use_core_profile)
         else:
-            glfw.swap_interval(0)
+            glfw.make_context_current(self.window)
+            if use_vsync:
+                glfw.swap_interval(1)
+            else:
+                glfw.swap_interval(0)
 
         glfw.set_time(0)
         logging.debug(GL.glGetString(GL.GL_VERSION))
@@ -91,23 +115,46 @@ class GlfwApp:
             logging.debug(f'save state: {state}')
             self.setting[SETTING_KEY] = state.to_json().encode('utf-8')
 
+    @property
+    def framebuffer(self) -> int:
+        '''
+        0 or the framebuffer object of the headless context.
+        '''
+        return self.headless.framebuffer if self.headless else 0
+
     def on_maximized(self, window, maximized):
         self.is_maximized = maximized
 
-    def clear(self) -> bool:
-
-        glfw.swap_buffers(self.window)
+    def on_refresh(self, window):
+        # the window contents are damaged
+        self.scheduler.request_redraw()
 
-        self.loop.call_soon(self.loop.stop)
-        self.loop.run_forever()
+    def clear(self) -> bool:
 
-        glfw.poll_events()
+        if not self.scheduler.skipped and not self.headless:
+            with PROFILER.section('swap'):
+                glfw.swap_buffers(self.window)
+        PROFILER.end_frame()
+
+        with PROFILER.section('asyncio'):
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+
+        with PROFILER.section('events'):
+            timeout = self.scheduler.get_timeout(
+                self.loop) if self.scheduler.is_idle() else 0
+            if timeout > 0:
+                glfw.wait_events_timeout(timeout)
+            else:
+                glfw.poll_events()
         if glfw.window_should_close(self.window):
             return False
 
         self.width, self.height = glfw.get_window_size(self.window)
         width, height = glfw.get_framebuffer_size(self.window)
-        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+        if self.headless:
+            self.headless.resize(width, height)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
         GL.glViewport(0, 0, width, height)
         GL.glScissor(0, 0, width, height)
         GL.glClearColor(self.clear_color[0] * self.clear_color[3],
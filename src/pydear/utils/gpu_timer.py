@@ -0,0 +1,97 @@
+'''
+GPU time of render passes. the results are added to the Profiler as 'gpu' samples.
+
+timer = GpuTimer('gpu:scene')
+with timer:
+    draw()
+
+enabled by Profiler.gpu_enabled.
+'''
+from typing import Optional, List
+import ctypes
+import logging
+from OpenGL import GL
+from .profiler import Profiler, PROFILER
+
+logger = logging.getLogger(__name__)
+
+# queries in flight. the result of a query is read when it is reused.
+BUFFERS = 2
+
+
+class GpuTimer:
+    '''
+    a pair of GL_TIMESTAMP queries per pass.
+    GL_TIME_ELAPSED can not nest. ex: GizmoVertexBuffer.render in the FboView render callback.
+
+    the result is read when the query is reused BUFFERS frames later.
+    never waits for the GPU. a result that is not available yet is dropped.
+    use once per frame. require the same GL context.
+    '''
+
+    def __init__(self, name: str, profiler: Optional[Profiler] = None) -> None:
+        self.name = name
+        self.profiler = profiler if profiler else PROFILER
+        self._queries: Optional[ctypes.Array] = None
+        self._pending: List[bool] = [False] * BUFFERS
+        self._index = 0
+        self._active = False
+        self.last_ms = 0.0
+        self.dropped = 0
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        if self._queries:
+            try:
+                GL.glDeleteQueries(len(self._queries), self._queries)
+            except Exception:
+                # no context
+                pass
+            self._queries = None
+            self._pending = [False] * BUFFERS
+
+    def _query_result(self, query: int) -> int:
+        value = ctypes.c_uint64()
+        GL.glGetQueryObjectui64v(
+            query, GL.GL_QUERY_RESULT, ctypes.byref(value))
+        return value.value
+
+    def _collect(self, index: int):
+        if not self._pending[index]:
+            return
+        self._pending[index] = False
+        assert self._queries
+        begin = self._queries[index * 2]
+        end = self._queries[index * 2 + 1]
+        available = ctypes.c_int()
+        GL.glGetQueryObjectiv(
+            end, GL.GL_QUERY_RESULT_AVAILABLE, ctypes.byref(available))
+        if not available.value:
+            self.dropped += 1
+            return
+        self.last_ms = (self._query_result(end) -
+                        self._query_result(begin)) / 1000000
+        self.profiler.add(self.name, self.last_ms, kind='gpu')
+
+    def __enter__(self):
+        if not self.profiler.gpu_enabled:
+            return self
+        if not self._queries:
+            self._queries = (GL.GLuint * (BUFFERS * 2))()
+            GL.glGenQueries(len(self._queries), self._queries)
+        self._collect(self._index)
+        GL.glQueryCounter(self._queries[self._index * 2], GL.GL_TIMESTAMP)
+        self._active = True
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self._active:
+            return
+        self._active = False
+        assert self._queries
+        GL.glQueryCounter(
+            self._queries[self._index * 2 + 1], GL.GL_TIMESTAMP)
+        self._pending[self._index] = True
+        self._index = (self._index + 1) % BUFFERS
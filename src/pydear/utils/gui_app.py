@@ -1,10 +1,13 @@
 from typing import Callable, Optional
 import ctypes
+import pathlib
 import asyncio
 import logging
 from pydear import imgui as ImGui
 from OpenGL import GL
 from .setting import BinSetting
+from .frame_scheduler import FrameScheduler, draw_data_digest
+from .profiler import PROFILER
 logger = logging.getLogger(__name__)
 
 SETTING_KEY = 'imgui'
@@ -13,10 +16,25 @@ SETTING_KEY = 'imgui'
 class Gui:
     def __init__(self, loop: asyncio.AbstractEventLoop, *,
                  widgets: Optional[Callable[[], None]] = None,
-                 setting: Optional[BinSetting] = None
+                 setting: Optional[BinSetting] = None,
+                 use_native_renderer=False,
+                 get_proc_address: Optional[Callable[[str], int]] = None,
+                 scheduler: Optional[FrameScheduler] = None,
+                 framebuffer: int = 0,
+                 font_cache: Optional[pathlib.Path] = None
                  ) -> None:
+        '''
+        get_proc_address: the gl loader of the native renderer. default is glfw.get_proc_address.
+            a headless GlfwApp has no glfw context. pass GlfwApp.headless.get_proc_address
+        scheduler: GlfwApp.scheduler. skip the submission of unchanged frames.
+        framebuffer: GlfwApp.framebuffer. the render target.
+        font_cache: directory to cache the built font atlas. see font_cache.build
+        '''
         self.setting = setting
+        self.font_cache = font_cache
+        self.framebuffer = framebuffer
         self.loop = loop
+        self.scheduler = scheduler
         ImGui.CreateContext()
 
         io = ImGui.GetIO()
@@ -29,7 +47,8 @@ class Gui:
         self._setup_font()
 
         from pydear.backends.impl_opengl3 import Renderer
-        self.impl_opengl = Renderer()
+        self.impl_opengl = Renderer(
+            use_native=use_native_renderer, get_proc_address=get_proc_address)
 
         def empty():
             pass
@@ -51,15 +70,31 @@ class Gui:
 
     def _setup_font(self):
         io = ImGui.GetIO()
-        io.Fonts.Build()
+        self._build_font(io.Fonts)
+
+    def _build_font(self, atlas: ImGui.ImFontAtlas):
+        '''
+        replaces ImFontAtlas.Build in _setup_font
+        '''
+        from . import font_cache
+        font_cache.build(atlas, self.font_cache)
 
     def render(self):
-        ImGui.NewFrame()
+        with PROFILER.section('widgets'):
+            ImGui.NewFrame()
 
-        self._widgets()
-        from .import modal
-        modal.show()
+            self._widgets()
+            from .import modal
+            modal.show()
 
-        ImGui.Render()
-        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
-        self.impl_opengl.render(ImGui.GetDrawData())
+        with PROFILER.section('ImGui.Render'):
+            ImGui.Render()
+        draw_data = ImGui.GetDrawData()
+        if self.scheduler and self.scheduler.enabled:
+            self.scheduler.update(draw_data_digest(draw_data))
+            # a target that GlfwApp.clear has cleared is drawn again
+            if not self.scheduler.should_draw():
+                return
+        with PROFILER.section('renderer'):
+            GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+            self.impl_opengl.render(draw_data)
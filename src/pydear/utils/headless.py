@@ -0,0 +1,217 @@
+'''
+GL context without a display. EGL (mesa surfaceless, llvmpipe) or OSMesa.
+
+PyOpenGL selects the platform at the first import of OpenGL.GL.
+call select_platform before that, or run with PYOPENGL_PLATFORM=egl (osmesa).
+
+headless = HeadlessContext(640, 480)
+# draw to headless.framebuffer
+pixels = headless.read_pixels()
+'''
+from typing import Optional
+import ctypes
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# EGL_MESA_platform_surfaceless
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+PLATFORM_NAMES = {
+    'egl': 'EGLPlatform',
+    'osmesa': 'OSMesaPlatform',
+}
+
+
+def select_platform(api: str = 'egl'):
+    if api not in PLATFORM_NAMES:
+        raise ValueError(f'unknown headless api: {api}')
+    if 'OpenGL.GL' in sys.modules and os.environ.get('PYOPENGL_PLATFORM') != api:
+        raise RuntimeError(
+            f'OpenGL.GL is already imported. set PYOPENGL_PLATFORM={api}')
+    os.environ['PYOPENGL_PLATFORM'] = api
+
+
+def _check_platform(api: str):
+    from OpenGL import platform
+    name = type(platform.PLATFORM).__name__
+    if name != PLATFORM_NAMES[api]:
+        raise RuntimeError(
+            f'PyOpenGL uses {name}. set PYOPENGL_PLATFORM={api} before importing OpenGL')
+
+
+class EglContext:
+    def __init__(self, gl_major: int, gl_minor: int, use_core_profile: bool) -> None:
+        from OpenGL import EGL
+        self._egl = EGL
+        self.display = EGL.eglGetPlatformDisplay(
+            EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+        major = EGL.EGLint()
+        minor = EGL.EGLint()
+        if not self.display or not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError('eglInitialize')
+        logger.debug(f'EGL-{major.value}.{minor.value}')
+
+        config_attribs = (EGL.EGLint * 5)(
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config), 1, ctypes.pointer(count)) or count.value == 0:
+            raise RuntimeError('eglChooseConfig')
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        profile = EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT if use_core_profile else EGL.EGL_CONTEXT_OPENGL_COMPATIBILITY_PROFILE_BIT
+        context_attribs = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, gl_major,
+            EGL.EGL_CONTEXT_MINOR_VERSION, gl_minor,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, profile,
+            EGL.EGL_NONE)
+        self.context = EGL.eglCreateContext(
+            self.display, config, EGL.EGL_NO_CONTEXT, context_attribs)
+        if not self.context:
+            raise RuntimeError('eglCreateContext')
+        self.make_current()
+
+    def make_current(self):
+        EGL = self._egl
+        # EGL_KHR_surfaceless_context. draw to a framebuffer object
+        if not EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self.context):
+            raise RuntimeError('eglMakeCurrent')
+
+    def close(self):
+        EGL = self._egl
+        if self.context:
+            EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE,
+                               EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self.display, self.context)
+            EGL.eglTerminate(self.display)
+            self.context = None
+
+
+class OsMesaContext:
+    def __init__(self, gl_major: int, gl_minor: int, use_core_profile: bool) -> None:
+        from OpenGL import osmesa
+        from OpenGL import GL
+        self._osmesa = osmesa
+        attribs = (ctypes.c_int * 9)(
+            osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+            osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE if use_core_profile else osmesa.OSMESA_COMPAT_PROFILE,
+            osmesa.OSMESA_CONTEXT_MAJOR_VERSION, gl_major,
+            osmesa.OSMESA_CONTEXT_MINOR_VERSION, gl_minor,
+            0)
+        self.context = osmesa.OSMesaCreateContextAttribs(attribs, None)
+        if not self.context:
+            raise RuntimeError('OSMesaCreateContextAttribs')
+        # MakeCurrent requires a color buffer. draw to a framebuffer object
+        self._buffer = (ctypes.c_ubyte * 4)()
+        self._type = GL.GL_UNSIGNED_BYTE
+        self.make_current()
+
+    def make_current(self):
+        if not self._osmesa.OSMesaMakeCurrent(self.context, self._buffer, self._type, 1, 1):
+            raise RuntimeError('OSMesaMakeCurrent')
+
+    def close(self):
+        if self.context:
+            self._osmesa.OSMesaDestroyContext(self.context)
+            self.context = None
+
+
+class HeadlessContext:
+    '''
+    current GL context and a RGBA8 + DEPTH24_STENCIL8 framebuffer object of width x height.
+    '''
+
+    def __init__(self, width: int, height: int, *, api='egl',
+                 gl_major=4, gl_minor=3, use_core_profile=True) -> None:
+        _check_platform(api)
+        match api:
+            case 'egl':
+                self._context = EglContext(gl_major, gl_minor, use_core_profile)
+            case 'osmesa':
+                self._context = OsMesaContext(
+                    gl_major, gl_minor, use_core_profile)
+            case _:
+                raise ValueError(f'unknown headless api: {api}')
+        self.api = api
+        self.width = 0
+        self.height = 0
+        self.framebuffer = 0
+        self._color = 0
+        self._depth_stencil = 0
+        self.resize(width, height)
+
+        from OpenGL import GL
+        logger.debug(
+            f'{api}: {GL.glGetString(GL.GL_VERSION)}, {GL.glGetString(GL.GL_RENDERER)}')
+
+    def close(self):
+        if self.framebuffer:
+            self._delete_framebuffer()
+        self._context.close()
+
+    def make_current(self):
+        self._context.make_current()
+
+    def get_proc_address(self, name: str) -> Optional[int]:
+        '''
+        eglGetProcAddress or OSMesaGetProcAddress.
+        ex: impl_opengl3.Renderer(use_native=True, get_proc_address=headless.get_proc_address)
+        '''
+        from OpenGL import platform
+        return platform.PLATFORM.getExtensionProcedure(name.encode('ascii'))
+
+    def _delete_framebuffer(self):
+        from OpenGL import GL
+        GL.glDeleteFramebuffers(1, [self.framebuffer])
+        GL.glDeleteRenderbuffers(2, [self._color, self._depth_stencil])
+        self.framebuffer = 0
+
+    def resize(self, width: int, height: int):
+        if width == self.width and height == self.height:
+            return
+        from OpenGL import GL
+        if self.framebuffer:
+            self._delete_framebuffer()
+        self.width = width
+        self.height = height
+
+        self._color = GL.glGenRenderbuffers(1)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self._color)
+        GL.glRenderbufferStorage(
+            GL.GL_RENDERBUFFER, GL.GL_RGBA8, width, height)
+        self._depth_stencil = GL.glGenRenderbuffers(1)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self._depth_stencil)
+        GL.glRenderbufferStorage(
+            GL.GL_RENDERBUFFER, GL.GL_DEPTH24_STENCIL8, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+
+        self.framebuffer = GL.glGenFramebuffers(1)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+        GL.glFramebufferRenderbuffer(
+            GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self._color)
+        GL.glFramebufferRenderbuffer(
+            GL.GL_FRAMEBUFFER, GL.GL_DEPTH_STENCIL_ATTACHMENT, GL.GL_RENDERBUFFER, self._depth_stencil)
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f'glCheckFramebufferStatus: {status}')
+
+    def read_pixels(self) -> bytes:
+        '''
+        RGBA8. the top row first.
+        '''
+        from OpenGL import GL
+        GL.glFinish()
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.framebuffer)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        stride = self.width * 4
+        buffer = (ctypes.c_ubyte * (stride * self.height))()
+        GL.glReadPixels(0, 0, self.width, self.height,
+                        GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, buffer)
+        data = bytes(buffer)
+        # GL is bottom up
+        return b''.join(data[y * stride:(y + 1) * stride] for y in range(self.height - 1, -1, -1))
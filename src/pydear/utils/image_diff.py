@@ -0,0 +1,113 @@
+'''
+compare RGBA8 images. ex: HeadlessContext.read_pixels before and after a renderer change.
+'''
+from typing import NamedTuple, Optional, Tuple, Union
+import pathlib
+import struct
+import zlib
+
+
+class ImageDiff(NamedTuple):
+    # pixels that any channel differs more than the threshold
+    pixels: int
+    max_delta: int
+    # x, y, w, h of the differing pixels
+    bounds: Optional[Tuple[int, int, int, int]]
+
+    @property
+    def is_equal(self) -> bool:
+        return self.pixels == 0
+
+
+def diff_images(expected: bytes, actual: bytes, width: int, height: int, *, threshold=0) -> ImageDiff:
+    '''
+    expected, actual: RGBA8, width x height
+    '''
+    size = width * height * 4
+    if len(expected) != size or len(actual) != size:
+        raise ValueError(
+            f'{width}x{height} requires {size} bytes: {len(expected)}, {len(actual)}')
+    if expected == actual:
+        return ImageDiff(0, 0, None)
+
+    import numpy
+    a = numpy.frombuffer(expected, numpy.uint8).reshape(height, width, 4)
+    b = numpy.frombuffer(actual, numpy.uint8).reshape(height, width, 4)
+    delta = numpy.abs(a.astype(numpy.int16) - b).max(axis=2)
+    mask = delta > threshold
+    ys, xs = numpy.nonzero(mask)
+    if len(xs) == 0:
+        return ImageDiff(0, int(delta.max()), None)
+    x0, x1 = int(xs.min()), int(xs.max())
+    y0, y1 = int(ys.min()), int(ys.max())
+    return ImageDiff(int(mask.sum()), int(delta.max()), (x0, y0, x1 - x0 + 1, y1 - y0 + 1))
+
+
+def diff_mask(expected: bytes, actual: bytes, width: int, height: int, *, threshold=0) -> bytes:
+    '''
+    RGBA8. red where the images differ, the expected image dimmed elsewhere.
+    '''
+    import numpy
+    a = numpy.frombuffer(expected, numpy.uint8).reshape(height, width, 4)
+    b = numpy.frombuffer(actual, numpy.uint8).reshape(height, width, 4)
+    mask = numpy.abs(a.astype(numpy.int16) - b).max(axis=2) > threshold
+    dst = (a // 4).astype(numpy.uint8)
+    dst[..., 3] = 255
+    dst[mask] = (255, 0, 0, 255)
+    return dst.tobytes()
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def save_png(path: Union[str, pathlib.Path], pixels: bytes, width: int, height: int):
+    '''
+    RGBA8, the top row first.
+    '''
+    stride = width * 4
+    # filter type 0 for each row
+    raw = b''.join(b'\0' + pixels[y * stride:(y + 1) * stride]
+                   for y in range(height))
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack(
+            '>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        f.write(_png_chunk(b'IDAT', zlib.compress(raw)))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def load_png(path: Union[str, pathlib.Path]) -> Tuple[bytes, int, int]:
+    '''
+    read the file written by save_png. RGBA8 without the row filters only.
+    return pixels, width, height
+    '''
+    data = pathlib.Path(path).read_bytes()
+    if not data.startswith(b'\x89PNG\r\n\x1a\n'):
+        raise ValueError(f'{path}: not png')
+    pos = 8
+    width = height = 0
+    idat = []
+    while pos < len(data):
+        length, = struct.unpack_from('>I', data, pos)
+        tag = data[pos + 4:pos + 8]
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if tag == b'IHDR':
+            width, height, depth, color_type, _, _, interlace = struct.unpack(
+                '>IIBBBBB', body)
+            if depth != 8 or color_type != 6 or interlace:
+                raise ValueError(f'{path}: not RGBA8')
+        elif tag == b'IDAT':
+            idat.append(body)
+        elif tag == b'IEND':
+            break
+    raw = zlib.decompress(b''.join(idat))
+    stride = width * 4
+    rows = []
+    for y in range(height):
+        row = raw[y * (stride + 1):(y + 1) * (stride + 1)]
+        if row[0] != 0:
+            raise ValueError(f'{path}: png row filter {row[0]} is not supported')
+        rows.append(row[1:])
+    return b''.join(rows), width, height
@@ -1,4 +1,4 @@
-from typing import NamedTuple, List, Optional
+from typing import NamedTuple, Optional
 import logging
 import ctypes
 from pydear import imgui as ImGui
@@ -24,12 +24,15 @@ class ImGuiLogHandler(logging.Handler):
 
     def __init__(self):
         super().__init__()
-        self.logs: List[Message] = []
+        # recorded once per message. replayed every frame.
+        # emit is called in self.lock(logging.Handler.handle)
+        self.commands = ImGui.CommandBuffer()
         self.auto_scroll = (ctypes.c_bool * 1)(True)
 
     def emit(self, record: logging.LogRecord):
         msg = self.format(record)
-        self.logs.append(Message(record.levelname, msg))
+        self.commands.TextColored(LOGLEVEL_COLORS.get(
+            record.levelname, DEFAULT_COLOR), msg)
 
     def write(self, m):
         pass
@@ -58,8 +61,6 @@ class ImGuiLogHandler(logging.Handler):
             ImGui.BeginChild("scrolling", (0, 0), False,
                              ImGui.ImGuiWindowFlags_.HorizontalScrollbar)
 
-            if clear:
-                self.logs.clear()
             if copy:
                 ImGui.LogToClipboard()
 
@@ -67,9 +68,11 @@ class ImGuiLogHandler(logging.Handler):
             # ImGuiListClipper clipper
             # clipper.Begin(LineOffsets.Size)
             # while (clipper.Step())
-            for log in self.logs:
-                ImGui.TextColored(LOGLEVEL_COLORS.get(
-                    log.level, DEFAULT_COLOR), log.message)
+            # a logging thread may emit while replaying
+            with self.lock:
+                if clear:
+                    self.commands.clear()
+                self.commands.replay()
             # clipper.End()
             ImGui.PopStyleVar()
 
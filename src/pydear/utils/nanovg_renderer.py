@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Callable, List, Tuple, Any
 import pathlib
 import contextlib
 from pydear import nanovg
@@ -14,13 +14,16 @@ def get_system_font() -> pathlib.Path:
 
 
 class NanoVgRenderer:
-    def __init__(self, font_path: Optional[pathlib.Path] = None, font_name='nanovg_font') -> None:
+    def __init__(self, font_path: Optional[pathlib.Path] = None, font_name='nanovg_font', *, use_native=False) -> None:
+        '''
+        use_native: nanovg_impl_opengl3.Renderer(use_native=True)
+        '''
         self.vg = nanovg.nvgCreate(nanovg.NVGcreateFlags.NVG_ANTIALIAS
                                    | nanovg.NVGcreateFlags.NVG_STENCIL_STROKES
                                    | nanovg.NVGcreateFlags.NVG_DEBUG)
         if not self.vg:
             raise RuntimeError("Could not init nanovg")
-        nanovg_impl_opengl3.init(self.vg)
+        nanovg_impl_opengl3.init(self.vg, use_native=use_native)
 
         if not font_path or not font_path.exists():
             font_path = get_system_font()
@@ -28,6 +31,8 @@ class NanoVgRenderer:
         self.font_path = str(font_path.absolute()).replace('\\', '/')
         self.font_initialized = False
         self.font_name = font_name
+        # drawn at end_frame
+        self._pictures: List[nanovg_impl_opengl3.PictureDraw] = []
 
     def init_font(self):
         '''
@@ -55,7 +60,36 @@ class NanoVgRenderer:
         return self.vg
 
     def end_frame(self):
-        nanovg_impl_opengl3.render(nanovg.nvgGetDrawData(self.vg))
+        nanovg_impl_opengl3.render(
+            nanovg.nvgGetDrawData(self.vg), self._pictures)
+        self._pictures.clear()
+
+    def record(self, width, height, draw: Callable[[Any], None]) -> nanovg_impl_opengl3.Picture:
+        '''
+        tessellate the nanovg calls of draw(vg) once and keep them in GPU buffers.
+        call outside of render().
+
+        grid = nvg.record(w, h, draw_grid)
+        with nvg.render(w, h) as vg:
+            nvg.draw_picture(grid)
+        '''
+        vg = self.begin_frame(width, height)
+        if not vg:
+            raise ValueError(f'empty picture: {width}x{height}')
+        draw(vg)
+        return nanovg_impl_opengl3.Picture(nanovg.nvgGetDrawData(vg))
+
+    def draw_picture(self, picture: nanovg_impl_opengl3.Picture,
+                     transform: nanovg_impl_opengl3.Transform = nanovg_impl_opengl3.IDENTITY,
+                     scissor: Optional[Tuple[float, float, float, float]] = None):
+        '''
+        replay the picture in this frame. the pictures are drawn before the nanovg calls of the frame.
+
+        transform: [a, b, c, d, e, f] same as nvgTransform
+        scissor: x, y, width, height. same as nvgScissor without the transform
+        '''
+        self._pictures.append(nanovg_impl_opengl3.PictureDraw(
+            picture, transform, scissor))
 
     @contextlib.contextmanager
     def render(self, w, h):
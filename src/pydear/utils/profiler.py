@@ -0,0 +1,280 @@
+'''
+CPU section timings per frame.
+
+GlfwApp, Gui and ImplGlfwInput time their work with PROFILER.
+set PROFILER.enabled and show ProfilerView as a Dock.
+PROFILER.gpu_enabled adds the GPU time of the renderers. see gpu_timer.
+
+with PROFILER.section('update'):
+    ...
+
+@PROFILER.section('draw')
+def draw():
+    ...
+'''
+from typing import Dict, List, Optional, Iterable
+import ctypes
+import functools
+import math
+import time
+from pydear import imgui as ImGui
+
+DEFAULT_CAPACITY = 240
+# time between end_frame calls
+FRAME = 'frame'
+
+
+class Samples:
+    '''
+    milliseconds per frame in a ring buffer. float for ImGui.PlotHistogram.
+    '''
+
+    def __init__(self, name: str, capacity: int, depth: int, kind='cpu') -> None:
+        self.name = name
+        # nesting level of the first call
+        self.depth = depth
+        # 'cpu' or 'gpu'
+        self.kind = kind
+        self.values = (ctypes.c_float * capacity)()
+        # accumulated in the current frame
+        self.current = 0.0
+
+
+class Section:
+    '''
+    context manager and decorator. not reentrant.
+    '''
+    __slots__ = ('_profiler', '_name', '_samples', '_start')
+
+    def __init__(self, profiler: 'Profiler', name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._samples: Optional[Samples] = None
+        self._start = 0.0
+
+    def __enter__(self):
+        profiler = self._profiler
+        if profiler.enabled:
+            if not self._samples:
+                self._samples = profiler._add_samples(self._name)
+            profiler._depth += 1
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._start:
+            self._samples.current += (time.perf_counter() -  # type: ignore
+                                      self._start) * 1000
+            self._profiler._depth -= 1
+            self._start = 0.0
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def profiled(*args, **kw):
+            with self:
+                return function(*args, **kw)
+        return profiled
+
+
+class Profiler:
+    '''
+    capacity: frames to keep.
+    '''
+
+    def __init__(self, *, capacity=DEFAULT_CAPACITY, enabled=False, gpu_enabled=False) -> None:
+        self.capacity = capacity
+        self.enabled = enabled
+        # GpuTimer
+        self.gpu_enabled = gpu_enabled
+        self._sections: Dict[str, Section] = {}
+        self.samples: Dict[str, Samples] = {
+            FRAME: Samples(FRAME, capacity, 0)}
+        self._depth = 0
+        # next frame to write
+        self.head = 0
+        self.count = 0
+        self._last_frame = 0.0
+
+    def section(self, name: str) -> Section:
+        section = self._sections.get(name)
+        if not section:
+            section = Section(self, name)
+            self._sections[name] = section
+        return section
+
+    def _add_samples(self, name: str, kind='cpu') -> Samples:
+        samples = Samples(name, self.capacity, self._depth, kind)
+        self.samples[name] = samples
+        return samples
+
+    def add(self, name: str, ms: float, *, kind='cpu'):
+        '''
+        add to the current frame. ex: the GPU time of a previous frame.
+        '''
+        if not self.enabled:
+            return
+        samples = self.samples.get(name)
+        if not samples:
+            samples = self._add_samples(name, kind)
+        samples.current += ms
+
+    def end_frame(self):
+        if not self.enabled:
+            self._last_frame = 0.0
+            return
+        now = time.perf_counter()
+        frame = self.samples[FRAME]
+        frame.current = (now - self._last_frame) * \
+            1000 if self._last_frame else 0.0
+        self._last_frame = now
+        head = self.head
+        for samples in self.samples.values():
+            samples.values[head] = samples.current
+            samples.current = 0.0
+        self.head = (head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def clear(self):
+        for samples in self.samples.values():
+            ctypes.memset(samples.values, 0, ctypes.sizeof(samples.values))
+            samples.current = 0.0
+        self.head = 0
+        self.count = 0
+        self._last_frame = 0.0
+
+    def last(self, name: str) -> float:
+        samples = self.samples.get(name)
+        if not samples or not self.count:
+            return 0.0
+        return samples.values[(self.head - 1) % self.capacity]
+
+    def values(self, name: str) -> List[float]:
+        '''
+        the oldest first.
+        '''
+        samples = self.samples.get(name)
+        if not samples:
+            return []
+        if self.count < self.capacity:
+            return samples.values[:self.count]
+        return samples.values[self.head:] + samples.values[:self.head]
+
+    def percentiles(self, name: str, ps: Iterable[float]) -> List[float]:
+        '''
+        nearest rank
+        '''
+        values = sorted(self.values(name))
+        if not values:
+            return [0.0 for _ in ps]
+        return [values[max(0, min(len(values), math.ceil(p / 100 * len(values))) - 1)] for p in ps]
+
+
+PROFILER = Profiler()
+
+
+# ImGuiCol_ Button. ABGR
+COLORS = [0xFFA7794E, 0xFF2B8EF2, 0xFF5957E1, 0xFFB2B776,
+          0xFF4FA159, 0xFF48C9ED, 0xFFA17AB0, 0xFFA79DFF]
+
+
+class ProfilerView:
+    '''
+    Dock window. statistics, per section histograms and the flame graph of the mean.
+    '''
+
+    def __init__(self, profiler: Optional[Profiler] = None, *, name='profiler') -> None:
+        self.profiler = profiler if profiler else PROFILER
+        self.name = name
+        self.enabled = (ctypes.c_bool * 1)(self.profiler.enabled)
+        self.gpu_enabled = (ctypes.c_bool * 1)(self.profiler.gpu_enabled)
+
+    def show(self, p_open: Optional[ctypes.Array]):
+        if p_open and not p_open[0]:
+            return
+
+        if ImGui.Begin(self.name, p_open):
+            self.enabled[0] = self.profiler.enabled
+            if ImGui.Checkbox('enabled', self.enabled):
+                self.profiler.enabled = self.enabled[0]
+            ImGui.SameLine()
+            self.gpu_enabled[0] = self.profiler.gpu_enabled
+            if ImGui.Checkbox('gpu', self.gpu_enabled):
+                self.profiler.gpu_enabled = self.gpu_enabled[0]
+            ImGui.SameLine()
+            if ImGui.Button('clear'):
+                self.profiler.clear()
+
+            names = list(self.profiler.samples.keys())
+            stats = {name: self._stats(name) for name in names}
+            self._show_table(names, stats)
+            self._show_flame(names, stats)
+            self._show_histograms(names, stats)
+        ImGui.End()
+
+    def _stats(self, name: str):
+        values = self.profiler.values(name)
+        mean = sum(values) / len(values) if values else 0.0
+        p50, p95, p99 = self.profiler.percentiles(name, (50, 95, 99))
+        return (self.profiler.last(name), mean, p50, p95, p99, max(values, default=0.0))
+
+    def _show_table(self, names: List[str], stats):
+        flags = (ImGui.ImGuiTableFlags_.Borders
+                 | ImGui.ImGuiTableFlags_.RowBg
+                 | ImGui.ImGuiTableFlags_.SizingFixedFit)
+        if ImGui.BeginTable('sections', 7, flags):
+            for label in ('ms', 'last', 'mean', 'p50', 'p95', 'p99', 'max'):
+                ImGui.TableSetupColumn(label)
+            ImGui.TableHeadersRow()
+            for name in names:
+                ImGui.TableNextRow()
+                ImGui.TableNextColumn()
+                samples = self.profiler.samples[name]
+                ImGui.TextUnformatted(
+                    '  ' * samples.depth + name if samples.kind == 'cpu' else f'{name} ({samples.kind})')
+                for value in stats[name]:
+                    ImGui.TableNextColumn()
+                    ImGui.TextUnformatted(f'{value:.3f}')
+            ImGui.EndTable()
+
+    def _show_flame(self, names: List[str], stats):
+        '''
+        one row per depth. the width is the mean per frame.
+        '''
+        frame_mean = stats[FRAME][1]
+        if frame_mean <= 0:
+            return
+        width = ImGui.GetContentRegionAvail().x
+        depths: Dict[int, List[str]] = {}
+        for name in names:
+            if name != FRAME and self.profiler.samples[name].kind == 'cpu':
+                depths.setdefault(
+                    self.profiler.samples[name].depth, []).append(name)
+        for depth in sorted(depths):
+            ImGui.NewLine()
+            for i, name in enumerate(depths[depth]):
+                mean = stats[name][1]
+                w = width * mean / frame_mean
+                if w < 1:
+                    continue
+                ImGui.SameLine(0, 0)
+                ImGui.PushStyleColor(ImGui.ImGuiCol_.Button,
+                                     COLORS[i % len(COLORS)])
+                ImGui.Button(f'{name}##flame', (w, 0))
+                ImGui.PopStyleColor()
+                if ImGui.IsItemHovered():
+                    ImGui.BeginTooltip()
+                    ImGui.TextUnformatted(
+                        f'{name}: {mean:.3f}ms ({mean / frame_mean * 100:.1f}%)')
+                    ImGui.EndTooltip()
+
+    def _show_histograms(self, names: List[str], stats):
+        profiler = self.profiler
+        if not profiler.count:
+            return
+        # the oldest first
+        offset = profiler.head if profiler.count == profiler.capacity else 0
+        for name in names:
+            samples = profiler.samples[name]
+            last, _, _, p95, _, _ = stats[name]
+            ImGui.PlotHistogram(f'{name}##histogram', samples.values, profiler.count, offset,
+                                f'{last:.2f}ms', 0, max(p95 * 2, 0.001), (0, 40))
@@ -0,0 +1,376 @@
+'''
+pack small user images drawn by ImGui.Image into shared texture pages.
+
+consecutive ImDrawCmd that share a page are drawn by one draw call in impl_opengl3.Renderer.
+
+atlas = TextureAtlas(renderer=gui.impl_opengl)
+region = atlas.get(key) or atlas.upload(key, width, height, pixels)
+if region:
+    ImGui.Image(region.texture, size, region.uv0, region.uv1)
+atlas.end_frame()
+'''
+from typing import NamedTuple, Optional, Dict, List, Tuple, Hashable, Union, Callable
+import collections
+import ctypes
+import dataclasses
+import logging
+from OpenGL import GL
+
+logger = logging.getLogger(__name__)
+
+MIN_SLOT_SIZE = 16
+
+
+class SamplerState(NamedTuple):
+    min_filter: int = GL.GL_LINEAR  # type: ignore
+    mag_filter: int = GL.GL_LINEAR  # type: ignore
+    wrap_s: int = GL.GL_CLAMP_TO_EDGE  # type: ignore
+    wrap_t: int = GL.GL_CLAMP_TO_EDGE  # type: ignore
+
+
+class SamplerCache:
+    '''
+    one GL sampler object per SamplerState.
+    '''
+
+    def __init__(self) -> None:
+        self._samplers: Dict[SamplerState, int] = {}
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        if self._samplers:
+            samplers = (GL.GLuint * len(self._samplers))(*self._samplers.values())
+            GL.glDeleteSamplers(len(samplers), samplers)
+            self._samplers.clear()
+
+    def get(self, state: SamplerState) -> int:
+        sampler = self._samplers.get(state)
+        if not sampler:
+            handle = GL.GLuint()
+            GL.glGenSamplers(1, ctypes.byref(handle))
+            sampler = handle.value
+            GL.glSamplerParameteri(
+                sampler, GL.GL_TEXTURE_MIN_FILTER, state.min_filter)
+            GL.glSamplerParameteri(
+                sampler, GL.GL_TEXTURE_MAG_FILTER, state.mag_filter)
+            GL.glSamplerParameteri(sampler, GL.GL_TEXTURE_WRAP_S, state.wrap_s)
+            GL.glSamplerParameteri(sampler, GL.GL_TEXTURE_WRAP_T, state.wrap_t)
+            self._samplers[state] = sampler
+        return sampler
+
+
+def slot_size_for(width: int, height: int, padding: int) -> int:
+    '''
+    power of 2
+    '''
+    size = MIN_SLOT_SIZE
+    while size < max(width, height) + padding * 2:
+        size *= 2
+    return size
+
+
+class Slot(NamedTuple):
+    page: int
+    index: int
+
+
+class SlotAllocator:
+    '''
+    fixed size slots of pages. the least recently used slot is evicted when full.
+    a slot used in the current frame is not evicted.
+    '''
+
+    def __init__(self, slots_per_page: int) -> None:
+        self.slots_per_page = slots_per_page
+        self.pages: List[int] = []
+        self._free: List[Slot] = []
+        # key => slot. the least recently used first
+        self._used: collections.OrderedDict[Hashable, Slot] = collections.OrderedDict()
+        self._last_frame: Dict[Hashable, int] = {}
+        self.frame = 0
+
+    def get(self, key: Hashable) -> Optional[Slot]:
+        slot = self._used.get(key)
+        if slot:
+            self._used.move_to_end(key)
+            self._last_frame[key] = self.frame
+        return slot
+
+    def allocate(self, key: Hashable, new_page: Callable[[], Optional[int]]) -> Tuple[Optional[Slot], Optional[Hashable]]:
+        '''
+        new_page: create a page and return the page id. None if no more page.
+        return the slot and the evicted key.
+        '''
+        evicted = None
+        if not self._free:
+            page = new_page()
+            if page is not None:
+                self.pages.append(page)
+                self._free.extend(Slot(page, i)
+                                  for i in reversed(range(self.slots_per_page)))
+        if not self._free:
+            oldest = next(iter(self._used), None)
+            if oldest is None or self._last_frame[oldest] >= self.frame:
+                return None, None
+            self._free.append(self._used.pop(oldest))
+            del self._last_frame[oldest]
+            evicted = oldest
+        slot = self._free.pop()
+        self._used[key] = slot
+        self._last_frame[key] = self.frame
+        return slot, evicted
+
+    def release(self, key: Hashable):
+        slot = self._used.pop(key, None)
+        if slot:
+            del self._last_frame[key]
+            self._free.append(slot)
+
+    def oldest_frame(self) -> Optional[int]:
+        '''
+        the last used frame of the least recently used slot. None if no slot is used.
+        '''
+        oldest = next(iter(self._used), None)
+        return None if oldest is None else self._last_frame[oldest]
+
+    def page_frames(self) -> Dict[int, int]:
+        '''
+        page => the last used frame of the slots. -1 if the page has no used slot.
+        '''
+        frames = {page: -1 for page in self.pages}
+        for key, slot in self._used.items():
+            frames[slot.page] = max(frames[slot.page], self._last_frame[key])
+        return frames
+
+    def free_page(self, page: int) -> List[Hashable]:
+        '''
+        remove the page from this allocator. return the evicted keys.
+        '''
+        evicted = [key for key, slot in self._used.items()
+                   if slot.page == page]
+        for key in evicted:
+            del self._used[key]
+            del self._last_frame[key]
+        self._free = [slot for slot in self._free if slot.page != page]
+        self.pages.remove(page)
+        return evicted
+
+
+class AtlasRegion(NamedTuple):
+    # GL texture of the page
+    texture: int
+    uv0: Tuple[float, float]
+    uv1: Tuple[float, float]
+
+
+@dataclasses.dataclass
+class AtlasStats:
+    hits: int = 0
+    uploads: int = 0
+    evictions: int = 0
+    # too large or no slot to evict
+    rejected: int = 0
+
+
+def pad_rgba(pixels: Union[bytes, bytearray, memoryview], width: int, height: int) -> bytes:
+    '''
+    repeat the edge pixels by 1. no bleeding of the neighbor slots by GL_LINEAR.
+    '''
+    stride = width * 4
+    data = bytes(pixels)
+    rows = []
+    for y in range(height):
+        row = data[y * stride:(y + 1) * stride]
+        rows.append(row[:4] + row + row[-4:])
+    return b''.join([rows[0]] + rows + [rows[-1]])
+
+
+class TextureAtlas:
+    '''
+    RGBA8 images up to max_image_size are packed into page_size pages.
+    a page has the slots of one power of 2 size. the least recently used slot is reused.
+    when max_pages are used, the least recently used page of the other sizes moves to the size.
+
+    renderer: impl_opengl3.Renderer. the pages are sampled by the sampler.
+    '''
+
+    def __init__(self, *, page_size=2048, max_image_size=256, max_pages=4,
+                 sampler: Optional[SamplerState] = None, renderer=None) -> None:
+        assert max_image_size + 2 <= page_size
+        self.page_size = page_size
+        self.max_image_size = max_image_size
+        self.max_pages = max_pages
+        self.sampler = sampler if sampler else SamplerState()
+        self.renderer = renderer
+        self._samplers = SamplerCache()
+        # slot size => allocator
+        self._allocators: Dict[int, SlotAllocator] = {}
+        self._regions: Dict[Hashable, Tuple[int, AtlasRegion]] = {}
+        self._textures: List[int] = []
+        self.stats = AtlasStats()
+        self.frame = 0
+
+    def __del__(self):
+        self.delete()
+
+    def delete(self):
+        if self._textures:
+            if self.renderer:
+                for texture in self._textures:
+                    self.renderer.set_sampler(texture, 0)
+            textures = (GL.GLuint * len(self._textures))(*self._textures)
+            GL.glDeleteTextures(len(textures), textures)
+            self._textures.clear()
+        self._samplers.delete()
+        self._allocators.clear()
+        self._regions.clear()
+
+    @property
+    def pages(self) -> int:
+        return len(self._textures)
+
+    def _new_page(self, allocator: SlotAllocator) -> Optional[int]:
+        if len(self._textures) >= self.max_pages:
+            return self._reclaim_page(allocator)
+        texture = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_MIN_FILTER, self.sampler.min_filter)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_MAG_FILTER, self.sampler.mag_filter)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_WRAP_S, self.sampler.wrap_s)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_WRAP_T, self.sampler.wrap_t)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA8, self.page_size, self.page_size,
+                        0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, None)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self._textures.append(int(texture))
+        if self.renderer:
+            self.renderer.set_sampler(
+                int(texture), self._samplers.get(self.sampler))
+        logger.debug(f'atlas page: {texture}')
+        return int(texture)
+
+    def _reclaim_page(self, allocator: SlotAllocator) -> Optional[int]:
+        '''
+        free the least recently used page of the other slot sizes.
+        the page is older than the least recently used slot of allocator, else allocator evicts the slot.
+        '''
+        oldest = allocator.oldest_frame()
+        limit = self.frame if oldest is None else oldest
+        found: Optional[Tuple[SlotAllocator, int, int]] = None
+        for other in self._allocators.values():
+            if other is allocator:
+                continue
+            for page, frame in other.page_frames().items():
+                if frame < limit and (not found or frame < found[2]):
+                    found = (other, page, frame)
+        if not found:
+            return None
+        other, page, _ = found
+        for key in other.free_page(page):
+            del self._regions[key]
+            self.stats.evictions += 1
+        logger.debug(f'atlas page: {page} reclaimed')
+        return page
+
+    def get(self, key: Hashable) -> Optional[AtlasRegion]:
+        '''
+        mark as used in this frame.
+        '''
+        match self._regions.get(key):
+            case (slot_size, region):
+                self._allocators[slot_size].get(key)
+                self.stats.hits += 1
+                return region
+
+    def _allocate(self, key: Hashable, width: int, height: int) -> Optional[Tuple[int, int, int]]:
+        '''
+        return texture, x, y of the slot
+        '''
+        if width > self.max_image_size or height > self.max_image_size:
+            self.stats.rejected += 1
+            return None
+        self.release(key)
+        slot_size = slot_size_for(width, height, 1)
+        allocator = self._allocators.get(slot_size)
+        if not allocator:
+            columns = self.page_size // slot_size
+            allocator = SlotAllocator(columns * columns)
+            # frames of the allocators are compared in _reclaim_page
+            allocator.frame = self.frame
+            self._allocators[slot_size] = allocator
+        slot, evicted = allocator.allocate(
+            key, lambda: self._new_page(allocator))
+        if evicted is not None:
+            del self._regions[evicted]
+            self.stats.evictions += 1
+        if not slot:
+            self.stats.rejected += 1
+            return None
+        columns = self.page_size // slot_size
+        x = slot.index % columns * slot_size
+        y = slot.index // columns * slot_size
+        u0 = (x + 1) / self.page_size
+        v0 = (y + 1) / self.page_size
+        self._regions[key] = (slot_size, AtlasRegion(
+            slot.page, (u0, v0), (u0 + width / self.page_size, v0 + height / self.page_size)))
+        return slot.page, x, y
+
+    def upload(self, key: Hashable, width: int, height: int,
+               pixels: Union[bytes, bytearray, memoryview]) -> Optional[AtlasRegion]:
+        '''
+        pixels: RGBA8, the first row at uv0.
+        return None if too large, or all slots of the size are used in this frame.
+        '''
+        allocated = self._allocate(key, width, height)
+        if not allocated:
+            return None
+        texture, x, y = allocated
+        # the global state of the later uploads
+        last_unpack_alignment = GL.glGetIntegerv(GL.GL_UNPACK_ALIGNMENT)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, x, y, width + 2, height + 2,
+                           GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, pad_rgba(pixels, width, height))
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, last_unpack_alignment)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.stats.uploads += 1
+        return self._regions[key][1]
+
+    def copy_texture(self, key: Hashable, texture: int, width: int, height: int) -> Optional[AtlasRegion]:
+        '''
+        copy a GL_TEXTURE_2D (level 0) by glCopyImageSubData. GL-4.3.
+        ex: glo.Texture.handle
+        '''
+        allocated = self._allocate(key, width, height)
+        if not allocated:
+            return None
+        page, x, y = allocated
+
+        def copy(sx, sy, dx, dy, w, h):
+            GL.glCopyImageSubData(texture, GL.GL_TEXTURE_2D, 0, sx, sy, 0,
+                                  page, GL.GL_TEXTURE_2D, 0, x + 1 + dx, y + 1 + dy, 0, w, h, 1)
+        copy(0, 0, 0, 0, width, height)
+        # repeat the edges
+        copy(0, 0, -1, 0, 1, height)
+        copy(width - 1, 0, width, 0, 1, height)
+        for sy, dy in ((0, -1), (height - 1, height)):
+            copy(0, sy, 0, dy, width, 1)
+            copy(0, sy, -1, dy, 1, 1)
+            copy(width - 1, sy, width, dy, 1, 1)
+        self.stats.uploads += 1
+        return self._regions[key][1]
+
+    def release(self, key: Hashable):
+        match self._regions.pop(key, None):
+            case (slot_size, _):
+                self._allocators[slot_size].release(key)
+
+    def end_frame(self):
+        self.frame += 1
+        for allocator in self._allocators.values():
+            allocator.frame += 1
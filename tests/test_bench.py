@@ -0,0 +1,44 @@
+import unittest
+import types
+try:
+    import numpy
+    import OpenGL
+    from pydear.bench import gl_counter, replay
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, 'numpy and PyOpenGL are required')
+class TestBench(unittest.TestCase):
+
+    def test_gl_counter(self):
+        uploaded = []
+        module = types.SimpleNamespace(
+            glBufferData=lambda target, size, data, usage: uploaded.append(size),
+            glDrawArrays=lambda mode, first, count: None,
+            GL_ARRAY_BUFFER=0x8892)
+        original = module.glDrawArrays
+        with gl_counter.GLCallCounter(module) as counter:
+            module.glBufferData(module.GL_ARRAY_BUFFER, 64, None, 0)
+            module.glDrawArrays(0, 0, 3)
+            module.glDrawArrays(0, 3, 3)
+        self.assertEqual(3, counter.total)
+        self.assertEqual(2, counter.calls['glDrawArrays'])
+        self.assertEqual(64, counter.upload_bytes)
+        self.assertEqual([64], uploaded)
+        # restored
+        self.assertIs(original, module.glDrawArrays)
+
+    def test_report(self):
+        self.assertEqual(95, replay.percentile(list(range(1, 101)), 95))
+        report = replay.Report('test', [replay.FrameResult(1.0, 10, 100),
+                                        replay.FrameResult(3.0, 20, 300)], {})
+        summary = report.summary()
+        self.assertEqual(2, summary['frames'])
+        self.assertEqual(2.0, summary['cpu_ms_mean'])
+        self.assertEqual(15, summary['gl_calls_mean'])
+        self.assertEqual(3.0, summary['cpu_ms_p95'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import pathlib
+import tempfile
+try:
+    import numpy
+    from pydear.utils import draw_capture
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, 'numpy is required')
+class TestDrawCapture(unittest.TestCase):
+
+    def create_arrays(self):
+        vertices = numpy.zeros(3, draw_capture.VERTEX_DTYPE)
+        vertices['pos'] = [(0, 0), (10, 0), (0, 10)]
+        vertices['col'] = 0xFFFFFFFF
+        indices = numpy.array([0, 1, 2], draw_capture.INDEX_DTYPE)
+        commands = numpy.zeros(1, draw_capture.COMMAND_DTYPE)
+        commands['clip_rect'] = (0, 0, 100, 100)
+        commands['texture'] = 3
+        commands['elem_count'] = 3
+        return draw_capture.DrawDataArrays((0, 0), (100, 100), (1, 1),
+                                           [draw_capture.DrawListArrays(vertices, indices, commands)])
+
+    def assert_arrays(self, expected, actual):
+        self.assertEqual(expected.display_size, actual.display_size)
+        self.assertEqual(len(expected.lists), len(actual.lists))
+        for e, a in zip(expected.lists, actual.lists):
+            numpy.testing.assert_array_equal(e.vertices, a.vertices)
+            numpy.testing.assert_array_equal(e.indices, a.indices)
+            for name in draw_capture.PACKED_COMMAND_DTYPE.names:
+                numpy.testing.assert_array_equal(
+                    e.commands[name], a.commands[name])
+
+    def test_replay(self):
+        arrays = self.create_arrays()
+        replay = draw_capture.DrawDataReplay(arrays)
+        self.assertEqual(3, replay.draw_data.TotalVtxCount)
+        # zero copy view of the ImDrawData
+        self.assert_arrays(
+            arrays, draw_capture.from_draw_data(replay.draw_data))
+
+        # texture remap
+        replay = draw_capture.DrawDataReplay(arrays, textures={3: 7})
+        view = draw_capture.from_draw_data(replay.draw_data)
+        self.assertEqual(7, view.lists[0].commands['texture'][0])
+
+    def test_npz(self):
+        arrays = self.create_arrays()
+        with tempfile.TemporaryDirectory() as d:
+            path = pathlib.Path(d) / 'frame.npz'
+            draw_capture.save_npz(path, arrays)
+            self.assert_arrays(arrays, draw_capture.load_npz(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import ctypes
+from pydear import imgui as ImGui
+from pydear.utils import font_cache
+
+
+class TestFontCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.font_data = (ctypes.c_ubyte * 16)(*range(16))
+        self.ranges = (ctypes.c_uint16 * 5)(0x20, 0xff, 0xe000, 0xe0ff, 0)
+        # an ImFont* placeholder
+        self.font = ctypes.c_int()
+        self.fonts = (ctypes.c_void_p * 1)(ctypes.addressof(self.font))
+        self.configs = (ImGui.ImFontConfig * 1)()
+
+        config = self.configs[0]
+        config.FontData = ctypes.addressof(self.font_data)
+        config.FontDataSize = len(self.font_data)
+        config.SizePixels = 13
+        config.OversampleH = 3
+        config.OversampleV = 1
+        config.GlyphRanges = ctypes.addressof(self.ranges)
+        config.DstFont = ctypes.addressof(self.font)
+
+        self.atlas = ImGui.ImFontAtlas()
+        self.atlas.Fonts.Size = 1
+        self.atlas.Fonts.Data = ctypes.addressof(self.fonts)
+        self.atlas.ConfigData.Size = 1
+        self.atlas.ConfigData.Data = ctypes.addressof(self.configs)
+
+    def test_key(self):
+        key = font_cache.get_key(self.atlas)
+        self.assertEqual(key, font_cache.get_key(self.atlas))
+
+        # pointers are not a part of the key
+        font_data = (ctypes.c_ubyte * 16)(*range(16))
+        self.configs[0].FontData = ctypes.addressof(font_data)
+        self.assertEqual(key, font_cache.get_key(self.atlas))
+
+        font_data[0] = 255
+        self.assertNotEqual(key, font_cache.get_key(self.atlas))
+        font_data[0] = 0
+
+        self.configs[0].SizePixels = 14
+        self.assertNotEqual(key, font_cache.get_key(self.atlas))
+        self.configs[0].SizePixels = 13
+
+        self.ranges[3] = 0xe1ff
+        self.assertNotEqual(key, font_cache.get_key(self.atlas))
+        self.ranges[3] = 0xe0ff
+
+        self.configs[0].GlyphRanges = None
+        self.assertNotEqual(key, font_cache.get_key(self.atlas))
+        self.configs[0].GlyphRanges = ctypes.addressof(self.ranges)
+
+        self.atlas.TexDesiredWidth = 4096
+        self.assertNotEqual(key, font_cache.get_key(self.atlas))
+        self.atlas.TexDesiredWidth = 0
+
+        self.assertEqual(key, font_cache.get_key(self.atlas))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from pydear.utils.frame_scheduler import FrameScheduler
+
+
+class TestFrameScheduler(unittest.TestCase):
+
+    def test_disabled(self):
+        scheduler = FrameScheduler()
+        for _ in range(5):
+            self.assertTrue(scheduler.update(1))
+        self.assertFalse(scheduler.is_idle())
+
+    def test_skip(self):
+        scheduler = FrameScheduler(enabled=True, active_frames=1)
+        # first frame after startup
+        self.assertTrue(scheduler.update(1))
+        self.assertFalse(scheduler.update(1))
+        self.assertTrue(scheduler.is_idle())
+        # changed
+        self.assertTrue(scheduler.update(2))
+        self.assertFalse(scheduler.is_idle())
+
+    def test_request_redraw(self):
+        scheduler = FrameScheduler(enabled=True, active_frames=1)
+        scheduler.update(1)
+        scheduler.update(1)
+        scheduler.request_redraw(2)
+        self.assertFalse(scheduler.is_idle())
+        self.assertTrue(scheduler.update(1))
+        self.assertTrue(scheduler.update(1))
+        self.assertFalse(scheduler.update(1))
+
+    def test_request_redraw_default(self):
+        # input requests the active frames. ImGui settles the layout in them
+        scheduler = FrameScheduler(enabled=True, active_frames=2)
+        scheduler.update(1)
+        scheduler.update(1)
+        scheduler.update(1)
+        self.assertTrue(scheduler.is_idle())
+        scheduler.request_redraw()
+        self.assertFalse(scheduler.is_idle())
+        self.assertTrue(scheduler.update(1))
+        self.assertTrue(scheduler.update(1))
+        self.assertFalse(scheduler.update(1))
+        self.assertTrue(scheduler.is_idle())
+
+    def test_keep_target(self):
+        scheduler = FrameScheduler(
+            enabled=True, active_frames=1, keep_target=False)
+        scheduler.update(1)
+        scheduler.update(1)
+        # idle, but the cleared target is drawn again
+        self.assertTrue(scheduler.is_idle())
+        self.assertTrue(scheduler.should_draw())
+        scheduler.keep_target = True
+        self.assertFalse(scheduler.should_draw())
+
+    def test_timeout(self):
+        import asyncio
+        scheduler = FrameScheduler(
+            enabled=True, idle_timeout=0.5, pending_timeout=0.05)
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(0.5, scheduler.get_timeout(loop))
+            # waits for a timer the scheduler can not see
+            task = loop.create_task(asyncio.sleep(10))
+            self.assertEqual(0.05, scheduler.get_timeout(loop))
+            task.cancel()
+            loop.run_until_complete(asyncio.gather(
+                task, return_exceptions=True))
+            self.assertEqual(0.5, scheduler.get_timeout(loop))
+        finally:
+            loop.close()
+
+    def test_wake(self):
+        woken = []
+        scheduler = FrameScheduler(
+            enabled=True, active_frames=1, wake=lambda: woken.append(True))
+        scheduler.update(1)
+        scheduler.update(1)
+        self.assertTrue(scheduler.is_idle())
+        scheduler.wake()
+        self.assertEqual([True], woken)
+        self.assertFalse(scheduler.is_idle())
+
+    def test_input(self):
+        from unittest import mock
+        from pydear import imgui as ImGui
+        from pydear.backends import impl_glfw
+        ImGui.CreateContext()
+        try:
+            scheduler = FrameScheduler(enabled=True, active_frames=1)
+            scheduler.update(1)
+            scheduler.update(1)
+            with mock.patch.object(impl_glfw.glfw, 'get_framebuffer_size', return_value=(64, 32)):
+                impl = impl_glfw.ImplGlfwInput(
+                    None, attach_callbacks=False, scheduler=scheduler)
+            for callback in (lambda: impl._keyboard_callback(None, 0, 0, 1, 0),
+                             lambda: impl._char_callback(None, 0x41),
+                             lambda: impl._mouse_button_callback(
+                                 None, 0, 1, 0),
+                             lambda: impl._mouse_position_callback(
+                                 None, 1, 2),
+                             lambda: impl._scroll_callback(None, 0, 1),
+                             lambda: impl._resize_callback(None, 64, 32)):
+                self.assertTrue(scheduler.is_idle())
+                callback()
+                self.assertFalse(scheduler.is_idle())
+                self.assertTrue(scheduler.update(1))
+                self.assertFalse(scheduler.update(1))
+        finally:
+            ImGui.DestroyContext()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+from pydear.utils import profiler
+
+
+# PyOpenGL selects the platform at the first import
+@unittest.skipUnless(os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'PYOPENGL_PLATFORM=egl is required')
+class TestGpuTimer(unittest.TestCase):
+
+    def test_double_buffered(self):
+        from OpenGL import GL
+        from pydear.utils.headless import HeadlessContext
+        from pydear.utils.gpu_timer import GpuTimer
+        context = HeadlessContext(16, 16)
+        p = profiler.Profiler(enabled=True, gpu_enabled=True)
+        timer = GpuTimer('gpu:clear', p)
+        outer = GpuTimer('gpu:outer', p)
+        for _ in range(4):
+            # nested
+            with outer, timer:
+                GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+            GL.glFinish()
+            p.end_frame()
+        # the first two frames have no result yet
+        self.assertEqual(0, p.values('gpu:clear')[0])
+        self.assertEqual('gpu', p.samples['gpu:clear'].kind)
+        self.assertEqual(0, timer.dropped)
+        self.assertGreaterEqual(outer.last_ms, timer.last_ms)
+        self.assertEqual(GL.GL_NO_ERROR, GL.glGetError())
+        timer.delete()
+        outer.delete()
+        context.close()
+
+    def test_disabled(self):
+        from pydear.utils.gpu_timer import GpuTimer
+        p = profiler.Profiler(enabled=True)
+        timer = GpuTimer('gpu:none', p)
+        # no GL call without gpu_enabled
+        with timer:
+            pass
+        self.assertNotIn('gpu:none', p.samples)
+
+
+if __name__ == '__main__':
+    unittest.main()
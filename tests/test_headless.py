@@ -0,0 +1,353 @@
+import unittest
+import os
+import pathlib
+import tempfile
+from pydear.utils import image_diff
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    from pydear import imgui as ImGui
+except ImportError:
+    # pydear.imgui is not built
+    ImGui = None
+try:
+    # numpy and pydear.imgui
+    from pydear.utils import draw_capture
+except ImportError:
+    draw_capture = None
+try:
+    from pydear import nanovg
+except ImportError:
+    # pydear.nanovg is not built
+    nanovg = None
+
+
+def solid(width, height, rgba) -> bytes:
+    return bytes(rgba) * (width * height)
+
+
+class TestImageDiff(unittest.TestCase):
+
+    def test_png(self):
+        pixels = bytes(range(4 * 3 * 2))
+        with tempfile.TemporaryDirectory() as d:
+            path = pathlib.Path(d) / 'image.png'
+            image_diff.save_png(path, pixels, 3, 2)
+            self.assertEqual((pixels, 3, 2), image_diff.load_png(path))
+
+    def test_equal(self):
+        a = solid(4, 4, (1, 2, 3, 255))
+        self.assertTrue(image_diff.diff_images(a, a, 4, 4).is_equal)
+        with self.assertRaises(ValueError):
+            image_diff.diff_images(a, a[:-4], 4, 4)
+
+    @unittest.skipUnless(numpy, 'numpy is required')
+    def test_diff(self):
+        a = bytearray(solid(4, 4, (0, 0, 0, 255)))
+        b = bytearray(a)
+        # x=1, y=2
+        b[(2 * 4 + 1) * 4] = 10
+        diff = image_diff.diff_images(bytes(a), bytes(b), 4, 4)
+        self.assertEqual(image_diff.ImageDiff(1, 10, (1, 2, 1, 1)), diff)
+        self.assertTrue(image_diff.diff_images(
+            bytes(a), bytes(b), 4, 4, threshold=10).is_equal)
+
+
+# PyOpenGL selects the platform at the first import
+@unittest.skipUnless(os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'PYOPENGL_PLATFORM=egl is required')
+class TestHeadless(unittest.TestCase):
+
+    def test_clear(self):
+        from OpenGL import GL
+        from pydear.utils.headless import HeadlessContext
+        context = HeadlessContext(8, 4)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, context.framebuffer)
+        GL.glViewport(0, 0, 8, 4)
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        # the top row. GL is bottom up
+        GL.glEnable(GL.GL_SCISSOR_TEST)
+        GL.glScissor(0, 3, 8, 1)
+        GL.glClearColor(1, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        GL.glDisable(GL.GL_SCISSOR_TEST)
+
+        expected = solid(8, 1, (255, 0, 0, 255)) + \
+            solid(8, 3, (0, 0, 0, 255))
+        diff = image_diff.diff_images(
+            expected, context.read_pixels(), 8, 4)
+        self.assertTrue(diff.is_equal, diff)
+        context.close()
+
+    def assert_idle_frame(self, use_native: bool):
+        import glfw
+        from pydear.utils import glfw_app, gui_app
+        from pydear.backends import impl_opengl3
+        from pydear.backends.impl_glfw import ImplGlfwInput
+        app = glfw_app.GlfwApp('idle', width=64, height=32,
+                               headless='egl', power_saving=True)
+        assert app.headless
+        if use_native and not impl_opengl3.load_native(app.headless.get_proc_address):
+            app.headless.close()
+            glfw.destroy_window(app.window)
+            self.skipTest('pydear.impl is built without native renderer')
+
+        def hello():
+            ImGui.Begin('hello')
+            ImGui.TextUnformatted('hello')
+            ImGui.End()
+        # no glfw context. the native renderer loads gl from the headless context
+        gui = gui_app.Gui(app.loop, widgets=hello, use_native_renderer=use_native,
+                          get_proc_address=app.headless.get_proc_address,
+                          scheduler=app.scheduler, framebuffer=app.framebuffer)
+        impl_glfw = ImplGlfwInput(app.window, scheduler=app.scheduler)
+        try:
+            # the redraw frames after startup, then the unchanged frame
+            pixels = b''
+            for _ in range(10):
+                self.assertTrue(app.clear())
+                impl_glfw.process_inputs()
+                gui.render()
+                if app.scheduler.skipped:
+                    break
+                pixels = app.headless.read_pixels()
+            self.assertTrue(app.scheduler.skipped)
+            # not the cleared framebuffer
+            diff = image_diff.diff_images(
+                pixels, app.headless.read_pixels(), app.headless.width, app.headless.height)
+            self.assertTrue(diff.is_equal, diff)
+            self.assertEqual(use_native, gui.impl_opengl.use_native)
+        finally:
+            del gui
+            app.headless.close()
+            glfw.destroy_window(app.window)
+
+    @unittest.skipUnless(ImGui, 'pydear.imgui is required')
+    def test_idle_frame(self):
+        self.assert_idle_frame(False)
+
+    @unittest.skipUnless(ImGui, 'pydear.imgui is required')
+    def test_idle_frame_native(self):
+        self.assert_idle_frame(True)
+
+
+WIDTH = 64
+HEIGHT = 32
+BLACK = (0, 0, 0, 255)
+RED = (255, 0, 0, 255)
+GREEN = (0, 255, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def rect_image(width, height, rects) -> bytes:
+    '''
+    rects: (x, y, w, h, rgba) on BLACK. top row first
+    '''
+    pixels = bytearray(bytes(BLACK) * (width * height))
+    for x, y, w, h, rgba in rects:
+        for row in range(y, y + h):
+            i = (row * width + x) * 4
+            pixels[i:i + w * 4] = bytes(rgba) * w
+    return bytes(pixels)
+
+
+def abgr(rgba) -> int:
+    r, g, b, a = rgba
+    return (a << 24) | (b << 16) | (g << 8) | r
+
+
+def quad_list(texture: int, rects) -> 'draw_capture.DrawListArrays':
+    '''
+    a ImDrawList of the rects. a command per rect.
+    '''
+    vertices = numpy.zeros(len(rects) * 4, draw_capture.VERTEX_DTYPE)
+    indices = numpy.zeros(len(rects) * 6, draw_capture.INDEX_DTYPE)
+    commands = numpy.zeros(len(rects), draw_capture.COMMAND_DTYPE)
+    for i, (x, y, w, h, rgba) in enumerate(rects):
+        v = i * 4
+        vertices['pos'][v:v + 4] = [(x, y), (x + w, y),
+                                    (x + w, y + h), (x, y + h)]
+        vertices['col'][v:v + 4] = abgr(rgba)
+        indices[i * 6:i * 6 + 6] = [v, v + 1, v + 2, v, v + 2, v + 3]
+        commands[i]['clip_rect'] = (0, 0, WIDTH, HEIGHT)
+        commands[i]['texture'] = texture
+        commands[i]['idx_offset'] = i * 6
+        commands[i]['elem_count'] = 6
+    return draw_capture.DrawListArrays(vertices, indices, commands)
+
+
+# PyOpenGL selects the platform at the first import
+@unittest.skipUnless(draw_capture and os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'draw_capture and PYOPENGL_PLATFORM=egl are required')
+class TestImGuiRenderer(unittest.TestCase):
+
+    def setUp(self):
+        from OpenGL import GL
+        from pydear import imgui as ImGui
+        from pydear.utils.headless import HeadlessContext
+        self.context = HeadlessContext(WIDTH, HEIGHT)
+        ImGui.CreateContext()
+        # the vertex color is drawn as is
+        self.white = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.white)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D,
+                           GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, 1, 1, 0,
+                        GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, bytes([255, 255, 255, 255]))
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+    def tearDown(self):
+        from OpenGL import GL
+        from pydear import imgui as ImGui
+        GL.glDeleteTextures([self.white])
+        ImGui.DestroyContext()
+        self.context.close()
+
+    def render(self, renderer, lists) -> bytes:
+        from OpenGL import GL
+        arrays = draw_capture.DrawDataArrays(
+            (0, 0), (WIDTH, HEIGHT), (1, 1), lists)
+        replay = draw_capture.DrawDataReplay(arrays)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.context.framebuffer)
+        GL.glViewport(0, 0, WIDTH, HEIGHT)
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        renderer.render(replay.draw_data)
+        return self.context.read_pixels()
+
+    def assert_frames(self, renderer, name: str):
+        from pydear.backends import stream_buffer
+        # all segments of the persistent buffer twice
+        for frame in range(stream_buffer.SEGMENT_COUNT * 2):
+            red = (frame * 4, 2, 8, 8, RED)
+            green = (40, frame * 2, 16, 4, GREEN)
+            # the second list is drawn with the base vertex after the first list
+            pixels = self.render(renderer, [quad_list(self.white, [red]),
+                                            quad_list(self.white, [green])])
+            diff = image_diff.diff_images(rect_image(
+                WIDTH, HEIGHT, [red, green]), pixels, WIDTH, HEIGHT)
+            self.assertTrue(diff.is_equal, f'{name}: frame {frame}: {diff}')
+
+    def test_frames(self):
+        from pydear.backends import impl_opengl3, stream_buffer
+        self.assert_frames(impl_opengl3.Renderer(
+            persistent=False), 'sub data')
+        self.assert_frames(impl_opengl3.Renderer(
+            persistent=False, consolidate=False), 'per list')
+        if stream_buffer.has_buffer_storage():
+            self.assert_frames(impl_opengl3.Renderer(
+                persistent=True), 'persistent')
+            self.assert_frames(impl_opengl3.Renderer(
+                persistent=True, consolidate=False), 'persistent per list')
+
+    def test_native(self):
+        from pydear.backends import impl_opengl3
+        if not impl_opengl3.load_native(self.context.get_proc_address):
+            self.skipTest('pydear.impl is built without native renderer')
+        renderer = impl_opengl3.Renderer(
+            use_native=True, get_proc_address=self.context.get_proc_address)
+        self.assert_frames(renderer, 'native')
+        self.assertTrue(renderer.use_native)
+
+
+def nvg_rects(vg, rects):
+    for x, y, w, h, (r, g, b, a) in rects:
+        nanovg.nvgBeginPath(vg)
+        nanovg.nvgRect(vg, x, y, w, h)
+        nanovg.nvgFillColor(vg, nanovg.nvgRGBA(r, g, b, a))
+        nanovg.nvgFill(vg)
+
+
+def translate(rects, dx, dy):
+    return [(x + dx, y + dy, w, h, rgba) for x, y, w, h, rgba in rects]
+
+
+@unittest.skipUnless(nanovg and os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'pydear.nanovg and PYOPENGL_PLATFORM=egl are required')
+class TestNanoVgRenderer(unittest.TestCase):
+    use_native = False
+
+    def setUp(self):
+        from pydear.nanovg_backends import nanovg_impl_opengl3
+        from pydear.utils.headless import HeadlessContext
+        self.context = HeadlessContext(WIDTH, HEIGHT)
+        if self.use_native and not nanovg_impl_opengl3.load_native(self.context.get_proc_address):
+            self.context.close()
+            self.skipTest('pydear.impl is built without native nanovg renderer')
+        # no antialias fringe. a rect at integer coordinates covers whole pixels
+        self.vg = nanovg.nvgCreate(0)
+        nanovg_impl_opengl3.init(self.vg, use_native=self.use_native,
+                                 get_proc_address=self.context.get_proc_address)
+
+    def tearDown(self):
+        from pydear.nanovg_backends import nanovg_impl_opengl3
+        nanovg_impl_opengl3.delete()
+        self.context.close()
+
+    def begin_frame(self):
+        nanovg.nvgBeginFrame(self.vg, WIDTH, HEIGHT, 1.0)
+        return self.vg
+
+    def render(self, pictures=()) -> bytes:
+        from OpenGL import GL
+        from pydear.nanovg_backends import nanovg_impl_opengl3
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.context.framebuffer)
+        GL.glViewport(0, 0, WIDTH, HEIGHT)
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_STENCIL_BUFFER_BIT)
+        nanovg_impl_opengl3.render(nanovg.nvgGetDrawData(self.vg), pictures)
+        return self.context.read_pixels()
+
+    def assert_pixels(self, expected: bytes, pixels: bytes, name: str):
+        diff = image_diff.diff_images(
+            expected, pixels, WIDTH, HEIGHT, threshold=1)
+        self.assertTrue(diff.is_equal, f'{name}: {diff}')
+
+    def test_rects(self):
+        rects = [(4, 2, 8, 8, RED), (16, 4, 12, 6, GREEN)]
+        for frame in range(3):
+            moved = translate(rects, frame * 8, frame * 2)
+            nvg_rects(self.begin_frame(), moved)
+            self.assert_pixels(rect_image(WIDTH, HEIGHT, moved),
+                               self.render(), f'frame {frame}')
+
+    def test_picture(self):
+        from pydear.nanovg_backends import nanovg_impl_opengl3
+        rects = [(4, 2, 8, 8, RED), (16, 4, 12, 6, GREEN)]
+        nvg_rects(self.begin_frame(), rects)
+        picture = nanovg_impl_opengl3.Picture(nanovg.nvgGetDrawData(self.vg))
+        try:
+            for transform in (nanovg_impl_opengl3.IDENTITY, (1.0, 0.0, 0.0, 1.0, 30.0, 10.0)):
+                _, _, _, _, dx, dy = transform
+                vg = self.begin_frame()
+                nanovg.nvgTranslate(vg, dx, dy)
+                nvg_rects(vg, rects)
+                immediate = self.render()
+                self.assert_pixels(rect_image(WIDTH, HEIGHT, translate(rects, dx, dy)),
+                                   immediate, f'immediate {transform}')
+
+                self.begin_frame()
+                self.assert_pixels(immediate, self.render(
+                    [nanovg_impl_opengl3.PictureDraw(picture, transform)]), f'picture {transform}')
+
+            # the frame is drawn over the pictures
+            blue = (8, 4, 24, 4, BLUE)
+            nvg_rects(self.begin_frame(), [blue])
+            self.assert_pixels(rect_image(WIDTH, HEIGHT, rects + [blue]), self.render(
+                [nanovg_impl_opengl3.PictureDraw(picture)]), 'picture and frame')
+        finally:
+            # the buffers are deleted in the context
+            del picture
+
+
+class TestNanoVgNativeRenderer(TestNanoVgRenderer):
+    '''
+    the same images by Custom_NanoVG_RenderDrawData
+    '''
+    use_native = True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import time
+from pydear.utils import profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled(self):
+        p = profiler.Profiler(capacity=4)
+        with p.section('a'):
+            pass
+        p.end_frame()
+        self.assertEqual(0, p.count)
+        self.assertNotIn('a', p.samples)
+
+    def test_sections(self):
+        p = profiler.Profiler(capacity=4, enabled=True)
+
+        @p.section('inner')
+        def inner():
+            time.sleep(0.002)
+
+        for _ in range(6):
+            with p.section('outer'):
+                inner()
+                inner()
+            p.end_frame()
+
+        # ring buffer
+        self.assertEqual(4, p.count)
+        self.assertEqual(2, p.head)
+        self.assertEqual(4, len(p.values('outer')))
+        self.assertEqual(0, p.samples['outer'].depth)
+        self.assertEqual(1, p.samples['inner'].depth)
+        # accumulated per frame
+        self.assertGreaterEqual(p.last('inner'), 4)
+        self.assertGreaterEqual(p.last('outer'), p.last('inner'))
+        p50, p100 = p.percentiles('outer', (50, 100))
+        self.assertLessEqual(p50, p100)
+        self.assertEqual(max(p.values('outer')), p100)
+
+        p.clear()
+        self.assertEqual([], p.values('outer'))
+
+
+if __name__ == '__main__':
+    unittest.main()
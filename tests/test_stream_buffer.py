@@ -0,0 +1,89 @@
+import unittest
+import ctypes
+import os
+from pydear.backends import stream_buffer
+
+# sizeof(ImDrawVert)
+VERTEX_SIZE = 20
+
+
+class TestStreamBuffer(unittest.TestCase):
+
+    def test_align_up(self):
+        self.assertEqual(0, stream_buffer.align_up(0, 20))
+        self.assertEqual(20, stream_buffer.align_up(1, 20))
+        self.assertEqual(40, stream_buffer.align_up(40, 20))
+
+    def test_grow_capacity(self):
+        # keep capacity
+        self.assertEqual(stream_buffer.MIN_CAPACITY,
+                         stream_buffer.grow_capacity(stream_buffer.MIN_CAPACITY, 100))
+        # geometric
+        capacity = stream_buffer.grow_capacity(
+            stream_buffer.MIN_CAPACITY, stream_buffer.MIN_CAPACITY + 1)
+        self.assertEqual(stream_buffer.MIN_CAPACITY * 3 // 2, capacity)
+        # large request
+        capacity = stream_buffer.grow_capacity(0, 10 * 1024 * 1024)
+        self.assertGreaterEqual(capacity, 10 * 1024 * 1024)
+        self.assertEqual(0, capacity % 256)
+
+    def test_granularity(self):
+        granularity = stream_buffer.capacity_granularity(VERTEX_SIZE)
+        self.assertEqual(0, granularity % 256)
+        self.assertEqual(0, granularity % VERTEX_SIZE)
+        capacity = stream_buffer.grow_capacity(
+            stream_buffer.MIN_CAPACITY, stream_buffer.MIN_CAPACITY + 1, granularity)
+        self.assertEqual(0, capacity % VERTEX_SIZE)
+
+    def test_stats(self):
+        stats = stream_buffer.UploadStats()
+        stats.upload_bytes += 100
+        stats.reallocations += 1
+        stats.reset()
+        self.assertEqual(stream_buffer.UploadStats(), stats)
+
+
+# PyOpenGL selects the platform at the first import
+@unittest.skipUnless(os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'PYOPENGL_PLATFORM=egl is required')
+class TestPersistentStreamBuffer(unittest.TestCase):
+
+    def setUp(self):
+        from pydear.utils.headless import HeadlessContext
+        self.context = HeadlessContext(4, 4, gl_major=4, gl_minor=4)
+        if not stream_buffer.has_buffer_storage():
+            self.context.close()
+            self.skipTest('GL-4.4 is required')
+
+    def tearDown(self):
+        self.context.close()
+
+    def test_segment_offset(self):
+        from OpenGL import GL
+        buffer = stream_buffer.StreamBuffer(
+            GL.GL_ARRAY_BUFFER, persistent=True, stride=VERTEX_SIZE)
+        self.assertEqual(0, buffer.capacity % VERTEX_SIZE)
+        head = (ctypes.c_ubyte * 4)()
+        vertices = (ctypes.c_ubyte * (VERTEX_SIZE * 3))(*range(VERTEX_SIZE * 3))
+        # all segments twice
+        for frame in range(stream_buffer.SEGMENT_COUNT * 2):
+            buffer.begin_frame()
+            buffer.upload(ctypes.cast(head, ctypes.c_void_p), len(head))
+            offset = buffer.upload(ctypes.cast(vertices, ctypes.c_void_p),
+                                   len(vertices), VERTEX_SIZE)
+            self.assertEqual(0, offset % VERTEX_SIZE, f'frame {frame}')
+            buffer.end_frame()
+
+        # grow
+        large = (ctypes.c_ubyte * (buffer.capacity + 1))()
+        buffer.begin_frame()
+        offset = buffer.upload(ctypes.cast(large, ctypes.c_void_p),
+                               len(large), VERTEX_SIZE)
+        buffer.end_frame()
+        self.assertEqual(0, offset % VERTEX_SIZE)
+        self.assertEqual(0, buffer.capacity % VERTEX_SIZE)
+        self.assertEqual(GL.GL_NO_ERROR, GL.glGetError())
+        buffer._release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import os
+import ctypes
+try:
+    from pydear.utils import texture_atlas
+except ImportError:
+    # PyOpenGL
+    texture_atlas = None
+
+
+@unittest.skipUnless(texture_atlas, 'PyOpenGL is required')
+class TestSlotAllocator(unittest.TestCase):
+
+    def test_lru(self):
+        pages = []
+
+        def new_page():
+            if len(pages) >= 1:
+                return None
+            pages.append(len(pages) + 1)
+            return pages[-1]
+
+        allocator = texture_atlas.SlotAllocator(2)
+        a, _ = allocator.allocate('a', new_page)
+        b, _ = allocator.allocate('b', new_page)
+        self.assertEqual(texture_atlas.Slot(1, 0), a)
+        self.assertEqual(texture_atlas.Slot(1, 1), b)
+        # used in this frame
+        self.assertEqual((None, None), allocator.allocate('c', new_page))
+
+        allocator.frame += 1
+        allocator.get('a')
+        c, evicted = allocator.allocate('c', new_page)
+        self.assertEqual('b', evicted)
+        self.assertEqual(b, c)
+        self.assertIsNone(allocator.get('b'))
+
+        allocator.release('a')
+        d, evicted = allocator.allocate('d', new_page)
+        self.assertIsNone(evicted)
+        self.assertEqual(a, d)
+
+    def test_free_page(self):
+        pages = [1, 2]
+
+        def new_page():
+            return pages.pop(0) if pages else None
+
+        allocator = texture_atlas.SlotAllocator(1)
+        allocator.allocate('a', new_page)
+        allocator.frame += 1
+        allocator.allocate('b', new_page)
+        self.assertEqual(0, allocator.oldest_frame())
+        self.assertEqual({1: 0, 2: 1}, allocator.page_frames())
+
+        self.assertEqual(['a'], allocator.free_page(1))
+        self.assertEqual([2], allocator.pages)
+        self.assertIsNone(allocator.get('a'))
+        self.assertEqual(1, allocator.oldest_frame())
+
+    def test_pad(self):
+        self.assertEqual(16, texture_atlas.slot_size_for(14, 1, 1))
+        self.assertEqual(32, texture_atlas.slot_size_for(15, 1, 1))
+        # 2x1 => 4x3
+        pixels = bytes([1] * 4 + [2] * 4)
+        row = bytes([1] * 8 + [2] * 8)
+        self.assertEqual(row * 3, texture_atlas.pad_rgba(pixels, 2, 1))
+
+
+# PyOpenGL selects the platform at the first import
+@unittest.skipUnless(texture_atlas and os.environ.get('PYOPENGL_PLATFORM') == 'egl', 'PYOPENGL_PLATFORM=egl is required')
+class TestTextureAtlas(unittest.TestCase):
+
+    def test_upload(self):
+        from OpenGL import GL
+        from pydear.utils.headless import HeadlessContext
+        context = HeadlessContext(16, 16)
+        atlas = texture_atlas.TextureAtlas(
+            page_size=64, max_image_size=30, max_pages=1)
+        red = bytes([255, 0, 0, 255]) * (8 * 8)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 8)
+        region = atlas.upload('red', 8, 8, red)
+        assert region
+        # restored
+        self.assertEqual(8, GL.glGetIntegerv(GL.GL_UNPACK_ALIGNMENT))
+        self.assertEqual(region, atlas.get('red'))
+        self.assertIsNone(atlas.upload('large', 31, 31, b''))
+
+        blue = bytes([0, 0, 255, 255]) * (8 * 8)
+        other = atlas.upload('blue', 8, 8, blue)
+        assert other
+        self.assertEqual(region.texture, other.texture)
+        self.assertNotEqual(region.uv0, other.uv0)
+
+        pixels = (ctypes.c_ubyte * (64 * 64 * 4))()
+        GL.glBindTexture(GL.GL_TEXTURE_2D, region.texture)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        GL.glGetTexImage(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA,
+                         GL.GL_UNSIGNED_BYTE, pixels)
+        x = int(region.uv0[0] * 64)
+        y = int(region.uv0[1] * 64)
+        i = (y * 64 + x) * 4
+        self.assertEqual([255, 0, 0, 255], list(pixels[i:i + 4]))
+        # padding
+        i = ((y - 1) * 64 + x - 1) * 4
+        self.assertEqual([255, 0, 0, 255], list(pixels[i:i + 4]))
+        self.assertEqual(GL.GL_NO_ERROR, GL.glGetError())
+
+        atlas.delete()
+        context.close()
+
+    def test_reclaim(self):
+        from pydear.utils.headless import HeadlessContext
+        context = HeadlessContext(16, 16)
+        # a page of 16x16 slots or a page of 32x32 slots
+        atlas = texture_atlas.TextureAtlas(
+            page_size=64, max_image_size=30, max_pages=1)
+        small = atlas.upload('small', 8, 8, bytes(8 * 8 * 4))
+        assert small
+        # used in this frame
+        self.assertIsNone(atlas.upload('large', 20, 20, bytes(20 * 20 * 4)))
+
+        atlas.end_frame()
+        large = atlas.upload('large', 20, 20, bytes(20 * 20 * 4))
+        assert large
+        self.assertEqual(small.texture, large.texture)
+        self.assertEqual(1, atlas.pages)
+        self.assertEqual(1, atlas.stats.evictions)
+        self.assertIsNone(atlas.get('small'))
+
+        # the page moves back
+        atlas.end_frame()
+        self.assertTrue(atlas.upload('small', 8, 8, bytes(8 * 8 * 4)))
+        self.assertIsNone(atlas.get('large'))
+        self.assertEqual(1, atlas.pages)
+
+        atlas.delete()
+        context.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
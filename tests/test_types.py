@@ -1,4 +1,5 @@
 import unittest
+import ctypes
 from pydear import imgui as ImGui
 
 
@@ -9,6 +10,21 @@ class TestTypes(unittest.TestCase):
         x, y = v2
         self.assertEqual((1, 2), (x, y))
 
+    def test_vector_view(self):
+        data = (ctypes.c_uint16 * 4)(1, 2, 3, 4)
+        v = ImGui.ImVector(3, 4, ctypes.addressof(data))
+        self.assertEqual([1, 2, 3], v.view(ctypes.c_uint16).tolist())
+        # no copy
+        data[0] = 5
+        self.assertEqual(5, v.view(ctypes.c_uint16)[0])
+        # empty
+        self.assertEqual(0, len(ImGui.ImVector().view(ctypes.c_uint16)))
+
+        vertices = (ImGui.ImDrawVert * 2)()
+        v = ImGui.ImVector(2, 2, ctypes.addressof(vertices))
+        self.assertEqual(ctypes.sizeof(vertices),
+                         v.view(ImGui.ImDrawVert).nbytes)
+
 
 if __name__ == '__main__':
     unittest.main()